@@ -1,72 +1,174 @@
 import pandas as pd
 from arango import ArangoClient
 import os
-import json
+import sys
+import argparse
+import glob
+import re
 import xml.etree.ElementTree as ET
 import numpy as np
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dead_letter import DeadLetterFile, TransportError, bisect_failed, default_dead_letter_path
+from load_ledger import LoadLedger, default_ledger_path
+from load_log import Progress, debug_sample, get_logger
+from json_stream import iter_json_records
+from load_scheduler import LoadScheduler
+from load_metrics import LoadMetrics, default_metrics_path
+from arangodb_import import CoordinatorPool, ImportRejected, OutcomeUnknown
 
-# ✅ Conexión con ArangoDB
-client = ArangoClient(hosts="http://127.0.0.1:7101")
-db = client.db("KhaBench", username="root", password="")
-data_dir = "/home/khabench/Desktop/test/data/Global"
+
+# ✅ Conexión con ArangoDB: el coordinador de compose-files (coordinator1:7101).
+# KHAB_ARANGO_COORDINATORS (separados por comas), --coordinators o --discover añaden más.
+ARANGO_COORDINATORS = os.environ.get("KHAB_ARANGO_COORDINATORS", "http://127.0.0.1:7101").split(",")
+DB_NAME = "KhaBench"
+USERNAME = "root"
+PASSWORD = ""
+
+client = ArangoClient(hosts=ARANGO_COORDINATORS)
+db = client.db(DB_NAME, username=USERNAME, password=PASSWORD)
+data_dir = os.environ.get("KHAB_DATA_DIR", "/home/khabench/Desktop/test/data/Global")
+
+# ✅ Registro con niveles (KHAB_LOG_LEVEL) y progreso limitado a una línea cada pocos segundos
+log = get_logger("arangodb_dataload")
+
+# ✅ Carga masiva por /_api/import: documentos por petición (JSON Lines en streaming)
+IMPORT_BATCH_SIZE = 100000
+
+# ✅ Lotes en vuelo por coordinador y segundos que se aparta un coordinador caído
+WRITERS_PER_COORDINATOR = 2
+COORDINATOR_COOLDOWN = 30
+
+# ✅ Tiempos por etapa y throughput por colección (JSON Lines + Prometheus al terminar)
+metrics = LoadMetrics("arangodb_dataload")
+
+coordinators = CoordinatorPool(ARANGO_COORDINATORS, DB_NAME, USERNAME, PASSWORD,
+                               writers=WRITERS_PER_COORDINATOR, cooldown=COORDINATOR_COOLDOWN, metrics=metrics)
+
+# ✅ Cargas independientes que se ejecutan a la vez (ver LoadScheduler)
+LOAD_PARALLELISM = 4
+
+# ✅ Ledger de lotes confirmados para `--resume`
+ledger = LoadLedger(default_ledger_path(data_dir, "arangodb_dataload"))
+
+# ✅ Documentos rechazados por ArangoDB (aislados por bisección)
+dead_letter_file = DeadLetterFile(default_dead_letter_path(data_dir, "arangodb_dataload"))
 
 # 📌 Función para vaciar una colección
 def clear_collection(collection_name):
     collection = db.collection(collection_name)
     if collection.count() > 0:
         collection.truncate()
-        print(f"✅ Eliminados todos los datos de {collection_name}")
+        log.info(f"✅ Eliminados todos los datos de {collection_name}")
     else:
-        print(f"⚠️ La colección {collection_name} ya está vacía")
+        log.info(f"⚠️ La colección {collection_name} ya está vacía")
+
+# 📌 Importa un lote y manda al dead-letter los documentos rechazados
+def insert_batch(collection_name, batch, on_duplicate="error", source=""):
+    """Importa una lista de documentos o un DataFrame por /_api/import.
+
+    Devuelve cuántos documentos se rechazaron; lanza TransportError si no hubo respuesta
+    y OutcomeUnknown si no se sabe si el coordinador aplicó el lote.
+    """
+    rejected = 0
+
+    def reject(document, error):
+        nonlocal rejected
+        dead_letter_file.write(collection_name, source, document, error)
+        rejected += 1
+
+    def send(sub_batch):
+        try:
+            if isinstance(sub_batch, pd.DataFrame):
+                result = coordinators.import_frame(collection_name, sub_batch, on_duplicate)
+            else:
+                result = coordinators.import_documents(collection_name, sub_batch, on_duplicate)
+        except ImportRejected as e:
+            return str(e)  # 🔥 El servidor rechazó el lote completo: se bisecciona
+        # La importación no es atómica: `details` trae la posición de cada documento con error
+        for position, error in result["failed"]:
+            if position < len(sub_batch):
+                if isinstance(sub_batch, pd.DataFrame):
+                    reject(sub_batch.iloc[position].to_dict(), error)
+                else:
+                    reject(sub_batch[position], error)
+        return None
+
+    error = send(batch)
+    if error is not None:
+        records = batch.to_dict(orient="records") if isinstance(batch, pd.DataFrame) else batch
+        bisect_failed(records, error, send, reject)
+    return rejected
+
+# 📌 Envía los lotes `(colección, offset, lote)` repartidos entre los coordinadores
+def import_routed(batches, on_duplicate="error", source="", totals=None):
+    """Los lotes se consumen a medida que se envían, así el origen puede seguir generándolos.
+
+    `totals` (colección → documentos esperados) permite calcular el ETA del progreso.
+    Devuelve los documentos insertados por colección; los lotes sin respuesta quedan sin confirmar
+    en el ledger y no se reintentan en esta ejecución.
+    """
+    def jobs():
+        for collection_name, i, batch in batches:
+            if ledger.is_committed(collection_name, source, i):
+                continue  # ⏭️ Lote confirmado en una ejecución anterior
+            yield (collection_name, i, len(batch)), insert_batch, (collection_name, batch, on_duplicate, source)
+
+    inserted = {}
+    progress = {}
+    for (collection_name, i, size), rejected in coordinators.stream(jobs()):
+        if collection_name not in inserted:
+            inserted[collection_name] = 0
+            progress[collection_name] = Progress(log, collection_name, total=(totals or {}).get(collection_name),
+                                                 unit="documentos")
+        if isinstance(rejected, OutcomeUnknown):
+            log.error(f"❌ Lote {i} de {collection_name} sin respuesta tras enviarse ({rejected}); "
+                      f"pudo haberse aplicado, revisar antes de --resume")
+            continue
+        if isinstance(rejected, TransportError):
+            log.error(f"❌ Error al insertar el lote {i} en {collection_name}: {rejected}")
+            continue
+        ledger.mark_committed(collection_name, source, i, size)
+        inserted[collection_name] += size - rejected
+        metrics.count(collection_name, "records", size - rejected)
+        metrics.count(collection_name, "rejected", rejected)
+        log.debug(f"✅ Insertados {size - rejected} documentos en {collection_name} (lote {i})")
+        progress[collection_name].update(size - rejected)
+    for collection_progress in progress.values():
+        collection_progress.finish()
+    return inserted
+
+# 📌 Envía los lotes `(offset, lote)` de una colección
+def import_batches(collection_name, batches, on_duplicate="error", source="", total=None):
+    """Devuelve cuántos documentos se insertaron."""
+    routed = ((collection_name, i, batch) for i, batch in batches)
+    return import_routed(routed, on_duplicate, source, {collection_name: total}).get(collection_name, 0)
 
 # 📌 Función para insertar datos en ArangoDB
-def insert_data(df, collection_name):
+def insert_data(df, collection_name, source="", on_duplicate="error"):
     if df.empty:
-        print(f"⚠️ No hay datos para insertar en {collection_name}.")
+        log.warning(f"⚠️ No hay datos para insertar en {collection_name}.")
         return
     
-    collection = db.collection(collection_name)
-    batch_size = 1000
+    batch_size = IMPORT_BATCH_SIZE
+    batches = ((i, df.iloc[i:i + batch_size]) for i in range(0, len(df), batch_size))
+    debug_sample(log, collection_name, df)
+    import_batches(collection_name, batches, on_duplicate, source, total=len(df))  # "error": no sobrescribir para evitar pérdida de datos
 
-    for i in range(0, len(df), batch_size):
-        batch = df.iloc[i:i + batch_size].to_dict(orient="records")
-        try:
-            collection.insert_many(batch, overwrite=False)  # No sobrescribir para evitar pérdida de datos
-            print(f"✅ Insertados {len(batch)} documentos en {collection_name}")
-        except Exception as e:
-            print(f"❌ Error en inserción: {e}")
-            print(f"🔍 Documentos problemáticos: {batch[:3]}")
-
-def insert_json(data, collection_name):
+def insert_json(data, collection_name, source="", on_duplicate="replace"):
     try:
-        collection = db.collection(collection_name)
-        batch_size = 1000
+        batch_size = IMPORT_BATCH_SIZE
         inserted_count = 0
 
-        # Imprimir un ejemplo de documento antes de empezar la inserción
-        if data:
-            print(f"🔍 Ejemplo de documento a insertar en {collection_name}: {data[0]}")
-
-        for i in range(0, len(data), batch_size):
-            batch = data[i:i + batch_size]
+        debug_sample(log, collection_name, data)
 
-            # Confirmar el tamaño del lote
-            print(f"🔍 Insertando un lote de {len(batch)} documentos en {collection_name}...")
+        batches = ((i, data[i:i + batch_size]) for i in range(0, len(data), batch_size))
+        inserted_count += import_batches(collection_name, batches, on_duplicate, source, total=len(data))
 
-            try:
-                collection.insert_many(batch, overwrite=True)
-                inserted_count += len(batch)
-                print(f"✅ Insertados {len(batch)} documentos en {collection_name}")
-            except Exception as e:
-                print(f"❌ Error al insertar el lote en {collection_name}: {e}")
-                # Opcional: imprimir algunos documentos problemáticos para análisis
-                print(f"🔍 Documentos problemáticos: {batch[:5]}")
-
-        print(f"🎉 Carga de {collection_name} completada. Total insertados: {inserted_count}")
+        log.info(f"🎉 Carga de {collection_name} completada. Total insertados: {inserted_count}")
 
     except Exception as e:
-        print(f"❌ Error en insert_json para {collection_name}: {e}")
+        log.error(f"❌ Error en insert_json para {collection_name}: {e}")
 
 # 📌 Función para cargar datos en Invoice
 def validate_invoice(invoice):
@@ -92,40 +194,35 @@ def validate_invoice(invoice):
     except (AttributeError, ValueError):
         return None
 
-def insert_documents(collection_name, documents, batch_size=1000):
-    collection = db.collection(collection_name)
-    for i in range(0, len(documents), batch_size):
-        batch = documents[i:i + batch_size]
-        try:
-            collection.insert_many(batch, overwrite=False)
-            print(f"✅ Insertados {len(batch)} documentos en {collection_name}")
-        except Exception as e:
-            print(f"❌ Error en inserción: {e}")
-            print(f"🔍 Documentos problemáticos: {batch[:3]}")
+def insert_documents(collection_name, documents, batch_size=IMPORT_BATCH_SIZE, source="", on_duplicate="error"):
+    batches = ((i, documents[i:i + batch_size]) for i in range(0, len(documents), batch_size))
+    import_batches(collection_name, batches, on_duplicate, source, total=len(documents))
 
 def load_edge(file_name, edge_name, from_prefix, to_prefix, drop_columns=[]):
     file_path = os.path.join(data_dir, file_name)
-    print(f"📂 Cargando {file_path} en {edge_name}")
-    df = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
+    log.info(f"📂 Cargando {file_path} en {edge_name}")
+    with metrics.stage(edge_name, "read"):
+        df = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
     
     if drop_columns:
         df = df.drop(columns=drop_columns, errors="ignore")  # Eliminar columnas extra
 
     if len(df.columns) != 2:
-        print(f"❌ Error: Se detectaron {len(df.columns)} columnas en lugar de 2 en {edge_name}.")
+        log.error(f"❌ Error: Se detectaron {len(df.columns)} columnas en lugar de 2 en {edge_name}.")
         return
 
     df.columns = ["_from", "_to"]
     df["_from"] = from_prefix + df["_from"]
     df["_to"] = to_prefix + df["_to"]
-    insert_data(df, edge_name)
+    insert_data(df, edge_name, source=file_name)
 
 # 📌 Función para cargar datos en Customer
 def load_customer():
     file_path = os.path.join(data_dir, "person_0_0.csv")
-    print(f"📂 Cargando {file_path} en Customer")
+    log.info(f"📂 Cargando {file_path} en Customer")
 
-    df = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
+    with metrics.stage("Customer", "read"):
+        df = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
 
     # 🔍 Asegurar que place sea numérico
     df["place"] = pd.to_numeric(df["place"], errors="coerce")
@@ -136,26 +233,28 @@ def load_customer():
     df_south = df[df["place"] > 1000]
 
     # ✅ Insertar datos en cada fragmento
-    insert_data(df_north, "Customer_North")
-    insert_data(df_center, "Customer_Center")
-    insert_data(df_south, "Customer_South")
+    insert_data(df_north, "Customer_North", source="person_0_0.csv")
+    insert_data(df_center, "Customer_Center", source="person_0_0.csv")
+    insert_data(df_south, "Customer_South", source="person_0_0.csv")
 
     # ✅ Insertar datos en la colección global
-    insert_data(df, "Customer")
+    insert_data(df, "Customer", source="person_0_0.csv")
 
 # 📌 Función para cargar datos en Person
 def load_person():
     file_path = os.path.join(data_dir, "person_0_0.csv")
-    print(f"📂 Cargando {file_path} en Person")
+    log.info(f"📂 Cargando {file_path} en Person")
 
-    df = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
-    insert_data(df, "Person")
+    with metrics.stage("Person", "read"):
+        df = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
+    insert_data(df, "Person", source="person_0_0.csv")
 
 # 📌 Función para cargar datos en Feedback
 def load_feedback():
     file_path = os.path.join(data_dir, "Feedback.csv")
-    print(f"📂 Cargando {file_path} en Feedback")
-    df = pd.read_csv(file_path, sep="|", dtype=str, quotechar="'", skipinitialspace=True, on_bad_lines="skip")
+    log.info(f"📂 Cargando {file_path} en Feedback")
+    with metrics.stage("Feedback", "read"):
+        df = pd.read_csv(file_path, sep="|", dtype=str, quotechar="'", skipinitialspace=True, on_bad_lines="skip")
     # 🔄 Renombrar columnas
     df.columns = ["productId", "personId", "review"]
     # ✅ Crear un _key único combinando productId y personId
@@ -165,83 +264,128 @@ def load_feedback():
     # ✅ Reorganizar las columnas para que _key vaya primero
     df = df[["_key", "productId", "personId", "review"]]
     # 🔄 Insertar datos en ArangoDB
-    insert_data(df, "Feedback")
+    insert_data(df, "Feedback", source="Feedback.csv")
 
 
-def load_invoice():
-    file_path = os.path.join(data_dir, "Invoice.xml")
-    print(f"📂 Cargando {file_path} en Invoice...")
+# ✅ Documentos por lote al cargar Invoice.xml
+INVOICE_BATCH_SIZE = 50000
 
-    if not os.path.exists(file_path):
-        print(f"❌ Error: Archivo {file_path} no encontrado.")
-        return
+def iter_invoices(file_path):
+    """Recorre Invoice.xml con `iterparse`, validando cada `Invoice` al cerrarse.
 
-    try:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
+    Cada elemento se libera tras procesarlo, así la memoria no crece con el tamaño del archivo.
+    """
+    context = ET.iterparse(file_path, events=("start", "end"))
+    _, root = next(context)
+    skipped = 0
 
-        invoices = []
-        for invoice in root.findall("Invoice"):
-            invoice_data = validate_invoice(invoice)
-            if invoice_data:
-                invoices.append(invoice_data)
+    for event, elem in context:
+        if event != "end" or elem.tag != "Invoice":
+            continue
+        invoice_data = validate_invoice(elem)
+        if invoice_data:
+            yield invoice_data
+        else:
+            skipped += 1
+        # 🧹 Liberar el Invoice y sus ORDER_LINE ya procesados
+        elem.clear()
+        root.clear()
+
+    if skipped:
+        log.warning(f"⚠️ {skipped} invoices no válidos omitidos")
+
+def batch_documents(documents, batch_size):
+    """Agrupa un iterable de documentos en lotes `(offset, lote)` de como mucho `batch_size`."""
+    batch = []
+    offset = 0
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            yield offset, batch
+            offset += len(batch)
+            batch = []
+    if batch:
+        yield offset, batch
+
+def invoice_files():
+    """Invoice.xml, o las partes `Invoice_part_N.xml` que genera `converter.py --split`."""
+    single = os.path.join(data_dir, "Invoice.xml")
+    if os.path.exists(single):
+        return [single]
+    parts = glob.glob(os.path.join(data_dir, "Invoice_part_*.xml"))
+    return sorted(parts, key=lambda path: int(re.search(r"_(\d+)\.xml$", path).group(1)))
 
-        print(f"📊 Total de documentos validados: {len(invoices)}")
-        insert_documents("Invoice", invoices)
+def load_invoice():
+    files = invoice_files()
+    if not files:
+        log.error(f"❌ Error: No se encontró Invoice.xml ni Invoice_part_N.xml en {data_dir}.")
+        return
 
-    except Exception as e:
-        print(f"❌ Error procesando Invoice.xml: {e}")
+    total = 0
+    for file_path in files:
+        log.info(f"📂 Cargando {file_path} en Invoice...")
+        try:
+            # 🔥 Parseo y envío solapados: cada lote sale en cuanto se llena
+            batches = batch_documents(metrics.timed("Invoice", "read", iter_invoices(file_path)), INVOICE_BATCH_SIZE)
+            total += import_batches("Invoice", batches, source=os.path.basename(file_path))
+
+        except (OSError, ET.ParseError) as e:
+            log.error(f"❌ Error procesando {os.path.basename(file_path)}: {e}")
+
+    log.info(f"📊 Total de documentos insertados: {total}")
 
 
 # 📌 Función para cargar datos en Tag
 def load_tag():
     file_path = os.path.join(data_dir, "Tag.csv")
-    print(f"📂 Cargando {file_path} en Tag")
+    log.info(f"📂 Cargando {file_path} en Tag")
 
     if not os.path.exists(file_path):
-        print(f"❌ Error: Archivo {file_path} no encontrado.")
+        log.error(f"❌ Error: Archivo {file_path} no encontrado.")
         return
 
     try:
         # 🔹 Cargar el archivo CSV
-        df = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
+        with metrics.stage("Tag", "read"):
+            df = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
 
         # 🔍 Validar columnas esperadas
         if len(df.columns) != 2:
-            print(f"❌ Error: Se detectaron {len(df.columns)} columnas en lugar de 2.")
+            log.error(f"❌ Error: Se detectaron {len(df.columns)} columnas en lugar de 2.")
             return
 
         # 🔹 Renombrar columnas correctamente
         df.columns = ["_key", "title"]  # `_key` para que ArangoDB lo use como identificador único
 
         # ✅ Insertar datos en ArangoDB
-        insert_data(df, "Tag")
+        insert_data(df, "Tag", source="Tag.csv")
 
     except Exception as e:
-        print(f"❌ Error procesando Tag.csv: {e}")
+        log.error(f"❌ Error procesando Tag.csv: {e}")
 
 # 📌 Función para cargar datos en Vendor
 def load_vendor():
     file_path = os.path.join(data_dir, "Vendor.csv")
-    print(f"📂 Cargando {file_path} en Vendor")
+    log.info(f"📂 Cargando {file_path} en Vendor")
 
     # 📌 Intentar detectar el separador automáticamente
     with open(file_path, "r", encoding="utf-8") as f:
         first_line = f.readline()
         detected_sep = "|" if "|" in first_line else ","
 
-    df = pd.read_csv(
-        file_path, 
-        sep=detected_sep, 
-        dtype=str, 
-        quotechar='"', 
-        skipinitialspace=True, 
-        on_bad_lines="skip"
-    )
+    with metrics.stage("Vendor", "read"):
+        df = pd.read_csv(
+            file_path, 
+            sep=detected_sep, 
+            dtype=str, 
+            quotechar='"', 
+            skipinitialspace=True, 
+            on_bad_lines="skip"
+        )
 
     # 🔍 Validar columnas
     if len(df.columns) != 3:
-        print(f"❌ Error: Se detectaron {len(df.columns)} columnas en lugar de 3.")
+        log.error(f"❌ Error: Se detectaron {len(df.columns)} columnas en lugar de 3.")
         return
 
     df.columns = ["id", "country", "industry"]
@@ -251,107 +395,103 @@ def load_vendor():
     # ✅ Remover la columna `id` (ya que `_key` la sustituye)
     df.drop(columns=["id"], inplace=True)
 
-    # 🔍 Mostrar estructura final antes de insertar
-    print(f"📌 Primeros registros después de la transformación:")
-    print(df.head())
-
     # ✅ Insertar en ArangoDB
-    insert_data(df, "Vendor")
+    insert_data(df, "Vendor", source="Vendor.csv")
 
 
 
 # 📌 Función para cargar datos en Orders
-def load_orders():
-    file_path = os.path.join(data_dir, "Order.json")
-    print(f"📂 Cargando {file_path} en las colecciones de órdenes")
+# ✅ Fecha de corte entre Order_Pre_Pandemic y Order_Post_Pandemic
+PANDEMIC_DATE = "2020-03-11"
 
-    # Leer el archivo JSON completo con json.load
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except Exception as e:
-        print(f"❌ Error al cargar el archivo JSON: {e}")
-        return
+# ✅ Documentos por lote al cargar Order.json (por colección)
+ORDER_BATCH_SIZE = 50000
 
-    print(f"🔍 Total de registros cargados: {len(data)}")
-    if len(data) > 0:
-        print(f"🔍 Ejemplo de registro cargado: {data[0]}")
-    
-    # Asegurar que _key sea igual a OrderId y validar los datos
-    valid_data = []
-    for order in data:
-        # Asignar _key desde OrderId
-        if "OrderId" in order:
-            order["_key"] = order["OrderId"]
-        else:
-            print("❌ Registro sin OrderId detectado, omitiendo:", order)
-            continue
+def validate_order(order):
+    """Asigna `_key` y valida una orden; devuelve None si hay que omitirla."""
+    # Asignar _key desde OrderId
+    if "OrderId" in order:
+        order["_key"] = order["OrderId"]
+    else:
+        log.debug(f"❌ Registro sin OrderId detectado, omitiendo: {order}")
+        return None
 
-        # Validar campos requeridos
-        required_fields = ["PersonId", "OrderDate", "TotalPrice", "Orderline"]
-        missing_fields = [field for field in required_fields if field not in order]
-        if missing_fields:
-            print(f"❌ Registro con campos faltantes ({missing_fields}), omitiendo:", order)
-            continue
+    # Validar campos requeridos
+    required_fields = ["PersonId", "OrderDate", "TotalPrice", "Orderline"]
+    missing_fields = [field for field in required_fields if field not in order]
+    if missing_fields:
+        log.debug(f"❌ Registro con campos faltantes ({missing_fields}), omitiendo: {order}")
+        return None
 
-        # Validar tipos
-        if not isinstance(order["TotalPrice"], (int, float)):
-            print("❌ TotalPrice no es numérico, omitiendo:", order)
-            continue
+    # Validar tipos
+    if not isinstance(order["TotalPrice"], (int, float)):
+        log.debug(f"❌ TotalPrice no es numérico, omitiendo: {order}")
+        return None
 
-        if not isinstance(order["OrderDate"], str):
-            print("❌ OrderDate no es una cadena, omitiendo:", order)
-            continue
+    if not isinstance(order["OrderDate"], str):
+        log.debug(f"❌ OrderDate no es una cadena, omitiendo: {order}")
+        return None
 
-        valid_data.append(order)
+    return order
 
-    print(f"🔍 Total de registros válidos después de la validación: {len(valid_data)}")
-    if len(valid_data) > 0:
-        print(f"🔍 Ejemplo de registro válido: {valid_data[0]}")
+def route_orders(orders, batch_size=ORDER_BATCH_SIZE):
+    """Reparte cada orden válida en Order y en su fragmento pre/post-pandemia en una sola pasada.
 
-    # Definir fecha de la pandemia
-    pandemic_date = "2020-03-11"
+    Genera lotes `(colección, offset, lote)` acotados conforme se llenan, así la inserción
+    empieza mientras se sigue leyendo el archivo.
+    """
+    buffers = {"Order": [], "Order_Pre_Pandemic": [], "Order_Post_Pandemic": []}
+    offsets = dict.fromkeys(buffers, 0)
+    skipped = 0
 
-    # Fragmentar los datos según la fecha
-    data_pre_pandemic = [order for order in valid_data if order["OrderDate"] < pandemic_date]
-    data_post_pandemic = [order for order in valid_data if order["OrderDate"] >= pandemic_date]
+    def flush(collection_name):
+        batch = buffers[collection_name]
+        buffers[collection_name] = []
+        offset = offsets[collection_name]
+        offsets[collection_name] += len(batch)
+        return collection_name, offset, batch
 
-    print(f"🔍 Total registros pre-pandemia: {len(data_pre_pandemic)}")
-    if len(data_pre_pandemic) > 0:
-        print(f"🔍 Ejemplo de registro pre-pandemia: {data_pre_pandemic[0]}")
+    for order in orders:
+        if validate_order(order) is None:
+            skipped += 1
+            continue
+        fragment = "Order_Pre_Pandemic" if order["OrderDate"] < PANDEMIC_DATE else "Order_Post_Pandemic"
+        for collection_name in ("Order", fragment):
+            buffers[collection_name].append(order)
+            if len(buffers[collection_name]) >= batch_size:
+                yield flush(collection_name)
 
-    print(f"🔍 Total registros post-pandemia: {len(data_post_pandemic)}")
-    if len(data_post_pandemic) > 0:
-        print(f"🔍 Ejemplo de registro post-pandemia: {data_post_pandemic[0]}")
+    for collection_name, batch in buffers.items():
+        if batch:
+            yield flush(collection_name)
 
-    # Inserción homogénea para las tres colecciones
-    try:
-        print("⚙️ Insertando en Order")
-        insert_json(valid_data, "Order")
-        print("✅ Insertados en Order")
-    except Exception as e:
-        print(f"❌ Error al insertar en Order: {e}")
+    if skipped:
+        log.warning(f"⚠️ {skipped} órdenes no válidas omitidas (detalle con KHAB_LOG_LEVEL=DEBUG)")
 
-    try:
-        insert_json(data_pre_pandemic, "Order_Pre_Pandemic")
-        print(f"✅ Registros pre-pandemia insertados: {len(data_pre_pandemic)}")
-    except Exception as e:
-        print(f"❌ Error al insertar en Order_Pre_Pandemic: {e}")
+def load_orders():
+    file_path = os.path.join(data_dir, "Order.json")
+    log.info(f"📂 Cargando {file_path} en las colecciones de órdenes")
 
+    # 🔥 Lectura incremental (array JSON o JSON Lines): memoria O(lote), no O(archivo)
     try:
-        insert_json(data_post_pandemic, "Order_Post_Pandemic")
-        print(f"✅ Registros post-pandemia insertados: {len(data_post_pandemic)}")
-    except Exception as e:
-        print(f"❌ Error al insertar en Order_Post_Pandemic: {e}")
+        orders = metrics.timed("Order", "read", iter_json_records(file_path))
+        inserted = import_routed(route_orders(orders), on_duplicate="replace", source="Order.json")
+    except (OSError, ValueError) as e:
+        log.error(f"❌ Error al cargar el archivo JSON: {e}")
+        return
 
+    log.info(f"✅ Registros insertados en Order: {inserted.get('Order', 0)}")
+    log.info(f"✅ Registros pre-pandemia insertados: {inserted.get('Order_Pre_Pandemic', 0)}")
+    log.info(f"✅ Registros post-pandemia insertados: {inserted.get('Order_Post_Pandemic', 0)}")
 
 
 def load_posts():
     file_path = os.path.join(data_dir, "post_0_0.csv")
-    print(f"📂 Cargando {file_path} en las colecciones de Post")
+    log.info(f"📂 Cargando {file_path} en las colecciones de Post")
 
     # Leer el archivo de datos
-    df = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
+    with metrics.stage("Post", "read"):
+        df = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
 
     # Renombrar columnas para alinearlas con el esquema esperado
     df.columns = ["_key", "imageFile", "createDate", "location", "browserUsed", "language", "content", "length"]
@@ -367,34 +507,27 @@ def load_posts():
     df["content"] = df["content"].fillna("")
     df["language"] = df["language"].fillna("unknown")
 
-    # Verificar las primeras filas del DataFrame para garantizar el formato correcto
-    print("🔍 Registros preparados para la carga:")
-    print(df.head())
-
     # Fragmentar los datos según la longitud
     df_short = df[df["length"] < 15]
     df_medium = df[(df["length"] >= 16) & (df["length"] < 100)]
     df_long = df[df["length"] >= 100]
 
     # Insertar todos los datos en la colección global
-    insert_data(df, "Post")
+    insert_data(df, "Post", source="post_0_0.csv")
 
     # Insertar datos fragmentados en las colecciones correspondientes
-
-    print("Ejemplo de datos en Post_Short:", df_short.head())
-    print("Ejemplo de datos en Post_Medium:", df_medium.head())
-    print("Ejemplo de datos en Post_Long:", df_long.head())
-    insert_data(df_short, "Post_Short")
-    insert_data(df_medium, "Post_Medium")
-    insert_data(df_long, "Post_Long")
+    insert_data(df_short, "Post_Short", source="post_0_0.csv")
+    insert_data(df_medium, "Post_Medium", source="post_0_0.csv")
+    insert_data(df_long, "Post_Long", source="post_0_0.csv")
 
 
 def load_products():
     file_path = os.path.join(data_dir, "Product.csv")
-    print(f"📂 Cargando {file_path} en las colecciones de Product")
+    log.info(f"📂 Cargando {file_path} en las colecciones de Product")
 
     # Leer el archivo de datos
-    df = pd.read_csv(file_path, sep=",", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
+    with metrics.stage("Product", "read"):
+        df = pd.read_csv(file_path, sep=",", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
 
     # Convertir la columna price a tipo numérico para aplicar filtros
     df["price"] = pd.to_numeric(df["price"], errors="coerce")
@@ -404,13 +537,13 @@ def load_products():
     df_expensive = df[df["price"] >= 100]
 
     # Insertar todos los datos en la colección global
-    insert_data(df, "Product")
+    insert_data(df, "Product", source="Product.csv")
 
     # Insertar productos baratos en Product_Cheap
-    insert_data(df_cheap, "Product_Cheap")
+    insert_data(df_cheap, "Product_Cheap", source="Product.csv")
 
     # Insertar productos caros en Product_Expensive
-    insert_data(df_expensive, "Product_Expensive")
+    insert_data(df_expensive, "Product_Expensive", source="Product.csv")
 
 
 def load_knows():
@@ -425,49 +558,80 @@ def load_create():
 def load_has():
     load_edge("post_hasTag_tag_0_0.csv", "PostHasTag", "Post/", "Tag/")
 
-# 📌 Vaciado de todas las colecciones antes de la carga
-clear_collection("Customer_North")
-clear_collection("Customer_Center")
-clear_collection("Customer_South")
-clear_collection("Customer")
 
-clear_collection("Person")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Carga de KhaBench en ArangoDB")
+    parser.add_argument("--resume", action="store_true", help="no vacía las colecciones y continúa desde el primer lote no confirmado")
+    parser.add_argument("--parallel", type=int, default=LOAD_PARALLELISM, help="cargas independientes en paralelo (1 = en serie)")
+    parser.add_argument("--coordinators", help="coordinadores separados por comas (por defecto ARANGO_COORDINATORS)")
+    parser.add_argument("--discover", action="store_true", help="añade los coordinadores que publica /_admin/cluster/health")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.coordinators:
+        coordinators = CoordinatorPool(args.coordinators.split(","), DB_NAME, USERNAME, PASSWORD,
+                                       writers=WRITERS_PER_COORDINATOR, cooldown=COORDINATOR_COOLDOWN,
+                                       metrics=metrics)
+    if args.discover:
+        coordinators.discover()
+    log.info(f"📡 Coordinadores: {', '.join(coordinators.hosts)}")
+
+    if not args.resume:
+        ledger.reset()  # 🔥 Carga desde cero: se olvidan los lotes de ejecuciones anteriores
+
+        # 📌 Vaciado de todas las colecciones antes de la carga
+        clear_collection("Customer_North")
+        clear_collection("Customer_Center")
+        clear_collection("Customer_South")
+        clear_collection("Customer")
+
+        clear_collection("Person")
+
+        clear_collection("Feedback")
 
-clear_collection("Feedback")
+        clear_collection("Invoice")
 
-clear_collection("Invoice")
+        clear_collection("Tag")
 
-clear_collection("Tag")
+        clear_collection("Vendor")
 
-clear_collection("Vendor")
+        clear_collection("Order")
+        clear_collection("Order_Pre_Pandemic")
+        clear_collection("Order_Post_Pandemic")
 
-clear_collection("Order")
-clear_collection("Order_Pre_Pandemic")
-clear_collection("Order_Post_Pandemic")
+        clear_collection("Post")
+        clear_collection("Post_Short")
+        clear_collection("Post_Medium")
+        clear_collection("Post_Long")
 
-clear_collection("Post")
-clear_collection("Post_Short")
-clear_collection("Post_Medium")
-clear_collection("Post_Long")
+        clear_collection("Product")
+        clear_collection("Product_Cheap")
+        clear_collection("Product_Expensive")
 
-clear_collection("Product")
-clear_collection("Product_Cheap")
-clear_collection("Product_Expensive")
+    # 🚀 Ejecutar la carga de datos: vértices antes que aristas y Vendor antes que Product
+    scheduler = LoadScheduler(parallelism=args.parallel)
+    scheduler.add("customer", load_customer)
+    scheduler.add("person", load_person)
+    scheduler.add("feedback", load_feedback, after=["customer", "products"])
+    scheduler.add("invoice", load_invoice, after=["orders"])
+    scheduler.add("tag", load_tag)
+    scheduler.add("vendor", load_vendor)
+    scheduler.add("orders", load_orders, after=["customer"])
+    scheduler.add("products", load_products, after=["vendor"])
+    scheduler.add("posts", load_posts)
 
-# 🚀 Ejecutar la carga de datos
-load_customer()
-load_person()
-load_feedback()
-load_invoice()
-load_tag()
-load_vendor()
-load_orders()
-load_products()
-load_posts()
+    scheduler.add("knows", load_knows, after=["customer", "person"])
+    scheduler.add("has_interest", load_has_interest, after=["person", "tag"])
+    scheduler.add("create", load_create, after=["posts", "person"])
+    scheduler.add("has", load_has, after=["posts", "tag"])
+    scheduler.run()
 
-load_knows()
-load_has_interest()
-load_create()
-load_has()
+    # 📊 Métricas por colección y etapa
+    log.info(f"📊 Métricas en {', '.join(metrics.export(default_metrics_path(data_dir, 'arangodb_dataload')))}")
 
-print("🎉 Carga de datos completada.")
\ No newline at end of file
+    if dead_letter_file.count:
+        log.warning(f"⚠️ {dead_letter_file.count} documentos rechazados; detalles en {dead_letter_file.path}")
+    log.info("🎉 Carga de datos completada.")
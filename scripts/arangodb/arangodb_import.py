@@ -0,0 +1,340 @@
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from dead_letter import TransportError
+from load_log import get_logger
+
+
+# ✅ Valores de `onDuplicate` que acepta /_api/import (sustituyen a `overwrite` de insert_many)
+#   "error"   → el documento duplicado se rechaza y aparece en `details`
+#   "update"  → mezcla los atributos con el documento existente
+#   "replace" → reemplaza el documento existente (equivale a overwrite=True)
+#   "ignore"  → no hace nada y lo cuenta como `ignored`
+ON_DUPLICATE = ("error", "update", "replace", "ignore")
+
+# ✅ Tamaño de cada trozo del cuerpo enviado con chunked transfer encoding
+CHUNK_BYTES = 1 << 20
+
+LOG = get_logger("arangodb_import")
+
+_DETAIL = re.compile(r"at position (\d+): (.*)", re.S)
+
+
+class ImportRejected(Exception):
+    """El coordinador rechazó la petición completa (4xx); el lote se puede biseccionar."""
+
+
+class OutcomeUnknown(TransportError):
+    """El lote llegó al coordinador pero no hubo respuesta válida (timeout de lectura o 5xx).
+
+    El coordinador pudo haberlo aplicado: reenviarlo duplicaría los documentos sin `_key`,
+    así que no se reintenta en otro coordinador ni se bisecciona.
+    """
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def document_lines(documents):
+    """Serializa documentos (dicts) como JSON Lines."""
+    for document in documents:
+        yield json.dumps(document, default=_json_default, ensure_ascii=False)
+
+
+def frame_lines(df):
+    """Serializa un DataFrame como JSON Lines en C (`to_json`), con NaN → null."""
+    text = df.to_json(orient="records", lines=True, force_ascii=False)
+    # `to_json` escapa los saltos de línea de los valores: cada "\n" separa un documento
+    return [line for line in text.split("\n") if line]
+
+
+def parse_details(details):
+    """Convierte `details` en `[(posición, error), ...]`; la posición es la línea del lote."""
+    failed = []
+    for detail in details or []:
+        match = _DETAIL.match(detail)
+        if match:
+            failed.append((int(match.group(1)), match.group(2)))
+    return failed
+
+
+class ArangoImporter:
+    """Sink de carga masiva sobre `/_api/import` (JSON Lines, `details=true`).
+
+    El cuerpo se envía en streaming a medida que se serializa, sin construir el lote
+    entero en memoria, y la respuesta solo trae contadores y los documentos con error.
+    Con `metrics` (LoadMetrics) se registran serialize/send/server_ack, bytes y latencia por colección.
+    """
+
+    def __init__(self, host, db_name, username, password, timeout=300, chunk_bytes=CHUNK_BYTES, metrics=None):
+        self.host = host
+        self.metrics = metrics
+        self.url = f"{host}/_db/{db_name}/_api/import"
+        self.timeout = timeout
+        self.chunk_bytes = chunk_bytes
+
+        self.session = requests.Session()
+        self.session.auth = (username, password)
+        self.session.headers.update({"Accept": "application/json", "Content-Type": "application/x-ldjson"})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _body(self, lines, marks):
+        """Trocea las líneas del cuerpo; en `marks` deja el tiempo de serialización, los bytes y el fin."""
+        buffer = []
+        size = 0
+        lines = iter(lines)
+        while True:
+            start = time.perf_counter()
+            line = next(lines, None)
+            marks["serialize"] += time.perf_counter() - start
+            if line is None:
+                break
+            data = line.encode("utf-8") if isinstance(line, str) else line
+            buffer.append(data)
+            buffer.append(b"\n")
+            size += len(data) + 1
+            if size >= self.chunk_bytes:
+                marks["bytes"] += size
+                yield b"".join(buffer)
+                buffer = []
+                size = 0
+        if buffer:
+            marks["bytes"] += size
+            yield b"".join(buffer)
+        marks["sent_at"] = time.perf_counter()
+
+    def _record(self, collection, marks, start, end, failed):
+        if self.metrics is None:
+            return
+        sent_at = marks["sent_at"] or end
+        self.metrics.add_time(collection, "serialize", marks["serialize"])
+        self.metrics.add_time(collection, "send", max(0.0, sent_at - start - marks["serialize"]))
+        self.metrics.add_time(collection, "server_ack", end - sent_at)
+        self.metrics.observe_batch(collection, end - start)
+        self.metrics.count(collection, "bytes", marks["bytes"])
+        self.metrics.count(collection, "batches")
+        if failed:
+            self.metrics.count(collection, "errors")
+
+    def import_lines(self, collection, lines, on_duplicate="error"):
+        """Importa líneas JSON en `collection` y devuelve los contadores de ArangoDB.
+
+        El resultado incluye `failed = [(posición, error), ...]`. Lanza TransportError si la
+        petición no llegó al coordinador (conexión rechazada, timeout al conectar), OutcomeUnknown
+        si llegó pero no hubo respuesta válida (timeout de lectura, 5xx) e ImportRejected si
+        rechazó la petición (4xx).
+        """
+        if on_duplicate not in ON_DUPLICATE:
+            raise ValueError(f"onDuplicate no válido: {on_duplicate}")
+        params = {
+            "collection": collection,
+            "type": "documents",
+            "details": "true",
+            "onDuplicate": on_duplicate,
+        }
+
+        marks = {"serialize": 0.0, "bytes": 0, "sent_at": None}
+        start = time.perf_counter()
+        try:
+            response = self.session.post(self.url, params=params, data=self._body(lines, marks), timeout=self.timeout)
+        except requests.RequestException as e:
+            self._record(collection, marks, start, time.perf_counter(), failed=True)
+            # 📌 Solo es seguro reenviar si el cuerpo no terminó de salir: sin él el servidor no importa nada
+            if isinstance(e, requests.ConnectionError) and marks["sent_at"] is None:
+                raise TransportError(f"{self.host}: {e}")
+            raise OutcomeUnknown(f"{self.host}: {e}")
+        self._record(collection, marks, start, time.perf_counter(), failed=response.status_code >= 400)
+
+        if response.status_code >= 500:
+            raise OutcomeUnknown(f"{self.host} ({response.status_code}): {response.text}")
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("errorMessage", response.text)
+            except ValueError:
+                message = response.text
+            raise ImportRejected(f"({response.status_code}) {message}")
+
+        result = response.json()
+        result["failed"] = parse_details(result.get("details"))
+        return result
+
+    def import_documents(self, collection, documents, on_duplicate="error"):
+        return self.import_lines(collection, document_lines(documents), on_duplicate)
+
+    def import_frame(self, collection, df, on_duplicate="error"):
+        start = time.perf_counter()
+        lines = frame_lines(df)
+        if self.metrics is not None:
+            self.metrics.add_time(collection, "serialize", time.perf_counter() - start)
+        return self.import_lines(collection, lines, on_duplicate)
+
+    def close(self):
+        self.session.close()
+
+
+class CoordinatorPool:
+    """Reparte los lotes entre varios coordinadores de ArangoDB.
+
+    Cada coordinador admite como mucho `writers` lotes en vuelo (backpressure): si todos
+    están ocupados, el siguiente lote espera. Un coordinador que falla por transporte o 5xx
+    se marca caído durante `cooldown` segundos. Su lote solo se reintenta en otro si la
+    petición no llegó a enviarse; si no se sabe si se aplicó (OutcomeUnknown), se propaga.
+    """
+
+    def __init__(self, hosts, db_name, username, password, writers=2, cooldown=30, timeout=300, metrics=None):
+        if not hosts:
+            raise ValueError("Hace falta al menos un coordinador")
+        self.db_name = db_name
+        self.username = username
+        self.password = password
+        self.writers = max(1, writers)
+        self.cooldown = cooldown
+        self.timeout = timeout
+        self.metrics = metrics
+
+        self.importers = {}
+        self.in_flight = {}
+        self.down_until = {}
+        self._next = 0
+        self._cond = threading.Condition()
+        for host in hosts:
+            self.add(host)
+
+    @property
+    def hosts(self):
+        return list(self.importers)
+
+    def add(self, host):
+        host = host.rstrip("/")
+        with self._cond:
+            if host not in self.importers:
+                self.importers[host] = ArangoImporter(host, self.db_name, self.username, self.password, self.timeout,
+                                                     metrics=self.metrics)
+                self.in_flight[host] = 0
+                self.down_until[host] = 0.0
+                self._cond.notify_all()
+
+    def discover(self):
+        """Añade los coordinadores que publica `/_admin/cluster/health`; devuelve la lista final."""
+        for host in self.hosts:
+            try:
+                response = self.importers[host].session.get(f"{host}/_admin/cluster/health", timeout=10)
+                response.raise_for_status()
+                health = response.json().get("Health", {})
+            except (requests.RequestException, ValueError) as e:
+                LOG.warning(f"⚠️ No se pudo consultar la salud del clúster en {host}: {e}")
+                continue
+            for server in health.values():
+                if server.get("Role") == "Coordinator" and server.get("Status", "GOOD") == "GOOD":
+                    endpoint = server.get("Endpoint", "")
+                    self.add(endpoint.replace("tcp://", "http://").replace("ssl://", "https://"))
+            break
+        return self.hosts
+
+    def _acquire(self, exclude):
+        """Reserva un hueco en el coordinador sano menos cargado.
+
+        Espera si todos están llenos o caídos; devuelve None si ya se probaron todos.
+        """
+        with self._cond:
+            while True:
+                candidates = [h for h in self.importers if h not in exclude]
+                if not candidates:
+                    return None
+                now = time.monotonic()
+                free = [h for h in candidates if self.down_until[h] <= now and self.in_flight[h] < self.writers]
+                if free:
+                    # Menos lotes en vuelo primero; a igualdad, turno rotatorio
+                    self._next = (self._next + 1) % len(free)
+                    rotated = free[self._next:] + free[:self._next]
+                    host = min(rotated, key=lambda h: self.in_flight[h])
+                    self.in_flight[host] += 1
+                    return host
+                recovery = min(self.down_until[h] for h in candidates) - now
+                self._cond.wait(timeout=min(max(recovery, 0.05), 1.0))
+
+    def _release(self, host, failed):
+        with self._cond:
+            self.in_flight[host] -= 1
+            if failed:
+                self.down_until[host] = time.monotonic() + self.cooldown
+                LOG.warning(f"⚠️ Coordinador {host} marcado como caído durante {self.cooldown} s")
+            self._cond.notify_all()
+
+    def _import(self, method, collection, data, on_duplicate):
+        tried = set()
+        last_error = None
+        while True:
+            host = self._acquire(tried)
+            if host is None:
+                raise last_error or TransportError("No hay coordinadores disponibles")
+            tried.add(host)
+            try:
+                result = getattr(self.importers[host], method)(collection, data, on_duplicate)
+            except OutcomeUnknown:
+                self._release(host, failed=True)
+                raise  # 🔥 Pudo haberse aplicado: reenviarlo en otro coordinador lo duplicaría
+            except TransportError as e:
+                self._release(host, failed=True)
+                last_error = e
+                continue
+            except BaseException:
+                self._release(host, failed=False)
+                raise
+            self._release(host, failed=False)
+            return result
+
+    def import_documents(self, collection, documents, on_duplicate="error"):
+        return self._import("import_documents", collection, documents, on_duplicate)
+
+    def import_frame(self, collection, df, on_duplicate="error"):
+        return self._import("import_frame", collection, df, on_duplicate)
+
+    def stream(self, jobs):
+        """Ejecuta `(contexto, función, args)` en paralelo, con tantos escritores como huecos haya.
+
+        Devuelve `(contexto, resultado)` conforme terminan, en el hilo del llamador;
+        si la función lanzó TransportError (u OutcomeUnknown), el resultado es esa excepción.
+        """
+        workers = self.writers * len(self.importers)
+        in_flight = {}
+        jobs = iter(jobs)
+        exhausted = False
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                while not exhausted and len(in_flight) < workers:
+                    try:
+                        context, func, args = next(jobs)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    in_flight[pool.submit(func, *args)] = context
+
+                if not in_flight:
+                    return
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    context = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except TransportError as e:
+                        result = e
+                    yield context, result
+
+    def close(self):
+        for importer in self.importers.values():
+            importer.close()
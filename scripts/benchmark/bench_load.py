@@ -0,0 +1,160 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from stub_server import StubServer
+
+
+# ✅ Benchmark de carga sin clúster: cada cargador corre en su propio proceso contra el stub
+# y se mide por entidad registros/s, bytes/s, tiempo de CPU y pico de RSS del proceso.
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 📌 (motor, entidad, directorio del módulo, módulo, llamada, archivos necesarios)
+# Las rutas son relativas a <data-dir>/Dataset (OrientDB) y <data-dir>/Global (ArangoDB),
+# el mismo formato que escribe generate_dataset.py.
+TASKS = [
+    ("orientdb", "Customer+Person", "orientdb", "orientdb_dataload", "load_customer_person_data()", ["Customer/person_0_0.csv"]),
+    ("orientdb", "Vendor", "orientdb", "orientdb_dataload", "load_vendor_data('Vendor', 'Vendor/Vendor.csv')", ["Vendor/Vendor.csv"]),
+    ("orientdb", "Product", "orientdb", "orientdb_dataload", "load_product_data('Product', 'Product/Product.csv')", ["Product/Product.csv"]),
+    ("orientdb", "Feedback", "orientdb", "orientdb_dataload", "load_feedback_data()", ["Feedback/Feedback.csv"]),
+    ("orientdb", "Post", ".", "fixer", "load_post_data('Post', 'post_0_0.csv')", ["SocialNetwork/post_0_0.csv"]),
+    ("orientdb", "Tag", ".", "fixer", "load_tag('TAG', 'tag.csv')", ["SocialNetwork/tag.csv"]),
+    ("orientdb", "CustomerKnowsPerson", ".", "fixer", "load_customer_knows_person()", ["SocialNetwork/person_knows_person_0_0.csv"]),
+    ("orientdb", "PostHasCreator", ".", "fixer", "load_post_has_creator()", ["SocialNetwork/post_hasCreator_person_0_0.csv"]),
+    ("orientdb", "PostHasTag", ".", "fixer", "load_post_has_tag()", ["SocialNetwork/post_hasTag_tag_0_0.csv"]),
+    ("orientdb", "PersonHasInterestTag", ".", "fixer", "load_person_has_interest_tag()", ["SocialNetwork/person_hasInterest_tag_0_0.csv"]),
+
+    ("arangodb", "Customer", "arangodb", "arangodb_dataload", "load_customer()", ["person_0_0.csv"]),
+    ("arangodb", "Person", "arangodb", "arangodb_dataload", "load_person()", ["person_0_0.csv"]),
+    ("arangodb", "Feedback", "arangodb", "arangodb_dataload", "load_feedback()", ["Feedback.csv"]),
+    ("arangodb", "Invoice", "arangodb", "arangodb_dataload", "load_invoice()", ["Invoice.xml"]),
+    ("arangodb", "Tag", "arangodb", "arangodb_dataload", "load_tag()", ["Tag.csv"]),
+    ("arangodb", "Vendor", "arangodb", "arangodb_dataload", "load_vendor()", ["Vendor.csv"]),
+    ("arangodb", "Order", "arangodb", "arangodb_dataload", "load_orders()", ["Order.json"]),
+    ("arangodb", "Product", "arangodb", "arangodb_dataload", "load_products()", ["Product.csv"]),
+    ("arangodb", "Post", "arangodb", "arangodb_dataload", "load_posts()", ["post_0_0.csv"]),
+    ("arangodb", "CustomerKnowsPerson", "arangodb", "arangodb_dataload", "load_knows()", ["person_knows_person_0_0.csv"]),
+    ("arangodb", "PersonHasInterestTag", "arangodb", "arangodb_dataload", "load_has_interest()", ["person_hasInterest_tag_0_0.csv"]),
+    ("arangodb", "PostHasCreatorPerson", "arangodb", "arangodb_dataload", "load_create()", ["post_hasCreator_person_0_0.csv"]),
+    ("arangodb", "PostHasTag", "arangodb", "arangodb_dataload", "load_has()", ["post_hasTag_tag_0_0.csv"]),
+]
+
+ENGINE_DATA = {"orientdb": "Dataset", "arangodb": "Global"}
+
+
+def run_task(module_dir, module, call, env, log_path):
+    """Ejecuta `module.call` en un proceso hijo; devuelve `(código, segundos, cpu, rss_mb)`."""
+    code = f"import {module}; {module}.{call}"
+    cwd = os.path.join(SCRIPTS_DIR, module_dir)
+    with open(log_path, "ab") as log:
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, "-c", code], cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    cpu = usage.ru_utime + usage.ru_stime
+    rss_mb = usage.ru_maxrss / 1024  # KiB en Linux
+    return proc.returncode, elapsed, cpu, rss_mb
+
+
+def run_benchmark(data_dir, engines, work_dir, only=None, **stub_options):
+    results = []
+    with StubServer(**stub_options) as stub:
+        env = dict(
+            os.environ,
+            KHAB_ORIENTDB_HOST=stub.url,
+            KHAB_ARANGO_COORDINATORS=stub.url,
+            KHAB_LEDGER=os.path.join(work_dir, "load_ledger.sqlite"),
+            KHAB_RID_INDEX=os.path.join(work_dir, "rid_index.sqlite"),
+            KHAB_DEAD_LETTER=os.path.join(work_dir, "dead_letter.jsonl"),
+            PYTHONUNBUFFERED="1",
+        )
+        print(f"🚀 Stub en {stub.url}; registros de los cargadores en {work_dir}")
+
+        for engine, entity, module_dir, module, call, files in TASKS:
+            if engine not in engines or (only and entity not in only):
+                continue
+            engine_data = os.path.join(data_dir, ENGINE_DATA[engine])
+            missing = [f for f in files if not os.path.exists(os.path.join(engine_data, f))]
+            if missing:
+                print(f"⏭️ {engine}/{entity}: faltan {', '.join(missing)}")
+                continue
+
+            before = stub.state.snapshot()
+            code, elapsed, cpu, rss_mb = run_task(
+                module_dir, module, call, dict(env, KHAB_DATA_DIR=engine_data),
+                os.path.join(work_dir, f"{engine}.log"),
+            )
+            after = stub.state.snapshot()
+
+            records = sum(after["records"].values()) - sum(before["records"].values())
+            sent = after["bytes"] - before["bytes"]
+            result = {
+                "engine": engine,
+                "entity": entity,
+                "ok": code == 0,
+                "seconds": round(elapsed, 3),
+                "records": records,
+                "records_per_sec": round(records / elapsed, 1) if elapsed else 0.0,
+                "bytes": sent,
+                "bytes_per_sec": round(sent / elapsed, 1) if elapsed else 0.0,
+                "requests": after["requests"] - before["requests"],
+                "injected_errors": after["errors"] - before["errors"],
+                "cpu_seconds": round(cpu, 3),
+                "peak_rss_mb": round(rss_mb, 1),
+            }
+            results.append(result)
+            status = "✅" if result["ok"] else "❌"
+            print(f"{status} {engine}/{entity}: {records} registros en {elapsed:.2f} s "
+                  f"({result['records_per_sec']:.0f} reg/s, {sent / elapsed / 1e6 if elapsed else 0:.2f} MB/s, "
+                  f"CPU {cpu:.2f} s, RSS {rss_mb:.0f} MB)")
+    return results
+
+
+def print_table(results):
+    header = f"{'motor':<9} {'entidad':<22} {'reg':>9} {'reg/s':>10} {'MB/s':>8} {'CPU s':>8} {'RSS MB':>8}"
+    print("📊 Resultados:")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['engine']:<9} {r['entity']:<22} {r['records']:>9} {r['records_per_sec']:>10.0f} "
+              f"{r['bytes_per_sec'] / 1e6:>8.2f} {r['cpu_seconds']:>8.2f} {r['peak_rss_mb']:>8.1f}"
+              + ("" if r["ok"] else "  ❌"))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de throughput de los cargadores contra un stub local")
+    parser.add_argument("data_dir", help="raíz del dataset (con Dataset/ para OrientDB y Global/ para ArangoDB)")
+    parser.add_argument("--engine", choices=["orientdb", "arangodb"], action="append",
+                        help="motor a medir (por defecto, ambos)")
+    parser.add_argument("--entity", action="append", help="medir solo estas entidades")
+    parser.add_argument("--latency", type=float, default=0.0, help="latencia del stub por petición (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="variación de la latencia (±s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fracción de peticiones con 503")
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="fracción de registros rechazados (siempre los mismos)")
+    parser.add_argument("--seed", type=int, default=42, help="semilla de la inyección de fallos")
+    parser.add_argument("--work-dir", help="directorio para ledger, índice de RIDs y logs (por defecto, temporal)")
+    parser.add_argument("--json", help="guarda los resultados en este archivo JSON")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="khab_bench_")
+    os.makedirs(work_dir, exist_ok=True)
+
+    results = run_benchmark(
+        args.data_dir, set(args.engine or ENGINE_DATA), work_dir, only=set(args.entity or []),
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        reject_rate=args.reject_rate, seed=args.seed,
+    )
+    print_table(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Resultados guardados en {args.json}")
@@ -0,0 +1,400 @@
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "orientdb"))
+from orientdb_client import OrientDBExecutor
+from transforms import PLACE_FRAGMENTS
+from generate_dataset import (CHEAP_PRICE, MAX_PLACE, ORDER_END, ORDER_START, PANDEMIC_DATE,
+                              POST_FRAGMENTS, SEED, scaled_counts)
+from stub_server import StubServer
+
+
+# ✅ Benchmark de latencia de consultas: colección global frente a sus fragmentos
+# Cada consulta del catálogo tiene una forma OrientDB (SQL/MATCH) y otra AQL con `{collection}`;
+# la variante "global" la ejecuta sobre la colección completa y la variante "fragment" sobre
+# el fragmento que cubre los parámetros (o sobre todos, unidos, si la consulta no se puede enrutar).
+ORIENTDB_HOST = os.environ.get("KHAB_ORIENTDB_HOST", "http://localhost:2480")
+ORIENTDB_USER = ("root", "rootpwd")
+ARANGO_HOST = os.environ.get("KHAB_ARANGO_COORDINATORS", "http://127.0.0.1:7101").split(",")[0]
+ARANGO_USER = ("root", "")
+DB_NAME = "KhaBench"
+
+# ✅ Valores por defecto del runner
+THREADS = 8
+REQUESTS = 200
+WARMUP = 10
+RESULT_LIMIT = 1000
+REQUEST_TIMEOUT = 60
+
+# 📌 Anchura de los rangos y longitud máxima de Post (la de generate_dataset.py)
+PLACE_WIDTH = 20
+PRICE_WIDTH = 5
+LENGTH_WIDTH = 3
+DATE_WIDTH = 30
+MAX_POST_LENGTH = 400
+
+CUSTOMER_FRAGMENTS = {f"Customer_{suffix}": (low, MAX_PLACE if high is None else high)
+                      for suffix, (low, high) in PLACE_FRAGMENTS.items()}
+POST_LENGTH_FRAGMENTS = {f"Post_{name.capitalize()}": (low, MAX_POST_LENGTH if high is None else high)
+                         for name, (low, high) in POST_FRAGMENTS.items()}
+PRODUCT_FRAGMENTS = {"Product_Cheap": (1, CHEAP_PRICE), "Product_Expensive": (CHEAP_PRICE, 500)}
+PANDEMIC = date.fromisoformat(PANDEMIC_DATE)
+ORDER_FRAGMENTS = {"Order_Pre_Pandemic": (ORDER_START, PANDEMIC), "Order_Post_Pandemic": (PANDEMIC, ORDER_END)}
+
+
+# 📌 Generadores de parámetros: (rng, conteos) → (parámetros, fragmentos que los cubren)
+def customer_id(rng, counts):
+    return {"id": str(rng.randint(1, counts["person"]))}, list(CUSTOMER_FRAGMENTS)
+
+
+def post_id(rng, counts):
+    return {"id": str(rng.randint(1, counts["post"]))}, list(POST_LENGTH_FRAGMENTS)
+
+
+def place_range(rng, counts):
+    fragment = rng.choice(list(CUSTOMER_FRAGMENTS))
+    low, high = CUSTOMER_FRAGMENTS[fragment]
+    start = rng.randint(low, max(low, high - PLACE_WIDTH))
+    return {"low": start, "high": min(high, start + PLACE_WIDTH)}, [fragment]
+
+
+def price_range(rng, counts):
+    fragment = rng.choice(list(PRODUCT_FRAGMENTS))
+    low, high = PRODUCT_FRAGMENTS[fragment]
+    start = rng.randint(low, high - PRICE_WIDTH)
+    return {"low": start, "high": start + PRICE_WIDTH}, [fragment]
+
+
+def length_range(rng, counts):
+    fragment = rng.choice(list(POST_LENGTH_FRAGMENTS))
+    low, high = POST_LENGTH_FRAGMENTS[fragment]
+    start = rng.randint(low, max(low, high - LENGTH_WIDTH))
+    return {"low": start, "high": min(high, start + LENGTH_WIDTH)}, [fragment]
+
+
+def date_range(rng, counts):
+    fragment = rng.choice(list(ORDER_FRAGMENTS))
+    low, high = ORDER_FRAGMENTS[fragment]
+    start = low + timedelta(days=rng.randrange(max(1, (high - low).days - DATE_WIDTH)))
+    end = min(high, start + timedelta(days=DATE_WIDTH))
+    return {"start": start.isoformat(), "end": end.isoformat()}, [fragment]
+
+
+# 📌 Catálogo: lookups puntuales, rangos sobre PLACE/precio/longitud/fecha, joins y recorridos
+WORKLOAD = [
+    {
+        "name": "customer_by_id", "kind": "point", "collection": "Customer", "params": customer_id,
+        "orientdb": "SELECT FROM {collection} WHERE CUSTOMER_ID = {id}",
+        "arangodb": "FOR c IN {collection} FILTER c.id == @id RETURN c",
+    },
+    {
+        "name": "post_by_id", "kind": "point", "collection": "Post", "params": post_id,
+        "orientdb": "SELECT FROM {collection} WHERE POST_ID = {id}",
+        "arangodb": "FOR p IN {collection} FILTER p._key == @id RETURN p",
+    },
+    {
+        "name": "customers_by_place", "kind": "range", "collection": "Customer", "params": place_range,
+        "orientdb": "SELECT FROM {collection} WHERE PLACE BETWEEN {low} AND {high} LIMIT {limit}",
+        "arangodb": "FOR c IN {collection} FILTER c.place >= @low AND c.place <= @high LIMIT @limit RETURN c",
+    },
+    {
+        "name": "products_by_price", "kind": "range", "collection": "Product", "params": price_range,
+        "orientdb": "SELECT FROM {collection} WHERE PRICE >= {low} AND PRICE < {high} LIMIT {limit}",
+        "arangodb": "FOR p IN {collection} FILTER p.price >= @low AND p.price < @high LIMIT @limit RETURN p",
+    },
+    {
+        "name": "posts_by_length", "kind": "range", "collection": "Post", "params": length_range,
+        "orientdb": "SELECT FROM {collection} WHERE LENGTH BETWEEN {low} AND {high} LIMIT {limit}",
+        "arangodb": "FOR p IN {collection} FILTER p.length >= @low AND p.length <= @high LIMIT @limit RETURN p",
+    },
+    {
+        "name": "orders_by_date", "kind": "range", "collection": "Order", "params": date_range,
+        "orientdb": "SELECT FROM {collection} WHERE ORDER_DATE >= {start} AND ORDER_DATE < {end} LIMIT {limit}",
+        "arangodb": "FOR o IN {collection} FILTER o.OrderDate >= @start AND o.OrderDate < @end LIMIT @limit RETURN o",
+    },
+    {
+        "name": "orders_with_customer", "kind": "join", "collection": "Order", "params": date_range,
+        "orientdb": "SELECT ORDER_ID, TOTAL_PRICE, CUSTOMER_ID.PLACE AS PLACE FROM {collection} "
+                    "WHERE ORDER_DATE >= {start} AND ORDER_DATE < {end} LIMIT {limit}",
+        "arangodb": "FOR o IN {collection} FILTER o.OrderDate >= @start AND o.OrderDate < @end LIMIT @limit "
+                    "FOR c IN Customer FILTER c.id == o.PersonId "
+                    "RETURN {{order: o._key, total: o.TotalPrice, place: c.place}}",
+    },
+    {
+        "name": "feedback_by_price", "kind": "join", "collection": "Product", "params": price_range,
+        "orientdb": "SELECT FROM Feedback WHERE PRODUCT_ID.PRODUCT_ID IN "
+                    "(SELECT PRODUCT_ID FROM {collection} WHERE PRICE >= {low} AND PRICE < {high}) LIMIT {limit}",
+        "arangodb": "FOR p IN {collection} FILTER p.price >= @low AND p.price < @high "
+                    "FOR f IN Feedback FILTER f.productId == p.asin LIMIT @limit RETURN f",
+    },
+    {
+        "name": "post_tags", "kind": "traversal", "collection": "Post", "params": length_range,
+        "orientdb": "MATCH {{class: Post, as: p, where: (POST_ID IN (SELECT POST_ID FROM {collection} "
+                    "WHERE LENGTH BETWEEN {low} AND {high} LIMIT {limit}))}}.out('POST_HAS_TAG'){{as: t}} "
+                    "RETURN p.POST_ID, t.TITLE",
+        "arangodb": "FOR p IN {collection} FILTER p.length >= @low AND p.length <= @high LIMIT @limit "
+                    "FOR t IN 1..1 OUTBOUND CONCAT('Post/', p._key) PostHasTag RETURN {{post: p._key, tag: t.title}}",
+    },
+    {
+        "name": "customer_friends", "kind": "traversal", "collection": "Customer", "params": place_range,
+        "orientdb": "MATCH {{class: Customer, as: c, where: (CUSTOMER_ID IN (SELECT CUSTOMER_ID FROM {collection} "
+                    "WHERE PLACE BETWEEN {low} AND {high} LIMIT {limit}))}}.out('CUSTOMER_KNOWS_PERSON'){{as: p}} "
+                    "RETURN c.CUSTOMER_ID, p.PERSON_ID",
+        "arangodb": "FOR c IN {collection} FILTER c.place >= @low AND c.place <= @high LIMIT @limit "
+                    "FOR e IN CustomerKnowsPerson FILTER e._from == CONCAT('Customer/', c.id) "
+                    "RETURN {{customer: c.id, person: e._to}}",
+    },
+]
+
+
+def _literal(value):
+    if isinstance(value, str):
+        return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+    return str(value)
+
+
+def orientdb_query(template, collections, params):
+    """SQL con los parámetros en línea; varios fragmentos se unen con `unionall`."""
+    literals = {k: _literal(v) for k, v in params.items()}
+    if len(collections) == 1:
+        return template.format(collection=collections[0], **literals), None
+    parts = [f"$f{i} = ({template.format(collection=c, **literals)})" for i, c in enumerate(collections)]
+    union = ", ".join(f"$f{i}" for i in range(len(collections)))
+    return f"SELECT expand(unionall({union})) LET {', '.join(parts)}", None
+
+
+def arangodb_query(template, collections, params):
+    """AQL con bind parameters; varios fragmentos se unen con `UNION`."""
+    if len(collections) == 1:
+        query = template.format(collection=collections[0])
+    else:
+        parts = ", ".join(f"({template.format(collection=c)})" for c in collections)
+        query = f"FOR doc IN UNION({parts}) RETURN doc"
+    used = set(re.findall(r"@(\w+)", query))
+    return query, {k: v for k, v in params.items() if k in used}
+
+
+class ArangoCursor:
+    """Cliente mínimo de `/_api/cursor`: devuelve el resultado completo de una consulta AQL."""
+
+    def __init__(self, host, db_name, username, password, pool_size=THREADS, timeout=REQUEST_TIMEOUT):
+        self.url = f"{host}/_db/{db_name}/_api/cursor"
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.auth = (username, password)
+        self.session.headers.update({"Accept": "application/json", "Content-Type": "application/json"})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def execute(self, query, bind_vars=None):
+        body = {"query": query, "bindVars": bind_vars or {}, "batchSize": RESULT_LIMIT}
+        response = self.session.post(self.url, json=body, timeout=self.timeout)
+        if response.status_code >= 400:
+            raise RuntimeError(f"({response.status_code}) {response.text}")
+        data = response.json()
+        result = data.get("result", [])
+        while data.get("hasMore"):
+            response = self.session.put(f"{self.url}/{data['id']}", timeout=self.timeout)
+            if response.status_code >= 400:
+                raise RuntimeError(f"({response.status_code}) {response.text}")
+            data = response.json()
+            result.extend(data.get("result", []))
+        return result
+
+    def close(self):
+        self.session.close()
+
+
+class OrientQuery:
+    """Adaptador de OrientDBExecutor: una consulta de solo lectura, sin reintentos."""
+
+    def __init__(self, host, db_name, username, password, pool_size=THREADS, timeout=REQUEST_TIMEOUT):
+        self.executor = OrientDBExecutor(host, db_name, username, password, concurrency=pool_size,
+                                         timeout=timeout, retries=0)
+
+    def execute(self, query, bind_vars=None):
+        response = self.executor.execute(query)
+        if not response or "errors" in response:
+            raise RuntimeError(response["errors"] if response else "sin respuesta")
+        return response.get("result", [])
+
+    def close(self):
+        self.executor.close()
+
+
+def percentile(values, q):
+    """Percentil por rango más cercano sobre una lista ordenada."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def run_variant(client, queries, threads, warmup=WARMUP):
+    """Ejecuta `queries` con `threads` hilos cliente; devuelve latencias (s), errores, filas y segundos.
+
+    Las primeras `warmup` consultas solo calientan cachés y conexiones y no se miden.
+    """
+    queries, measured = queries[:warmup], queries[warmup:]
+    for query, bind_vars in queries:
+        try:
+            client.execute(query, bind_vars)
+        except Exception:
+            pass
+
+    latencies = []
+    rows = []
+    errors = []
+    position = iter(range(len(measured)))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                i = next(position, None)
+            if i is None:
+                return
+            query, bind_vars = measured[i]
+            start = time.perf_counter()
+            try:
+                result = client.execute(query, bind_vars)
+            except Exception as e:
+                errors.append(str(e))
+                continue
+            latencies.append(time.perf_counter() - start)
+            rows.append(len(result))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for future in [pool.submit(worker) for _ in range(threads)]:
+            future.result()
+    return sorted(latencies), errors, rows, time.perf_counter() - start
+
+
+def run_benchmark(clients, workload, counts, requests_per_variant=REQUESTS, threads=THREADS,
+                  warmup=WARMUP, limit=RESULT_LIMIT, seed=SEED):
+    results = []
+    builders = {"orientdb": orientdb_query, "arangodb": arangodb_query}
+    for spec in workload:
+        # ✅ Mismos parámetros para ambas variantes y ambos motores
+        rng = random.Random(f"{seed}:{spec['name']}")
+        drawn = [spec["params"](rng, counts) for _ in range(requests_per_variant + warmup)]
+
+        for engine, client in clients.items():
+            for variant in ("global", "fragment"):
+                queries = []
+                for params, fragments in drawn:
+                    collections = [spec["collection"]] if variant == "global" else fragments
+                    queries.append(builders[engine](spec[engine], collections, dict(params, limit=limit)))
+
+                latencies, errors, rows, elapsed = run_variant(client, queries, threads, warmup)
+                result = {
+                    "engine": engine,
+                    "query": spec["name"],
+                    "kind": spec["kind"],
+                    "variant": variant,
+                    "threads": threads,
+                    "requests": len(latencies) + len(errors),
+                    "errors": len(errors),
+                    "rows_mean": round(sum(rows) / len(rows), 1) if rows else 0.0,
+                    "seconds": round(elapsed, 3),
+                    "throughput_qps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+                    "latency_ms": {
+                        "p50": round(percentile(latencies, 50) * 1000, 3),
+                        "p95": round(percentile(latencies, 95) * 1000, 3),
+                        "p99": round(percentile(latencies, 99) * 1000, 3),
+                        "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+                    },
+                }
+                if errors:
+                    result["first_error"] = errors[0][:500]
+                results.append(result)
+                status = "✅" if not errors else "⚠️"
+                print(f"{status} {engine}/{spec['name']}/{variant}: p50 {result['latency_ms']['p50']:.2f} ms, "
+                      f"p99 {result['latency_ms']['p99']:.2f} ms, {result['throughput_qps']:.0f} q/s, "
+                      f"{len(errors)} errores")
+    return results
+
+
+def print_table(results):
+    header = f"{'motor':<9} {'consulta':<22} {'variante':<9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'q/s':>9} {'err':>5}"
+    print("📊 Resultados:")
+    print(header)
+    print("-" * len(header))
+    p50 = {}
+    for r in results:
+        lat = r["latency_ms"]
+        p50[(r["engine"], r["query"], r["variant"])] = lat["p50"]
+        print(f"{r['engine']:<9} {r['query']:<22} {r['variant']:<9} {lat['p50']:>9.2f} {lat['p95']:>9.2f} "
+              f"{lat['p99']:>9.2f} {r['throughput_qps']:>9.0f} {r['errors']:>5}")
+
+    print("📊 Aceleración del fragmento (p50 global / p50 fragmento):")
+    for (engine, query, variant), value in p50.items():
+        fragment = p50.get((engine, query, "fragment"))
+        if variant == "global" and fragment:
+            print(f"   {engine}/{query}: x{value / fragment:.2f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Latencia de consultas sobre colecciones globales y fragmentos")
+    parser.add_argument("--engine", choices=["orientdb", "arangodb"], action="append",
+                        help="motor a medir (por defecto, ambos)")
+    parser.add_argument("--query", action="append", choices=[spec["name"] for spec in WORKLOAD],
+                        help="consultas del catálogo a ejecutar (por defecto, todas)")
+    parser.add_argument("--threads", type=int, default=THREADS, help="hilos cliente concurrentes")
+    parser.add_argument("--requests", type=int, default=REQUESTS, help="consultas medidas por variante")
+    parser.add_argument("--warmup", type=int, default=WARMUP, help="consultas de calentamiento por variante")
+    parser.add_argument("--limit", type=int, default=RESULT_LIMIT, help="LIMIT de los rangos, joins y recorridos")
+    parser.add_argument("--scale", type=float, default=1.0, help="factor de escala del dataset cargado")
+    parser.add_argument("--seed", type=int, default=SEED, help="semilla de los parámetros")
+    parser.add_argument("--orientdb-host", default=ORIENTDB_HOST)
+    parser.add_argument("--arangodb-host", default=ARANGO_HOST)
+    parser.add_argument("--stub", action="store_true", help="ejecuta contra el stub local (prueba del runner)")
+    parser.add_argument("--json", help="guarda los resultados en este archivo JSON")
+    return parser.parse_args()
+
+
+def main(args, orientdb_host, arangodb_host):
+    engines = args.engine or ["orientdb", "arangodb"]
+    workload = [spec for spec in WORKLOAD if not args.query or spec["name"] in args.query]
+    clients = {}
+    if "orientdb" in engines:
+        clients["orientdb"] = OrientQuery(orientdb_host, DB_NAME, *ORIENTDB_USER, pool_size=args.threads)
+    if "arangodb" in engines:
+        clients["arangodb"] = ArangoCursor(arangodb_host, DB_NAME, *ARANGO_USER, pool_size=args.threads)
+
+    try:
+        results = run_benchmark(clients, workload, scaled_counts(args.scale), args.requests, args.threads,
+                                args.warmup, args.limit, args.seed)
+    finally:
+        for client in clients.values():
+            client.close()
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Resultados guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.stub:
+        with StubServer() as stub:
+            main(args, stub.url, stub.url)
+    else:
+        main(args, args.orientdb_host, args.arangodb_host)
@@ -0,0 +1,411 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "orientdb"))
+from converter import InvoiceWriter
+from transforms import PLACE_FRAGMENTS
+
+
+# ✅ Generador determinista del dataset de KhaBench a un factor de escala (SF)
+# Escribe <salida>/Dataset (formato de los cargadores de OrientDB) y <salida>/Global
+# (formato de arangodb_dataload.py), con las mismas columnas, separadores y fragmentos.
+# La misma semilla y SF producen los mismos archivos, con cualquier número de procesos.
+
+# 📌 Registros por entidad a SF1
+BASE_COUNTS = {
+    "person": 10000,
+    "vendor": 1000,
+    "product": 10000,
+    "tag": 1000,
+    "post": 100000,
+    "order": 150000,
+    "feedback": 150000,
+}
+
+# ✅ Grado medio de las aristas por vértice de origen
+KNOWS_PER_PERSON = 10
+INTERESTS_PER_PERSON = 3
+MAX_TAGS_PER_POST = 3
+MAX_ORDER_LINES = 5
+
+# ✅ Registros por tarea del pool (fija el reparto de la semilla, no depende de los procesos)
+SHARD_ROWS = 50000
+SEED = 42
+
+# 📌 Fragmentos de los cargadores: Product (arangodb_dataload.load_products),
+# Post (load_posts, 15 no cae en ningún fragmento) y Order (PANDEMIC_DATE)
+CHEAP_PRICE = 100
+POST_FRAGMENTS = {"short": (0, 14), "medium": (16, 99), "long": (100, None)}
+PANDEMIC_DATE = "2020-03-11"
+MAX_PLACE = 1500
+
+FIRST_NAMES = ["Ana", "Luis", "Carmen", "José", "María", "Jorge", "Lucía", "Pedro", "Sofía", "Diego",
+               "Elena", "Pablo", "Laura", "Andrés", "Marta", "Raúl", "Paula", "Hugo", "Irene", "Iván"]
+LAST_NAMES = ["García", "López", "Martínez", "Sánchez", "Pérez", "Gómez", "Ruiz", "Díaz", "Moreno", "Muñoz",
+              "Álvarez", "Romero", "Navarro", "Torres", "Ramos", "Gil", "Vargas", "Castro", "Ortiz", "Rubio"]
+BROWSERS = ["Firefox", "Chrome", "Safari", "Internet Explorer", "Opera"]
+LANGUAGES = ["es", "en", "pt", "fr", "de"]
+COUNTRIES = ["Mexico", "Spain", "Chile", "Argentina", "Colombia", "Peru", "United_States", "Germany", "China", "Japan"]
+INDUSTRIES = ["Sports", "Clothing", "Electronics", "Home", "Toys", "Books", "Beauty", "Food"]
+WORDS = ["great", "product", "quality", "price", "fast", "shipping", "good", "bad", "love", "nice",
+         "cheap", "recommend", "works", "broken", "size", "color", "perfect", "again", "never", "value"]
+ADJECTIVES = ["Classic", "Pro", "Ultra", "Mini", "Smart", "Eco", "Max", "Lite", "Prime", "Flex"]
+ITEMS = ["Shoes", "Shirt", "Phone", "Lamp", "Ball", "Book", "Watch", "Bag", "Chair", "Cup"]
+
+EPOCH = datetime(2010, 1, 1)
+ORDER_START = date(2018, 1, 1)
+ORDER_END = date(2022, 12, 31)
+ORDER_DAYS = (ORDER_END - ORDER_START).days + 1
+
+_MASK = (1 << 64) - 1
+
+
+def _mix(seed, n):
+    """splitmix64: entero pseudoaleatorio estable para `(seed, n)` sin estado compartido."""
+    z = (seed * 0x9E3779B97F4A7C15 + n + 1) & _MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return z ^ (z >> 31)
+
+
+def _timestamp(rng, days):
+    moment = EPOCH + timedelta(seconds=rng.randrange(days * 86400))
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+
+
+def _in_range(value, bounds):
+    low, high = bounds
+    return value >= low and (high is None or value <= high)
+
+
+def product_row(n, seed, counts):
+    """Atributos de un producto derivados solo de su número; Order y Feedback los recalculan igual."""
+    h = _mix(seed, n)
+    price = round(1 + (h % 49900) / 100, 2)  # 1.00 – 499.99
+    return {
+        "id": str(n + 1),
+        "asin": f"B{h % 10**9:09d}{n:x}".upper(),
+        "title": f"{ADJECTIVES[(h >> 16) % len(ADJECTIVES)]} {ITEMS[(h >> 24) % len(ITEMS)]} {n + 1}",
+        "price": price,
+        "img_url": f"http://example.com/img/{n + 1}.jpg",
+        "sku": f"SKU-{n + 1:08d}",
+        "vendor": str((h >> 32) % counts["vendor"] + 1),
+    }
+
+
+# 📌 Encabezados por archivo (rutas relativas a la salida); los .json no llevan encabezado
+PERSON_GLOBAL = "id|firstName|lastName|gender|birthday|creationDate|locationIP|browserUsed|place"
+PERSON_DATASET = "ID|FIRSTNAME|LASTNAME|GENDER|BIRTHDAY|CREATION_DATE|LOCATION_IP|BROWSER_USED|PLACE"
+CUSTOMER_FRAGMENT = "CUSTOMER_ID|FIRST_NAME|LAST_NAME|GENDER|BIRTHDAY|CREATE_DATE|LOCATION_IP|BROWSER_USED|PLACE"
+PRODUCT_DATASET = "PRODUCT_ID,TITLE,PRICE,IMG_URL,SKU,VENDOR_ID"
+POST_DATASET = "POST_ID|IMAGE_FILE|CREATE_DATE|LOCATION_IP|BROWSER_USED|LANGUAGE|CONTENT|LENGTH"
+KNOWS = "from|to|creationDate"
+HAS_CREATOR = "POST_ID|PERSON_ID"
+HAS_TAG = "POST_ID|TAG_ID"
+HAS_INTEREST = "PERSON_ID|TAG_ID"
+
+HEADERS = {
+    "Dataset/Customer/person_0_0.csv": PERSON_DATASET,
+    **{f"Dataset/Customer/person_0_0_{suffix.lower()}.csv": CUSTOMER_FRAGMENT for suffix in PLACE_FRAGMENTS},
+    "Global/person_0_0.csv": PERSON_GLOBAL,
+    "Dataset/SocialNetwork/person_knows_person_0_0.csv": KNOWS,
+    "Global/person_knows_person_0_0.csv": KNOWS,
+    "Dataset/SocialNetwork/person_hasInterest_tag_0_0.csv": HAS_INTEREST,
+    "Global/person_hasInterest_tag_0_0.csv": HAS_INTEREST,
+    "Dataset/Vendor/Vendor.csv": "VENDOR_ID,COMPANY,COUNTRY,INDUSTRY",
+    "Global/Vendor.csv": "id,Country,Industry",
+    "Dataset/Product/Product.csv": PRODUCT_DATASET,
+    "Dataset/Product/Product_Cheap.csv": PRODUCT_DATASET,
+    "Dataset/Product/Product_Expensive.csv": PRODUCT_DATASET,
+    "Global/Product.csv": "asin,title,price,imgUrl,productId,brand",
+    "Dataset/SocialNetwork/tag.csv": "ID|TITLE",
+    "Global/Tag.csv": "id|title",
+    "Dataset/SocialNetwork/post_0_0.csv": POST_DATASET,
+    **{f"Dataset/SocialNetwork/post_0_0_{name}.csv": POST_DATASET for name in POST_FRAGMENTS},
+    "Global/post_0_0.csv": "id|imageFile|creationDate|locationIP|browserUsed|language|content|length",
+    "Dataset/SocialNetwork/post_hasCreator_person_0_0.csv": HAS_CREATOR,
+    "Global/post_hasCreator_person_0_0.csv": HAS_CREATOR,
+    "Dataset/SocialNetwork/post_hasTag_tag_0_0.csv": HAS_TAG,
+    "Global/post_hasTag_tag_0_0.csv": HAS_TAG,
+    "Dataset/Feedback/Feedback.csv": "PRODUCT_ID|CUSTOMER_ID|RATE|REVIEW",
+    "Global/Feedback.csv": "productId|personId|feedback",
+    "Dataset/Order/Order.json": None,
+    "Global/Order.json": None,
+    "Dataset/Invoice/Invoice.xml": None,
+    "Global/Invoice.xml": None,
+}
+
+
+class GlobalInvoiceWriter(InvoiceWriter):
+    """Invoice.xml con las etiquetas que lee `arangodb_dataload.validate_invoice`."""
+
+    FIELDS = ("OrderId", "PersonId", "OrderDate", "TotalPrice")
+    LINE_TAG = "Orderline"
+    LINE_FIELDS = ("productId", "asin", "title", "price", "brand")
+
+
+XML_WRITERS = {
+    "Dataset/Invoice/Invoice.xml": InvoiceWriter,
+    "Global/Invoice.xml": GlobalInvoiceWriter,
+}
+
+
+# 📌 Generadores por entidad: filas [start, end) → {ruta: [líneas]}
+def gen_person(rng, start, end, counts, seed):
+    out = {path: [] for path in HEADERS if path.split("/")[-1].startswith("person_")}
+    persons, tags = counts["person"], counts["tag"]
+    for n in range(start, end):
+        pid = str(n + 1)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        gender = rng.choice(("male", "female"))
+        birthday = (date(1950, 1, 1) + timedelta(days=rng.randrange(20000))).isoformat()
+        created = _timestamp(rng, 3650)
+        ip = ".".join(str(rng.randrange(1, 255)) for _ in range(4))
+        browser = rng.choice(BROWSERS)
+        place = rng.randint(0, MAX_PLACE)
+
+        fields = [pid, first, last, gender, birthday, created, ip, browser, str(place)]
+        line = "|".join(fields)
+        out["Dataset/Customer/person_0_0.csv"].append(line)
+        out["Global/person_0_0.csv"].append(line)
+        for suffix, bounds in PLACE_FRAGMENTS.items():
+            if _in_range(place, bounds):
+                out[f"Dataset/Customer/person_0_0_{suffix.lower()}.csv"].append(line)
+
+        # 🔥 Aristas del vértice en la misma pasada: destinos sin repetir y sin bucles
+        degree = min(rng.randint(0, 2 * KNOWS_PER_PERSON), persons - 1)
+        for friend in rng.sample(range(persons - 1), degree):
+            friend += friend >= n
+            line = f"{pid}|{friend + 1}|{_timestamp(rng, 3650)}"
+            out["Dataset/SocialNetwork/person_knows_person_0_0.csv"].append(line)
+            out["Global/person_knows_person_0_0.csv"].append(line)
+
+        interests = min(rng.randint(1, 2 * INTERESTS_PER_PERSON - 1), tags)
+        for tag in rng.sample(range(tags), interests):
+            line = f"{pid}|{tag + 1}"
+            out["Dataset/SocialNetwork/person_hasInterest_tag_0_0.csv"].append(line)
+            out["Global/person_hasInterest_tag_0_0.csv"].append(line)
+    return out
+
+
+def gen_vendor(rng, start, end, counts, seed):
+    out = {"Dataset/Vendor/Vendor.csv": [], "Global/Vendor.csv": []}
+    for n in range(start, end):
+        vid = str(n + 1)
+        company = f"{rng.choice(ADJECTIVES)}{rng.choice(ITEMS)} {vid}"
+        country, industry = rng.choice(COUNTRIES), rng.choice(INDUSTRIES)
+        out["Dataset/Vendor/Vendor.csv"].append(f"{vid},{company},{country},{industry}")
+        out["Global/Vendor.csv"].append(f"{vid},{country},{industry}")
+    return out
+
+
+def gen_product(rng, start, end, counts, seed):
+    out = {path: [] for path in HEADERS if "Product" in path}
+    for n in range(start, end):
+        p = product_row(n, seed, counts)
+        line = f"{p['id']},{p['title']},{p['price']},{p['img_url']},{p['sku']},{p['vendor']}"
+        out["Dataset/Product/Product.csv"].append(line)
+        fragment = "Cheap" if p["price"] < CHEAP_PRICE else "Expensive"
+        out[f"Dataset/Product/Product_{fragment}.csv"].append(line)
+        out["Global/Product.csv"].append(f"{p['asin']},{p['title']},{p['price']},{p['img_url']},{p['id']},{p['vendor']}")
+    return out
+
+
+def gen_tag(rng, start, end, counts, seed):
+    out = {"Dataset/SocialNetwork/tag.csv": [], "Global/Tag.csv": []}
+    for n in range(start, end):
+        line = f"{n + 1}|{rng.choice(WORDS).capitalize()}_{n + 1}"
+        out["Dataset/SocialNetwork/tag.csv"].append(line)
+        out["Global/Tag.csv"].append(line)
+    return out
+
+
+def gen_post(rng, start, end, counts, seed):
+    out = {path: [] for path in HEADERS if "post_" in path}
+    persons, tags = counts["person"], counts["tag"]
+    for n in range(start, end):
+        post_id = str(n + 1)
+        if rng.random() < 0.3:
+            image, content = f"photo{post_id}.jpg", ""
+        else:
+            image, content = "", " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 40)))
+        fields = [post_id, image, _timestamp(rng, 3650), ".".join(str(rng.randrange(1, 255)) for _ in range(4)),
+                  rng.choice(BROWSERS), rng.choice(LANGUAGES), content, str(len(content))]
+        line = "|".join(fields)
+        out["Dataset/SocialNetwork/post_0_0.csv"].append(line)
+        out["Global/post_0_0.csv"].append(line)
+        for name, bounds in POST_FRAGMENTS.items():
+            if _in_range(len(content), bounds):
+                out[f"Dataset/SocialNetwork/post_0_0_{name}.csv"].append(line)
+
+        line = f"{post_id}|{rng.randrange(persons) + 1}"
+        out["Dataset/SocialNetwork/post_hasCreator_person_0_0.csv"].append(line)
+        out["Global/post_hasCreator_person_0_0.csv"].append(line)
+        for tag in rng.sample(range(tags), min(rng.randint(0, MAX_TAGS_PER_POST), tags)):
+            line = f"{post_id}|{tag + 1}"
+            out["Dataset/SocialNetwork/post_hasTag_tag_0_0.csv"].append(line)
+            out["Global/post_hasTag_tag_0_0.csv"].append(line)
+    return out
+
+
+def gen_order(rng, start, end, counts, seed):
+    out = {path: [] for path in HEADERS if "Order" in path or "Invoice" in path}
+    dataset_xml = InvoiceWriter(None)
+    global_xml = GlobalInvoiceWriter(None)
+    products = counts["product"]
+    for n in range(start, end):
+        order_id = str(n + 1)
+        person = str(rng.randrange(counts["person"]) + 1)
+        order_date = (ORDER_START + timedelta(days=rng.randrange(ORDER_DAYS))).isoformat()
+        lines = [product_row(p, seed, counts) for p in rng.sample(range(products), min(rng.randint(1, MAX_ORDER_LINES), products))]
+        total = round(sum(p["price"] for p in lines), 2)
+
+        dataset = {
+            "ORDER_ID": order_id, "CUSTOMER_ID": person, "ORDER_DATE": order_date, "TOTAL_PRICE": total,
+            "ORDER_LINE": [{"SKU": p["sku"], "PRODUCT_ID": p["id"], "TITLE": p["title"],
+                            "PRICE": p["price"], "VENDOR_ID": p["vendor"]} for p in lines],
+        }
+        unibench = {
+            "OrderId": order_id, "PersonId": person, "OrderDate": order_date, "TotalPrice": total,
+            "Orderline": [{"productId": p["id"], "asin": p["asin"], "title": p["title"],
+                           "price": p["price"], "brand": p["vendor"]} for p in lines],
+        }
+        out["Dataset/Order/Order.json"].append(json.dumps(dataset, ensure_ascii=False))
+        out["Global/Order.json"].append(json.dumps(unibench, ensure_ascii=False))
+        out["Dataset/Invoice/Invoice.xml"].append(dataset_xml.body(dataset))
+        out["Global/Invoice.xml"].append(global_xml.body(unibench))
+    return out
+
+
+def gen_feedback(rng, start, end, counts, seed):
+    out = {"Dataset/Feedback/Feedback.csv": [], "Global/Feedback.csv": []}
+    persons, products = counts["person"], counts["product"]
+    for k in range(start, end):
+        # ✅ Pares (producto, persona) únicos: Global usa `productId_personId` como _key
+        person = k % persons
+        p = product_row((k // persons + _mix(seed, person)) % products, seed, counts)
+        rate = rng.randint(1, 5)
+        review = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 15)))
+        out["Dataset/Feedback/Feedback.csv"].append(f"{p['id']}|{person + 1}|{rate}|{review}")
+        out["Global/Feedback.csv"].append(f"{p['asin']}|{person + 1}|'{rate}.0,{review}'")
+    return out
+
+
+GENERATORS = {
+    "person": gen_person,
+    "vendor": gen_vendor,
+    "product": gen_product,
+    "tag": gen_tag,
+    "post": gen_post,
+    "order": gen_order,
+    "feedback": gen_feedback,
+}
+
+
+def scaled_counts(scale):
+    counts = {entity: max(1, int(base * scale)) for entity, base in BASE_COUNTS.items()}
+    counts["feedback"] = min(counts["feedback"], counts["person"] * counts["product"])
+    return counts
+
+
+def part_path(out_dir, path, shard):
+    return os.path.join(out_dir, f"{path}.part{shard}")
+
+
+def generate_shard(entity, shard, start, end, counts, seed, out_dir, layouts):
+    """Genera las filas `[start, end)` de una entidad y escribe una parte por archivo de salida."""
+    rng = random.Random(f"{seed}:{entity}:{shard}")
+    rows = {}
+    for path, lines in GENERATORS[entity](rng, start, end, counts, seed).items():
+        if path.split("/")[0] not in layouts:
+            continue
+        with open(part_path(out_dir, path, shard), "w", encoding="utf-8", newline="") as f:
+            for line in lines:
+                f.write(line if path.endswith(".xml") else line + "\n")
+        rows[path] = len(lines)
+    return entity, shard, rows
+
+
+def shard_plan(counts, shard_rows=SHARD_ROWS):
+    """Tareas `(entidad, shard, start, end)`; los límites solo dependen de los conteos."""
+    plan = []
+    for entity, total in counts.items():
+        for shard, start in enumerate(range(0, total, shard_rows)):
+            plan.append((entity, shard, start, min(start + shard_rows, total)))
+    return plan
+
+
+def merge_parts(out_dir, path, shards):
+    """Une las partes en orden de shard bajo el encabezado (o la raíz XML) del archivo."""
+    final = os.path.join(out_dir, path)
+    tmp = f"{final}.tmp"
+    with open(tmp, "w", encoding="utf-8", newline="") as out:
+        writer = XML_WRITERS[path](out) if path in XML_WRITERS else None
+        if writer:
+            writer.start()
+        elif HEADERS[path]:
+            out.write(HEADERS[path] + "\n")
+        for shard in range(shards):
+            part = part_path(out_dir, path, shard)
+            with open(part, "r", encoding="utf-8", newline="") as body:
+                shutil.copyfileobj(body, out)
+            os.remove(part)
+        if writer:
+            writer.end()
+    os.replace(tmp, final)
+
+
+def generate(out_dir, scale=1.0, seed=SEED, workers=None, layouts=("Dataset", "Global"), shard_rows=SHARD_ROWS):
+    """Genera el dataset en `out_dir`; devuelve las filas escritas por archivo."""
+    counts = scaled_counts(scale)
+    plan = shard_plan(counts, shard_rows)
+    shards = {entity: sum(1 for task in plan if task[0] == entity) for entity in counts}
+    paths = [path for path in HEADERS if path.split("/")[0] in layouts]
+    for path in paths:
+        os.makedirs(os.path.dirname(os.path.join(out_dir, path)), exist_ok=True)
+
+    print(f"📂 SF{scale:g} (semilla {seed}): {', '.join(f'{e}={n}' for e, n in counts.items())}; {len(plan)} tareas")
+    totals = dict.fromkeys(paths, 0)
+    owner = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(generate_shard, *task, counts, seed, out_dir, layouts) for task in plan]
+        for future in futures:
+            entity, _, rows = future.result()
+            for path, n in rows.items():
+                totals[path] += n
+                owner[path] = entity
+
+    for path in paths:
+        merge_parts(out_dir, path, shards[owner[path]])
+    return totals
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Genera un dataset sintético de KhaBench a un factor de escala")
+    parser.add_argument("out_dir", help="directorio de salida (se crean Dataset/ y Global/)")
+    parser.add_argument("--scale", type=float, default=1.0, help="factor de escala (SF1 = 10000 personas)")
+    parser.add_argument("--seed", type=int, default=SEED, help="semilla; misma semilla y SF, mismos archivos")
+    parser.add_argument("--workers", type=int, help="procesos del pool (por defecto, uno por núcleo)")
+    parser.add_argument("--layout", choices=["Dataset", "Global"], action="append",
+                        help="formato a generar (por defecto, ambos)")
+    parser.add_argument("--shard-rows", type=int, default=SHARD_ROWS, help="registros por tarea")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    start = time.perf_counter()
+    totals = generate(args.out_dir, args.scale, args.seed, args.workers,
+                      tuple(args.layout or ("Dataset", "Global")), args.shard_rows)
+    for path, rows in totals.items():
+        print(f"✅ {path}: {rows} registros")
+    print(f"🎉 Dataset generado en {args.out_dir} en {time.perf_counter() - start:.1f} s")
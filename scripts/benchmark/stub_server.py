@@ -0,0 +1,331 @@
+import argparse
+import gzip
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+# ✅ Servidor HTTP de pruebas con el subconjunto de OrientDB y ArangoDB que usan los cargadores
+#   OrientDB: POST /batch/{db} (INSERT ... CONTENT, LET/RETURN, CREATE EDGE, SELECT count / por @rid)
+#   ArangoDB: POST /_db/{db}/_api/import, POST /_db/{db}/_api/document/{colección},
+#             POST /_db/{db}/_api/cursor (sin resultados), GET .../_api/collection/{colección}/count,
+#             PUT .../truncate
+# Con latencia y fallos configurables, para medir el lado cliente sin el clúster de compose-files/.
+_INSERT = re.compile(r"^(?:LET\s+(\w+)\s*=\s*)?INSERT\s+INTO\s+(\w+)(?:\s+CLUSTER\s+\w+)?\s+CONTENT\s+(.*)$", re.I | re.S)
+_EDGE = re.compile(r"^CREATE\s+EDGE\s+(\w+)", re.I)
+_COUNT = re.compile(r"^SELECT\s+count\(\*\)\s+AS\s+(\w+)\s+FROM\s+(\w+)", re.I)
+_SELECT = re.compile(
+    r"^SELECT\s+(.+?)\s+FROM\s+(\w+)(?:\s+WHERE\s+@rid\s*>\s*#(-?\d+):(-?\d+))?"
+    r"(?:\s+ORDER\s+BY\s+@rid\s+(ASC|DESC))?(?:\s+LIMIT\s+(\d+))?", re.I | re.S
+)
+
+
+class StubState:
+    """Datos recibidos por clase/colección y contadores de registros y bytes."""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, reject_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.reject_rate = reject_rate
+        self.random = random.Random(seed)
+        self.seed = seed or 0
+        self.lock = threading.Lock()
+        self.classes = {}
+        self.clusters = {}
+        self.records = {}
+        self.bytes = 0
+        self.requests = 0
+        self.errors = 0
+
+    def snapshot(self):
+        with self.lock:
+            return {"records": dict(self.records), "bytes": self.bytes,
+                    "requests": self.requests, "errors": self.errors}
+
+    def delay(self):
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+
+    def roll(self, rate):
+        with self.lock:
+            return rate > 0 and self.random.random() < rate
+
+    def rejects(self, content):
+        """Rechazo determinista: el mismo registro se rechaza siempre, así la bisección lo aísla."""
+        if not self.reject_rate:
+            return False
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        return zlib.crc32(content, self.seed) / 2 ** 32 < self.reject_rate
+
+    def count(self, name, n):
+        with self.lock:
+            self.records[name] = self.records.get(name, 0) + n
+
+    def store(self, name, document):
+        """Guarda un registro de OrientDB y le asigna un @rid `#cluster:posición`."""
+        key = name.upper()
+        with self.lock:
+            rows = self.classes.setdefault(key, [])
+            cluster = self.clusters.setdefault(key, 10 + len(self.clusters))
+            rid = f"#{cluster}:{len(rows)}"
+            document = dict(document, **{"@rid": rid, "@class": name})
+            rows.append(document)
+            self.records[name] = self.records.get(name, 0) + 1
+        return document
+
+    def rows(self, name):
+        with self.lock:
+            return list(self.classes.get(name.upper(), []))
+
+    def truncate(self, name):
+        with self.lock:
+            self.classes.pop(name.upper(), None)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # 🔥 Sin esto, cabeceras y cuerpo por separado suman ~40 ms de ACK retardado
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            parts = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                parts.append(self.rfile.read(size))
+                self.rfile.readline()
+            body = b"".join(parts)
+        else:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+
+        with self.state.lock:
+            self.state.bytes += len(body)
+            self.state.requests += 1
+        if self.headers.get("Content-Encoding", "").lower() == "gzip":
+            body = gzip.decompress(body)
+        return body
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _inject_error(self):
+        self.state.delay()
+        if self.state.roll(self.state.error_rate):
+            with self.state.lock:
+                self.state.errors += 1
+            self._send(503, {"error": True, "errorMessage": "error inyectado por el stub"})
+            return True
+        return False
+
+    # 📌 OrientDB
+    def _orientdb_batch(self, body):
+        """`(estado, cuerpo)`; un registro rechazado anula el lote con un 500, como OrientDB."""
+        request = json.loads(body)
+        commands = [operation.get("command", "") for operation in request.get("operations", [])]
+        for command in commands:
+            rejected = self._orientdb_rejected(command)
+            if rejected:
+                return 500, {"errors": [{"code": 500, "reason": 500,
+                                         "content": f"rechazo inyectado por el stub: {rejected[:200]}"}]}
+        results = []
+        for command in commands:
+            results.extend(self._orientdb_script(command))
+        return 200, {"result": results}
+
+    def _orientdb_rejected(self, script):
+        """El primer INSERT (por su CONTENT) o CREATE EDGE del script que el stub rechaza."""
+        for statement in script.split(";\n"):
+            statement = statement.strip().rstrip(";")
+            match = _INSERT.match(statement)
+            if match and self.state.rejects(match.group(3)):
+                return match.group(3)
+            if _EDGE.match(statement) and self.state.rejects(statement):
+                return statement
+        return None
+
+    def _orientdb_script(self, script):
+        variables = {}
+        for statement in script.split(";\n"):
+            statement = statement.strip().rstrip(";")
+            upper = statement.upper()
+            if not statement or upper in ("BEGIN", "COMMIT", "ROLLBACK"):
+                continue
+
+            match = _INSERT.match(statement)
+            if match:
+                variable, name, content = match.groups()
+                document = self.state.store(name, json.loads(content))
+                if variable:
+                    variables[variable] = document
+                continue
+
+            match = _EDGE.match(statement)
+            if match:
+                self.state.count(match.group(1), 1)
+                continue
+
+            if upper.startswith("RETURN"):
+                names = re.findall(r"\$(\w+)", statement)
+                return [variables[n] for n in names if n in variables]
+
+            match = _COUNT.match(statement)
+            if match:
+                alias, name = match.groups()
+                return [{alias: len(self.state.rows(name))}]
+
+            match = _SELECT.match(statement)
+            if match:
+                return self._orientdb_select(*match.groups())
+        return []
+
+    def _orientdb_select(self, projection, name, cluster, position, order, limit):
+        rows = self.state.rows(name)
+        if (order or "").upper() == "DESC":
+            rows.reverse()
+        start = int(position) + 1 if cluster is not None and int(cluster) >= 0 else 0
+        end = start + int(limit) if limit else len(rows)
+        fields = [f.strip() for f in projection.split(",") if f.strip() not in ("@rid", "*")]
+        if projection.strip() == "*":
+            return rows[start:end]
+        return [{**{f: row.get(f) for f in fields}, "@rid": row["@rid"]} for row in rows[start:end]]
+
+    # 📌 ArangoDB
+    def _arango_import(self, collection, body):
+        lines = [line for line in body.split(b"\n") if line.strip()]
+        details = []
+        for n, line in enumerate(lines):
+            if self.state.rejects(line):
+                details.append(f"at position {n}: rechazo inyectado por el stub")
+        created = len(lines) - len(details)
+        self.state.count(collection, created)
+        return {"error": False, "created": created, "errors": len(details), "empty": 0,
+                "updated": 0, "ignored": 0, "details": details}
+
+    def _arango_documents(self, collection, body):
+        documents = json.loads(body)
+        if isinstance(documents, dict):
+            documents = [documents]
+        self.state.count(collection, len(documents))
+        results = []
+        for n, document in enumerate(documents):
+            key = str(document.get("_key", n))
+            results.append({"_id": f"{collection}/{key}", "_key": key, "_rev": "_stub"})
+        return results
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        body = self._body()
+        if self._inject_error():
+            return
+
+        if parts[0] == "batch":
+            self._send(*self._orientdb_batch(body))
+        elif parts[-2:] == ["_api", "import"]:
+            collection = parse_qs(url.query).get("collection", [""])[0]
+            self._send(201, self._arango_import(collection, body))
+        elif parts[-2:] == ["_api", "cursor"]:
+            self._send(201, {"error": False, "result": [], "hasMore": False, "cached": False})
+        elif "_api" in parts and "document" in parts:
+            self._send(202, self._arango_documents(parts[-1], body))
+        else:
+            self._send(404, {"error": True, "errorMessage": f"ruta no soportada: {url.path}"})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        self._body()
+        if parts[-1] == "count" and "collection" in parts:
+            name = parts[-2]
+            self._send(200, {"name": name, "count": self.state.snapshot()["records"].get(name, 0)})
+        elif parts[-1] == "version":
+            self._send(200, {"server": "stub", "version": "0.0.0"})
+        else:
+            self._send(404, {"error": True, "errorMessage": f"ruta no soportada: {url.path}"})
+
+    def do_PUT(self):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        self._body()
+        if parts[-1] == "truncate":
+            self.state.truncate(parts[-2])
+            self._send(200, {"name": parts[-2]})
+        else:
+            self._send(404, {"error": True, "errorMessage": f"ruta no soportada: {url.path}"})
+
+
+class StubServer:
+    """Arranca el stub en un hilo: `with StubServer(...) as stub: stub.url`."""
+
+    def __init__(self, host="127.0.0.1", port=0, **options):
+        self.httpd = ThreadingHTTPServer((host, port), StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = StubState(**options)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def state(self):
+        return self.httpd.state
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stub HTTP de OrientDB/ArangoDB para benchmarks de carga")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2480)
+    parser.add_argument("--latency", type=float, default=0.0, help="segundos de latencia por petición")
+    parser.add_argument("--jitter", type=float, default=0.0, help="variación aleatoria de la latencia (±s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fracción de peticiones que responden 503")
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="fracción de registros rechazados (siempre los mismos)")
+    parser.add_argument("--seed", type=int, help="semilla para la inyección de fallos")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = StubServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                        error_rate=args.error_rate, reject_rate=args.reject_rate, seed=args.seed)
+    print(f"🚀 Stub escuchando en {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
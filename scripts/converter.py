@@ -1,58 +1,202 @@
+import argparse
+import glob
 import json
-import xml.etree.ElementTree as ET
 import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+
+from json_stream import iter_json_records
 
 # 📂 Rutas de los archivos
 DATASET_DIR = "../Dataset/Invoice/"
 INPUT_FILE = "../Dataset/Order/Order.json"  # Usamos el archivo corregido con Vendor_ID numérico
 OUTPUT_FILE = os.path.join(DATASET_DIR, "Invoice3.xml")
 
-# 📂 Crear la raíz del XML
-root = ET.Element("Invoices")
-
-# 📂 Leer el JSON de órdenes
-print(f"📂 Cargando {INPUT_FILE} en Order...")
-with open(INPUT_FILE, "r", encoding="utf-8") as f:
-    orders = [json.loads(line) for line in f]
-
-# 🔄 Convertir cada orden en un elemento XML
-for order in orders:
-    invoice = ET.SubElement(root, "Invoice")
-
-    ET.SubElement(invoice, "ORDER_ID").text = order["ORDER_ID"]
-    ET.SubElement(invoice, "CUSTOMER_ID").text = order["CUSTOMER_ID"]
-    ET.SubElement(invoice, "ORDER_DATE").text = order["ORDER_DATE"]
-    ET.SubElement(invoice, "TOTAL_PRICE").text = str(order["TOTAL_PRICE"])
-
-    # 🔍 Convertir cada línea de orden en XML
-    for item in order["ORDER_LINE"]:
-        order_line = ET.SubElement(invoice, "ORDER_LINE")
-        ET.SubElement(order_line, "SKU").text = item["SKU"]
-        ET.SubElement(order_line, "PRODUCT_ID").text = item["PRODUCT_ID"]
-        ET.SubElement(order_line, "TITLE").text = item["TITLE"]
-        ET.SubElement(order_line, "PRICE").text = str(item["PRICE"])
-        ET.SubElement(order_line, "VENDOR_ID").text = str(item["VENDOR_ID"]) if item["VENDOR_ID"] else "NULL"
-
-# 📂 Guardar el XML con formato y saltos de línea
-def prettify(elem, level=0):
-    """ Agrega indentación y saltos de línea para un XML más legible """
-    indent = "\n" + "  " * level
-    if len(elem):
-        if not elem.text or not elem.text.strip():
-            elem.text = indent + "  "
-        for subelem in elem:
-            prettify(subelem, level + 1)
-        if not elem.tail or not elem.tail.strip():
-            elem.tail = indent
-    elif level:
-        if not elem.tail or not elem.tail.strip():
-            elem.tail = indent
-
-prettify(root)
-
-# 📂 Guardar el archivo XML correctamente formateado
-tree = ET.ElementTree(root)
-with open(OUTPUT_FILE, "wb") as f:
-    tree.write(f, encoding="utf-8", xml_declaration=True)
-
-print(f"✅ Archivo `Invoice.xml` generado con formato legible en {OUTPUT_FILE}")
+# ✅ Indentación y saltos de línea (se aplican al escribir, sin recorrer el árbol después)
+PRETTY = True
+
+# ✅ Conversión en paralelo: número de shards (1 = un solo proceso) y nombre de cada parte
+SHARDS = 1
+PART_NAME = "Invoice_part_{}.xml"
+
+ORDER_FIELDS = ("ORDER_ID", "CUSTOMER_ID", "ORDER_DATE", "TOTAL_PRICE")
+ORDER_LINE_FIELDS = ("SKU", "PRODUCT_ID", "TITLE", "PRICE", "VENDOR_ID")
+
+
+def _text(value):
+    return "" if value is None else escape(str(value))
+
+
+class InvoiceWriter:
+    """Escribe `<Invoices>` de forma incremental: cada `<Invoice>` va directo al archivo.
+
+    La memoria no depende del número de órdenes y no hay una segunda pasada para formatear.
+    Las etiquetas salen de los atributos de clase, así una subclase puede escribir otro esquema.
+    """
+
+    FIELDS = ORDER_FIELDS
+    LINE_TAG = "ORDER_LINE"
+    LINE_FIELDS = ORDER_LINE_FIELDS
+
+    def __init__(self, out, pretty=PRETTY):
+        self.out = out
+        self.pretty = pretty
+        self.count = 0
+
+    def _line(self, parts, level, text):
+        if self.pretty:
+            parts.append("  " * level)
+            parts.append(text)
+            parts.append("\n")
+        else:
+            parts.append(text)
+
+    def start(self):
+        parts = ["<?xml version='1.0' encoding='utf-8'?>\n"]
+        self._line(parts, 0, "<Invoices>")
+        self.out.write("".join(parts))
+
+    def body(self, order):
+        """Devuelve el `<Invoice>` de una orden como texto."""
+        parts = []
+        self._line(parts, 1, "<Invoice>")
+        for field in self.FIELDS:
+            self._line(parts, 2, f"<{field}>{_text(order[field])}</{field}>")
+
+        # 🔍 Convertir cada línea de orden en XML
+        for item in order[self.LINE_TAG]:
+            self._line(parts, 2, f"<{self.LINE_TAG}>")
+            for field in self.LINE_FIELDS:
+                value = item[field]
+                if field == "VENDOR_ID" and not value:
+                    value = "NULL"
+                self._line(parts, 3, f"<{field}>{_text(value)}</{field}>")
+            self._line(parts, 2, f"</{self.LINE_TAG}>")
+
+        self._line(parts, 1, "</Invoice>")
+        return "".join(parts)
+
+    def write(self, order):
+        self.out.write(self.body(order))
+        self.count += 1
+
+    def end(self):
+        parts = []
+        self._line(parts, 0, "</Invoices>")
+        self.out.write("".join(parts))
+
+
+def convert(input_file=INPUT_FILE, output_file=OUTPUT_FILE, pretty=PRETTY):
+    """Convierte Order.json (JSON Lines o array) en Invoice XML orden a orden."""
+    print(f"📂 Cargando {input_file} en Order...")
+    with open(output_file, "w", encoding="utf-8") as out:
+        writer = InvoiceWriter(out, pretty)
+        writer.start()
+        for order in iter_json_records(input_file):
+            writer.write(order)
+        writer.end()
+    return writer.count
+
+
+def shard_ranges(input_file, shards):
+    """Divide un archivo JSON Lines en `shards` rangos de bytes alineados a saltos de línea."""
+    size = os.path.getsize(input_file)
+    bounds = [0]
+    with open(input_file, "rb") as f:
+        for n in range(1, shards):
+            f.seek(max(size * n // shards, bounds[-1]))
+            f.readline()  # avanzar hasta el final de la línea en curso
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def is_json_lines(input_file):
+    with open(input_file, "rb") as f:
+        head = f.read(4096).lstrip()
+    return not head.startswith(b"[")
+
+
+def convert_range(input_file, start, end, output_file, pretty=PRETTY, body_only=False):
+    """Convierte las órdenes del rango de bytes `[start, end)`; con `body_only` omite la raíz."""
+    with open(input_file, "rb") as f, open(output_file, "w", encoding="utf-8") as out:
+        writer = InvoiceWriter(out, pretty)
+        if not body_only:
+            writer.start()
+        f.seek(start)
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                writer.write(json.loads(line))
+        if not body_only:
+            writer.end()
+    return writer.count
+
+
+def convert_sharded(input_file=INPUT_FILE, output_file=OUTPUT_FILE, shards=SHARDS, pretty=PRETTY,
+                    split=False, workers=None):
+    """Convierte Order.json en paralelo (un proceso por shard).
+
+    Con `split` escribe `Invoice_part_N.xml` junto a `output_file`, cada uno un documento completo,
+    y borra antes las partes de una ejecución anterior; si no, concatena los cuerpos de cada shard
+    bajo una única raíz `<Invoices>` en `output_file`.
+    """
+    if shards <= 1 or not is_json_lines(input_file):
+        if shards > 1:
+            print("⚠️ El modo por shards necesita JSON Lines; se convierte en un solo proceso")
+        return convert(input_file, output_file, pretty)
+
+    ranges = shard_ranges(input_file, shards)
+    out_dir = os.path.dirname(output_file) or "."
+    if split:
+        # 🧹 Los cargadores leen todas las `Invoice_part_*.xml`: una parte sobrante de una
+        # ejecución con más shards duplicaría sus invoices
+        for stale in glob.glob(os.path.join(out_dir, PART_NAME.format("*"))):
+            os.remove(stale)
+        parts = [os.path.join(out_dir, PART_NAME.format(n)) for n in range(len(ranges))]
+    else:
+        parts = [f"{output_file}.part{n}" for n in range(len(ranges))]
+
+    print(f"📂 Convirtiendo {input_file} en {len(ranges)} shards...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(convert_range, input_file, start, end, part, pretty, not split)
+            for (start, end), part in zip(ranges, parts)
+        ]
+        total = sum(future.result() for future in futures)
+
+    if not split:
+        # 🔥 Documento único: cabecera + cuerpos concatenados + cierre de la raíz
+        with open(output_file, "w", encoding="utf-8") as out:
+            writer = InvoiceWriter(out, pretty)
+            writer.start()
+            for part in parts:
+                with open(part, "r", encoding="utf-8") as body:
+                    shutil.copyfileobj(body, out)
+                os.remove(part)
+            writer.end()
+    return total
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Genera Invoice XML a partir de Order.json")
+    parser.add_argument("--input", default=INPUT_FILE, help="Order.json de entrada")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="archivo XML de salida")
+    parser.add_argument("--compact", action="store_true", help="sin indentación ni saltos de línea")
+    parser.add_argument("--shards", type=int, default=SHARDS, help="convierte en paralelo dividiendo Order.json en N shards")
+    parser.add_argument("--workers", type=int, help="procesos del pool (por defecto, uno por núcleo)")
+    parser.add_argument("--split", action="store_true", help=f"escribe un {PART_NAME.format('N')} por shard en vez de un único XML")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    total = convert_sharded(args.input, args.output, args.shards, pretty=not args.compact,
+                            split=args.split, workers=args.workers)
+    if args.split and args.shards > 1:
+        print(f"✅ {total} invoices generados en {os.path.dirname(args.output) or '.'}/{PART_NAME.format('N')}")
+    else:
+        print(f"✅ Archivo `Invoice.xml` generado con {total} invoices en {args.output}")
@@ -0,0 +1,72 @@
+import json
+import os
+import threading
+import time
+
+
+# ✅ Reintento por bisección de lotes fallidos
+# Un lote con errores se divide en mitades hasta aislar los registros culpables:
+# los buenos se confirman en sublotes grandes y los malos van al archivo de rechazados.
+# Con k registros malos en un lote de n, el coste extra es O(k·log n) peticiones.
+class TransportError(Exception):
+    """Fallo de red o del servidor que no depende de los datos: no se bisecciona."""
+
+
+class DeadLetterFile:
+    """Archivo JSONL con los registros rechazados y el error que devolvió el servidor."""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def write(self, entity, source, record, error):
+        line = json.dumps({
+            "entity": entity,
+            "source": source,
+            "error": error,
+            "record": record,
+            "rejected_at": time.time(),
+        }, default=str, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self.count += 1
+
+
+def batch_error(response, entity):
+    """None si el lote se confirmó, o los `errors` con los que el servidor lo rechazó.
+
+    Lanza TransportError si no hubo respuesta (`execute()` devolvió None tras los reintentos).
+    """
+    if not response:
+        raise TransportError(entity)
+    return response.get("errors")
+
+
+def bisect_failed(records, error, send, reject):
+    """Reintenta un lote ya fallido partiéndolo en mitades.
+
+    `send(sublote)` devuelve None si se confirmó o el error del servidor si falló,
+    y lanza TransportError si no hubo respuesta. `reject(registro, error)` recibe
+    cada registro aislado. Devuelve `(confirmados, rechazados)`.
+    """
+    if len(records) == 1:
+        reject(records[0], error)
+        return 0, 1
+
+    mid = len(records) // 2
+    committed = rejected = 0
+    for half in (records[:mid], records[mid:]):
+        half_error = send(half)
+        if half_error is None:
+            committed += len(half)
+        else:
+            c, r = bisect_failed(half, half_error, send, reject)
+            committed += c
+            rejected += r
+    return committed, rejected
+
+
+def default_dead_letter_path(data_dir, loader):
+    return os.environ.get("KHAB_DEAD_LETTER", os.path.join(data_dir, f"dead_letter_{loader}.jsonl"))
@@ -1,20 +1,52 @@
 import os
+import sys
+import argparse
 import pandas as pd
-import requests
-import json
 import unicodedata
 import gc
-import traceback
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "orientdb"))
+from dead_letter import DeadLetterFile, default_dead_letter_path
+from load_ledger import LoadLedger, default_ledger_path
+from load_log import Progress, debug_sample, estimate_rows, get_logger
+from load_metrics import LoadMetrics, default_metrics_path
+from load_scheduler import LoadScheduler
+from orientdb_client import OrientDBExecutor
+from node_routing import NodeRouter, RoutedExecutor
+from transforms import edge_statements, resolve_edge_frame, sql_quote
+from rid_map import build_rid_map
+from batch_loader import BatchLoader
+from rid_index import RidIndex, default_index_path, iter_rid_batches
+
 # ✅ Configuración de OrientDB
-ORIENTDB_HOST = "http://localhost:2480"
+ORIENTDB_HOST = os.environ.get("KHAB_ORIENTDB_HOST", "http://localhost:2480")
 DB_NAME = "KhaBench"
 USERNAME = "root"
 PASSWORD = "rootpwd"
 HEADERS = {"Accept": "application/json"}
 
+# ✅ Cliente HTTP: lotes en vuelo, timeout por petición, gzip y reintentos
+CONCURRENCY = 4
+REQUEST_TIMEOUT = 300
+GZIP_REQUESTS = False
+MAX_RETRIES = 3
+
+# ✅ Cargas independientes que se ejecutan a la vez (ver LoadScheduler)
+LOAD_PARALLELISM = 3
+
 # ✅ Ruta de datos
-DATA_DIR = "/home/khabench/Desktop/test/Dataset/"
-already_executed = False 
+DATA_DIR = os.environ.get("KHAB_DATA_DIR", "/home/khabench/Desktop/test/Dataset/")
+
+# ✅ Modo de carga de aristas (por defecto de `--edge-mode`):
+#   "rid_map" → resuelve FROM/TO con el índice local de RIDs
+#   "indexed" → el servidor resuelve FROM/TO con subconsultas sobre los índices UNIQUE_HASH
+EDGE_LOAD_MODES = ("rid_map", "indexed")
+EDGE_LOAD_MODE = "rid_map"
+
+# ✅ Registro con niveles (KHAB_LOG_LEVEL) y progreso limitado a una línea cada pocos segundos
+LOG = get_logger("fixer")
 
 
 # ✅ Normalización de texto
@@ -24,246 +56,217 @@ def normalize_text(text):
     return text
 
 def get_rid_map_limited(class_name, id_field, limit=50000):
-    """Obtiene un diccionario de RIDs en lotes más pequeños para reducir el consumo de memoria."""
-    print(f"📡 Obteniendo RIDs para {class_name} en lotes de {limit}...")
-
-    rid_map = {}
-    offset = 0
-
-    while True:
-        sql = f"SELECT {id_field}, @rid FROM {class_name} LIMIT {limit} SKIP {offset}"
-        response = execute_query(sql)
-
-        if not response or "result" not in response:
-            print(f"⚠️ No se pudieron obtener más RIDs para {class_name}.")
-            break
+    """Obtiene un RidMap compacto recorriendo la clase por cursor de @rid en lotes de `limit`."""
+    LOG.info(f"📡 Obteniendo RIDs para {class_name} en lotes de {limit}...")
 
-        # 🔥 Convertir las claves a str y eliminar espacios en blanco
-        batch = {str(record[id_field]).strip(): record["@rid"] for record in response["result"]}
-        rid_map.update(batch)
-
-        if len(batch) < limit:
-            break  # No hay más registros
-
-        offset += limit
-
-        print(f"🔍 {class_name} RIDs obtenidos (ejemplo): {list(rid_map.items())[:10]}")
-
-        del response, batch
-        gc.collect()
+    rid_map = build_rid_map(lambda: iter_rid_batches(execute_query, class_name, id_field, limit))
 
+    LOG.info(f"✅ {len(rid_map)} RIDs obtenidos para {class_name}.")
     return rid_map
 
 
-# 📌 **Inserción en Lotes con COMMIT y ROLLBACK**
-def insert_batch(class_name, records, batch_size=5000):
-    """Inserta datos en lotes pequeños para evitar consumo excesivo de memoria."""
+def _edge_columns(df, from_field, to_field):
+    """Devuelve las columnas origen/destino del CSV de aristas."""
+    if from_field in df.columns and to_field in df.columns:
+        return from_field, to_field
+    if "from" in df.columns and "to" in df.columns:
+        return "from", "to"
+    return df.columns[0], df.columns[1]
 
-    if not records:
-        return
 
-    for i in range(0, len(records), batch_size):
-        batch = records[i:i + batch_size]
+def _edge_script(statements, positions):
+    return ";\n".join(["BEGIN"] + [statements[p] for p in positions] + ["COMMIT"])
 
-        sql_statements = ["BEGIN"]  
-        sql_statements += [f"INSERT INTO {class_name} CONTENT {json.dumps(record)}" for record in batch]
-        sql_statements.append("COMMIT")  
 
-        batch_query = ";\n".join(sql_statements)
-        response = execute_query(batch_query, transaction=True)
+def send_edge_batches(edge_class, file_name, chunks, progress):
+    """Envía los chunks `(i, filas, sentencias)` de aristas, hasta CONCURRENCY a la vez.
 
-        if response and "errors" in response:
-            execute_query("ROLLBACK;", transaction=True)
+    Un chunk rechazado se bisecta con `LOADER.settle_batch()`: las aristas que el servidor no
+    acepta (p. ej. un FROM/TO inexistente) van al dead-letter sin arrastrar al resto. Un chunk
+    sin respuesta no se marca en el ledger, pero lo que la bisección ya resolvió no se reenvía
+    con `--resume`. Devuelve `(insertadas, rechazadas)`.
+    """
+    def edge_jobs():
+        for i, rows, statements in chunks:
+            positions = LOADER.pending_positions(edge_class, file_name, f"chunk:{i}", len(rows))
+            if not positions:
+                LEDGER.mark_chunk(edge_class, file_name, i, len(rows))
+                continue
+            with METRICS.stage(edge_class, "serialize"):
+                script = _edge_script(statements, positions)
+            yield (i, rows, statements, positions), script
+
+    inserted = rejected = 0
+    for (i, rows, statements, positions), response in EXECUTOR.stream(edge_jobs(), entity=edge_class):
+        ok, bad, complete = LOADER.settle_batch(
+            edge_class, file_name, f"chunk:{i}", rows, positions, response, partial(_edge_script, statements)
+        )
+        inserted += ok
+        rejected += bad
+        progress.update(ok)
+        if complete:
+            LEDGER.mark_chunk(edge_class, file_name, i, len(rows))
+            LOG.debug(f"✅ Lote {i+1} insertado en {edge_class} con {ok} registros.")
+        else:
+            LOG.error(f"❌ Sin respuesta para el lote {i+1} de {edge_class}")
 
-        # 🧹 **Liberamos memoria tras cada lote**
-        del batch, sql_statements, batch_query
+        # 🧹 Liberamos memoria tras cada lote
+        del rows, statements, positions, response
         gc.collect()
 
+    if rejected:
+        LOG.warning(f"⚠️ {rejected} aristas rechazadas en {edge_class}; detalles en {DEAD_LETTER.path}")
+    return inserted, rejected
 
-def insert_edge_batch(edge_class, file_name, from_rids, to_rids, from_field, to_field, batch_size=5000):
-    global already_executed
-
-    if already_executed:
-        print("⚠️ `insert_edge_batch()` ya se ejecutó una vez. Saliendo...")
-        return  # 🔥 Evita múltiples ejecuciones
-
-    already_executed = True  # 🔥 Marcamos la función como ejecutada
 
+def insert_edge_batch(edge_class, file_name, from_rids, to_rids, from_field, to_field, batch_size=5000):
     file_path = os.path.join(DATA_DIR, "SocialNetwork", file_name)
     if not os.path.exists(file_path):
-        print(f"⚠️ Archivo {file_path} no encontrado. Saltando {edge_class}...")
+        LOG.warning(f"⚠️ Archivo {file_path} no encontrado. Saltando {edge_class}...")
         return
 
-    total_inserted = 0  # 🔥 Contador de inserciones
+    dropped = {"missing": 0, "dangling": 0}  # 🔥 Filas descartadas por motivo
+    progress = Progress(LOG, edge_class, total=estimate_rows(file_path))
 
     chunks = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip", chunksize=batch_size)
 
-    for i, df in enumerate(chunks):
-        if total_inserted >= 187810:
-            print(f"✅ Se alcanzó el límite de registros ({total_inserted}). Carga finalizada.")
-            return  # 🔥 Sale completamente de la función
-
-        print(f"🔍 Procesando lote {i+1} con {len(df)} registros...")
-
-        # ✅ **Renombrar columnas si es necesario**
-        if "from" in df.columns and "to" in df.columns:
-            df.rename(columns={"from": "FROM_ID", "to": "TO_ID"}, inplace=True)
-
-        batch_queries = ["BEGIN"]  # 🔥 Reiniciar `batch_queries` en cada lote
-        inserted_in_batch = 0  # 🔥 Contador de registros en este lote
-
-        for _, record in df.iterrows():
-            if total_inserted >= 187810:
-                print(f"⏹️ Detenido dentro del lote {i+1}. Límite alcanzado.")
-                break  # 🔥 DETENER INSERCIONES EN ESTE LOTE
+    def edge_chunks():
+        for i, df in enumerate(METRICS.timed(edge_class, "read", chunks)):
+            if LEDGER.chunk_done(edge_class, file_name, i):
+                continue  # ⏭️ Ya confirmado en una ejecución anterior
 
-            from_id = str(record["FROM_ID"]) if "FROM_ID" in df.columns and pd.notna(record["FROM_ID"]) else None
-            to_id = str(record["TO_ID"]) if "TO_ID" in df.columns and pd.notna(record["TO_ID"]) else None
-            creation_date = record["creationDate"] if "creationDate" in df.columns else None
+            LOG.debug(f"🔍 Procesando lote {i+1} con {len(df)} registros...")
+            debug_sample(LOG, edge_class, df, i)
 
-            if from_id is None or to_id is None:
-                continue
-            if from_id not in from_rids or to_id not in to_rids:
-                continue
+            # ✅ Resolución ID → @rid y filtrado por columnas, sin iterar fila a fila
+            with METRICS.stage(edge_class, "transform"):
+                from_col, to_col = _edge_columns(df, from_field, to_field)
+                from_rid, to_rid, dates, stats = resolve_edge_frame(df, from_col, to_col, from_rids, to_rids)
+                # 📌 Filas originales (IDs de negocio) para el dead-letter si la bisección las aísla
+                columns = [from_col, to_col] + (["creationDate"] if dates is not None else [])
+                rows = df.loc[from_rid.index, columns].to_dict("records")
+            for reason, count in stats.items():
+                dropped[reason] += count
 
-            from_rid = from_rids[from_id]
-            to_rid = to_rids[to_id]
+            if rows:
+                with METRICS.stage(edge_class, "serialize"):
+                    statements = edge_statements(edge_class, from_rid, to_rid, dates, EXECUTOR.cluster_for(edge_class))
+                yield i, rows, statements
 
-            query = f"CREATE EDGE {edge_class} FROM {from_rid} TO {to_rid} SET creationDate = '{creation_date}'"
-            batch_queries.append(query)
+            del df, from_rid, to_rid, dates
 
-            total_inserted += 1
-            inserted_in_batch += 1
+    total_inserted, _ = send_edge_batches(edge_class, file_name, edge_chunks(), progress)
 
-        if total_inserted >= 187810:
-            print(f"⏹️ Límite alcanzado antes de ejecutar `BATCH SCRIPT`. Deteniendo carga.")
-            return
+    progress.finish()
+    if dropped["missing"] or dropped["dangling"]:
+        LOG.warning(f"⚠️ Filas descartadas en {edge_class}: {dropped['missing']} sin ID, {dropped['dangling']} con vértices inexistentes.")
+    LOG.info(f"🎉 Carga finalizada. Total de registros insertados: {total_inserted}")
 
-        batch_queries.append("COMMIT")  
 
-        if inserted_in_batch > 0:
-            batch_query = ";\n".join(batch_queries)
+def insert_edge_batch_indexed(edge_class, file_name, from_vertex, to_vertex, from_field, to_field, batch_size=5000):
+    """Carga aristas dejando que OrientDB resuelva FROM/TO por su ID de negocio.
 
-            print(f"🔍 Ejecutando `BATCH SCRIPT` con {inserted_in_batch} inserciones...")
-            response = execute_query(batch_query, transaction=True)
+    `from_vertex` y `to_vertex` son tuplas `(clase, propiedad_id)`, p. ej. `("Post", "POST_ID")`.
+    Cada arista se crea con `CREATE EDGE ... FROM (SELECT FROM <clase> WHERE <CLASE>_ID = ?) TO (...)`,
+    apoyándose en los índices UNIQUE_HASH de esas propiedades. El CSV se recorre completo por
+    chunks, sin mapas de RIDs en memoria. Un ID inexistente hace fallar el lote: se bisecta y
+    las aristas culpables van al dead-letter.
+    """
+    file_path = os.path.join(DATA_DIR, "SocialNetwork", file_name)
+    if not os.path.exists(file_path):
+        LOG.warning(f"⚠️ Archivo {file_path} no encontrado. Saltando {edge_class}...")
+        return
 
-            if response and "errors" in response:
-                print(f"❌ Error en la inserción, ejecutando ROLLBACK...")
-                execute_query("ROLLBACK;", transaction=True)
-            else:
-                print(f"✅ Lote {i+1} insertado correctamente en {edge_class} con {inserted_in_batch} registros.")
+    from_class, from_key = from_vertex
+    to_class, to_key = to_vertex
+    missing = 0
+    progress = Progress(LOG, edge_class, total=estimate_rows(file_path))
 
-        del df, batch_queries
-        gc.collect()
+    chunks = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip", chunksize=batch_size)
 
-    print(f"🎉 Carga finalizada. Total de registros insertados: {total_inserted}")
+    def edge_chunks():
+        nonlocal missing
 
+        for i, df in enumerate(METRICS.timed(edge_class, "read", chunks)):
+            if LEDGER.chunk_done(edge_class, file_name, i):
+                continue  # ⏭️ Ya confirmado en una ejecución anterior
 
-def execute_query(sql, transaction=False):
-    url = f"{ORIENTDB_HOST}/batch/{DB_NAME}"
-    data = {
-        "transaction": transaction,
-        "operations": [{"type": "cmd", "language": "sql", "command": sql}]
-    }
-    try:
-        response = requests.post(url, auth=(USERNAME, PASSWORD), json=data, headers=HEADERS)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"❌ Error en query ({response.status_code}): {response.text}")
-            return None
-    except Exception as e:
-        print(f"❌ Excepción en query: {e}")
-        return None
+            with METRICS.stage(edge_class, "transform"):
+                from_col, to_col = _edge_columns(df, from_field, to_field)
+                complete = df[from_col].notna() & df[to_col].notna()
+                missing += int((~complete).sum())
+                df = df[complete]
+            if df.empty:
+                continue
+            debug_sample(LOG, edge_class, df, i)
 
-# 📌 **Carga de Datos para `Customer` y sus Fragmentos con Transacción**
-def load_customer_data(entity_name, file_name):
-    file_path = os.path.join(DATA_DIR, file_name)
+            # ✅ Subconsultas generadas por columnas
+            with METRICS.stage(edge_class, "serialize"):
+                from_refs = f"(SELECT FROM {from_class} WHERE {from_key} = " + sql_quote(df[from_col].str.strip()) + ")"
+                to_refs = f"(SELECT FROM {to_class} WHERE {to_key} = " + sql_quote(df[to_col].str.strip()) + ")"
+                dates = df["creationDate"] if "creationDate" in df.columns else None
+                statements = edge_statements(edge_class, from_refs, to_refs, dates, EXECUTOR.cluster_for(edge_class))
+                # 📌 Filas originales para el dead-letter si la bisección las aísla
+                columns = [from_col, to_col] + (["creationDate"] if dates is not None else [])
+                rows = df[columns].to_dict("records")
+            yield i, rows, statements
 
-    if not os.path.exists(file_path):
-        print(f"⚠️ Archivo {file_path} no encontrado. Saltando {entity_name}...")
-        return
+            del df
 
-    print(f"📂 Cargando {file_name} en {entity_name}...")
+    total_inserted, _ = send_edge_batches(edge_class, file_name, edge_chunks(), progress)
 
-    df = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
+    progress.finish()
+    if missing:
+        LOG.warning(f"⚠️ Filas descartadas en {edge_class}: {missing} sin ID.")
+    LOG.info(f"🎉 Carga finalizada. Total de registros insertados: {total_inserted}")
 
-    # ✅ Renombrar columnas para coincidir con el esquema
-    df.rename(columns={
-        "ID": "CUSTOMER_ID",
-        "FIRSTNAME": "FIRST_NAME",
-        "LASTNAME": "LAST_NAME",
-        "GENDER": "GENDER",
-        "BIRTHDAY": "BIRTHDAY",
-        "CREATION_DATE": "CREATE_DATE",
-        "LOCATION_IP": "LOCATION_IP",
-        "BROWSER_USED": "BROWSER_USED",
-        "PLACE": "PLACE"
-    }, inplace=True)
-
-    # ✅ Convertir fechas al formato correcto
-    df["BIRTHDAY"] = pd.to_datetime(df["BIRTHDAY"], errors="coerce").dt.strftime("%Y-%m-%d %H:%M:%S")
-    df["CREATE_DATE"] = pd.to_datetime(df["CREATE_DATE"], errors="coerce").dt.strftime("%Y-%m-%d %H:%M:%S")
-    df["PLACE"] = df["PLACE"].astype(int)
-
-    
-
-    print(f"📌 Insertando {len(df)} registros en {entity_name} dentro de una transacción...")
-    insert_batch(entity_name, df.to_dict(orient="records"))
-    print(f"✅ Carga de {entity_name} completada.")
-
-def load_person_data(entity_name, file_name):
-    file_path = os.path.join(DATA_DIR, file_name)
 
-    if not os.path.exists(file_path):
-        print(f"⚠️ Archivo {file_path} no encontrado. Saltando {entity_name}...")
-        return
+def execute_query(sql, transaction=False, entity="other"):
+    return EXECUTOR.execute(sql, transaction=transaction, entity=entity)
 
-    print(f"📂 Cargando {file_name} en {entity_name}...")
+# ✅ Tiempos por etapa y contadores; se exportan al terminar (JSON Lines + Prometheus)
+METRICS = LoadMetrics("fixer")
 
-    df = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
+EXECUTOR = OrientDBExecutor(
+    ORIENTDB_HOST, DB_NAME, USERNAME, PASSWORD,
+    concurrency=CONCURRENCY, timeout=REQUEST_TIMEOUT, gzip_body=GZIP_REQUESTS, retries=MAX_RETRIES,
+    metrics=METRICS
+)
 
-    # ✅ Renombrar columnas para coincidir con el esquema
-    df.rename(columns={
-        "ID": "PERSON_ID",
-        "FIRSTNAME": "FIRST_NAME",
-        "LASTNAME": "LAST_NAME",
-        "GENDER": "GENDER",
-        "BIRTHDAY": "BIRTHDAY",
-        "CREATION_DATE": "CREATE_DATE",
-        "LOCATION_IP": "LOCATION_IP",
-        "BROWSER_USED": "BROWSER_USED",
-        "PLACE": "PLACE"
-    }, inplace=True)
+# ✅ Índice local `ID → @rid` compartido con orientdb_dataload.py
+# 📌 Índice, ledger y dead-letter no abren su archivo hasta el primer uso: importar no toca DATA_DIR
+RID_INDEX = RidIndex(default_index_path(DATA_DIR), execute_query)
 
-    # ✅ Convertir fechas al formato correcto
-    df["BIRTHDAY"] = pd.to_datetime(df["BIRTHDAY"], errors="coerce").dt.strftime("%Y-%m-%d %H:%M:%S")
-    df["CREATE_DATE"] = pd.to_datetime(df["CREATE_DATE"], errors="coerce").dt.strftime("%Y-%m-%d %H:%M:%S")
-    df["PLACE"] = df["PLACE"].astype(int)
+# ✅ Ledger de lotes confirmados para `--resume`
+LEDGER = LoadLedger(default_ledger_path(DATA_DIR, "fixer"))
 
-    
+# ✅ Registros rechazados por el servidor (aislados por bisección)
+DEAD_LETTER = DeadLetterFile(default_dead_letter_path(DATA_DIR, "fixer"))
 
-    print(f"📌 Insertando {len(df)} registros en {entity_name}...")
-    insert_batch(entity_name, df.to_dict(orient="records"))
-    print(f"✅ Carga de {entity_name} completada.")
+# ✅ Inserción por lotes y carga de Customer/Person compartidas con orientdb_dataload.py
+LOADER = BatchLoader(EXECUTOR, METRICS, RID_INDEX, LEDGER, DEAD_LETTER, LOG)
+insert_batch = LOADER.insert_batch
 
 
+# 📌 **Customer, Person y sus fragmentos en una sola pasada**
+def load_customer_person_data(file_name="Customer/person_0_0.csv", chunksize=100000):
+    LOADER.load_customer_person(DATA_DIR, file_name, chunksize)
 
 
 def load_post_data(entity_name, file_name):
     file_path = os.path.join(DATA_DIR, "SocialNetwork", file_name)
 
     if not os.path.exists(file_path):
-        print(f"⚠️ Archivo {file_path} no encontrado. Saltando {entity_name}...")
+        LOG.warning(f"⚠️ Archivo {file_path} no encontrado. Saltando {entity_name}...")
         return
 
-    print(f"📂 Cargando {file_name} en {entity_name} en lotes de 500,000...")
-
     batch_size = 100000  # 🔥 Leer en partes para evitar memoria alta
+    LOG.info(f"📂 Cargando {file_name} en {entity_name} en lotes de {batch_size:,}...")
+    progress = Progress(LOG, entity_name, total=estimate_rows(file_path))
     chunks = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip", chunksize=batch_size)
 
-    for i, df in enumerate(chunks):
-        print(f"🔄 Procesando lote {i+1} de {entity_name} con {len(df)} registros...")
+    for i, df in enumerate(METRICS.timed(entity_name, "read", chunks)):
+        LOG.debug(f"🔄 Procesando lote {i+1} de {entity_name} con {len(df)} registros...")
 
         # ✅ Renombrar columnas para coincidir con el esquema en OrientDB
         df.rename(columns={
@@ -277,113 +280,89 @@ def load_post_data(entity_name, file_name):
         }, inplace=True)
 
         # ✅ Convertir fechas y valores
-        df["CREATE_DATE"] = pd.to_datetime(df["CREATE_DATE"], errors="coerce").dt.strftime("%Y-%m-%d %H:%M:%S")
-        df["LENGTH"] = df["LENGTH"].astype(int)
+        with METRICS.stage(entity_name, "transform"):
+            df["CREATE_DATE"] = pd.to_datetime(df["CREATE_DATE"], errors="coerce").dt.strftime("%Y-%m-%d %H:%M:%S")
+            df["LENGTH"] = df["LENGTH"].astype(int)
 
-        print(f"📌 Insertando {len(df)} registros en {entity_name}...")
-        insert_batch(entity_name, df.to_dict(orient="records"), batch_size=1000)
+        debug_sample(LOG, entity_name, df, i)
+        progress.update(insert_batch(entity_name, df.to_dict(orient="records"), batch_size=1000, id_field="POST_ID", checkpoint=(file_name, i)))
 
-    print(f"✅ Carga de {entity_name} completada.")
+    progress.finish()
+    LOG.info(f"✅ Carga de {entity_name} completada.")
 
 # 📌 **Carga de `Tag`**
 def load_tag(entity_name,file_name):
     file_path = os.path.join(DATA_DIR, "SocialNetwork", file_name)  
 
     if not os.path.exists(file_path):
-        print(f"⚠️ Archivo {file_path} no encontrado. Saltando `Tag`...")
+        LOG.warning(f"⚠️ Archivo {file_path} no encontrado. Saltando `Tag`...")
         return
 
-    print(f"📂 Cargando {file_path} en `Tag`...")
+    LOG.info(f"📂 Cargando {file_path} en `Tag`...")
 
-    df = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
+    with METRICS.stage("Tag", "read"):
+        df = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
 
     # ✅ Renombrar columnas para coincidir con el esquema
     df.rename(columns={"ID": "TAG_ID", "TITLE": "TITLE"}, inplace=True)
 
 
-    print(f"📌 Insertando {len(df)} registros en `Tag`...")
-    insert_batch("Tag", df.to_dict(orient="records"))
-    print(f"✅ Carga de `Tag` completada.")
+    LOG.info(f"📌 Insertando {len(df)} registros en `Tag`...")
+    insert_batch("Tag", df.to_dict(orient="records"), id_field="TAG_ID", checkpoint=(file_name, 0))
+    LOG.info(f"✅ Carga de `Tag` completada.")
 
 def load_post_has_creator():
     file_name = "post_hasCreator_person_0_0.csv"
     file_path = os.path.join(DATA_DIR, "SocialNetwork", file_name)
 
     if not os.path.exists(file_path):
-        print(f"⚠️ Archivo {file_path} no encontrado. Saltando POST_HAS_CREATOR_PERSON...")
+        LOG.warning(f"⚠️ Archivo {file_path} no encontrado. Saltando POST_HAS_CREATOR_PERSON...")
         return
 
-    print(f"📂 Cargando {file_path} en POST_HAS_CREATOR_PERSON...")
+    LOG.info(f"📂 Cargando {file_path} en POST_HAS_CREATOR_PERSON...")
 
-    batch_size = 50000  # 🔥 Procesamos en lotes de 50,000 para evitar sobrecarga
-    chunks = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip", chunksize=batch_size)
-
-    for i, df in enumerate(chunks):
-        print(f"🔄 Procesando lote {i+1} con {len(df)} relaciones...")
-
-        df.rename(columns={"POST_ID": "FROM_ID", "PERSON_ID": "TO_ID"}, inplace=True)
-
-        # 🔍 **DEBUG: Imprimir las primeras filas del CSV**
-        print("🔍 Primeras filas del CSV:")
-        print(df.head())
-
-        # 🔥 Obtener SOLO los RIDs del lote actual
-        post_rids = get_rid_map_limited("Post", "POST_ID", limit=batch_size)
-        person_rids = get_rid_map_limited("Person", "PERSON_ID", limit=batch_size)
+    if EDGE_LOAD_MODE == "indexed":
+        insert_edge_batch_indexed("POST_HAS_CREATOR_PERSON", file_name, ("Post", "POST_ID"), ("Person", "PERSON_ID"), "POST_ID", "PERSON_ID", batch_size=2000)
+        return
 
-        # 🔍 **DEBUG: Mostrar claves obtenidas**
-        print(f"🔍 Claves en post_rids: {list(post_rids.keys())[:10]}")
-        print(f"🔍 Claves en person_rids: {list(person_rids.keys())[:10]}")
+    # 🔥 Los RIDs salen del índice local, no de OrientDB
+    post_rids = RID_INDEX.get_map("Post", "POST_ID")
+    person_rids = RID_INDEX.get_map("Person", "PERSON_ID")
 
-        insert_edge_batch("POST_HAS_CREATOR_PERSON", file_name, post_rids, person_rids, "FROM_ID", "TO_ID", batch_size=2000)
+    insert_edge_batch("POST_HAS_CREATOR_PERSON", file_name, post_rids, person_rids, "POST_ID", "PERSON_ID", batch_size=2000)
 
-        # 🧹 **Liberamos memoria tras cada lote**
-        del df, post_rids, person_rids
-        gc.collect()
+    del post_rids, person_rids
+    gc.collect()
 
-    print(f"✅ Carga de POST_HAS_CREATOR_PERSON completada.")
+    LOG.info(f"✅ Carga de POST_HAS_CREATOR_PERSON completada.")
 
 
 def load_customer_knows_person():
-    print("🔍 `load_customer_knows_person()` fue llamada desde:")
-    traceback.print_stack()  # 🔥 Esto imprimirá dónde se está llamando la función
     file_name = "person_knows_person_0_0.csv"
     file_path = os.path.join(DATA_DIR, "SocialNetwork", file_name)
 
     if not os.path.exists(file_path):
-        print(f"⚠️ Archivo {file_path} no encontrado. Saltando Customer_Knows_Person...")
+        LOG.warning(f"⚠️ Archivo {file_path} no encontrado. Saltando Customer_Knows_Person...")
         return
 
-    print(f"📂 Cargando {file_path} en Customer_Knows_Person...")
-
-    batch_size = 10000  
-    chunks = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip", chunksize=batch_size)
-
-    for i, df in enumerate(chunks):
-        print(f"🔄 Procesando lote {i+1} con {len(df)} relaciones...")
-
-        # ✅ **Corregir nombres de columnas**
-        df.rename(columns={"from": "FROM_ID", "to": "TO_ID"}, inplace=True)
-
-        # ✅ **Depuración: Verificar los primeros valores**
-        print(f"🔍 Primeras filas del CSV:\n{df.head()}")
+    LOG.info(f"📂 Cargando {file_path} en Customer_Knows_Person...")
 
-        # ✅ **Obtener SOLO los RIDs necesarios**
-        customer_rids = get_rid_map_limited("Customer", "CUSTOMER_ID", limit=batch_size)
-        person_rids = get_rid_map_limited("Person", "PERSON_ID", limit=batch_size)
+    if EDGE_LOAD_MODE == "indexed":
+        insert_edge_batch_indexed("CUSTOMER_KNOWS_PERSON", file_name, ("Customer", "CUSTOMER_ID"), ("Person", "PERSON_ID"), "from", "to", batch_size=10000)
+        return
 
-        # ✅ **Depuración: Revisar si los RIDs se están obteniendo correctamente**
-        print(f"🔍 Claves en customer_rids (ejemplo): {list(customer_rids.keys())[:10]}")
-        print(f"🔍 Claves en person_rids (ejemplo): {list(person_rids.keys())[:10]}")
+    # ✅ **Obtener los RIDs desde el índice local**
+    customer_rids = RID_INDEX.get_map("Customer", "CUSTOMER_ID")
+    person_rids = RID_INDEX.get_map("Person", "PERSON_ID")
 
-        # ✅ **Insertar las relaciones**
-        insert_edge_batch("CUSTOMER_KNOWS_PERSON", file_name, customer_rids, person_rids, "FROM_ID", "TO_ID", batch_size=10000)
+    # ✅ **Insertar las relaciones**
+    insert_edge_batch("CUSTOMER_KNOWS_PERSON", file_name, customer_rids, person_rids, "from", "to", batch_size=10000)
 
-        # 🧹 **Liberar memoria**
-        del df, customer_rids, person_rids
-        gc.collect()
+    # 🧹 **Liberar memoria**
+    del customer_rids, person_rids
+    gc.collect()
 
-    print(f"✅ Carga de Customer_Knows_Person completada.")
+    LOG.info(f"✅ Carga de Customer_Knows_Person completada.")
 
 def load_post_has_tag():
     file_name = "post_hasTag_tag_0_0.csv"
@@ -392,19 +371,17 @@ def load_post_has_tag():
     if not os.path.exists(file_path):
         return
 
-    batch_size = 100000  
-    chunks = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip", chunksize=batch_size)
-
-    for df in chunks:
-        df.rename(columns={"POST_ID": "POST_ID", "TAG_ID": "TAG_ID"}, inplace=True)
+    if EDGE_LOAD_MODE == "indexed":
+        insert_edge_batch_indexed("POST_HAS_TAG", file_name, ("Post", "POST_ID"), ("Tag", "TAG_ID"), "POST_ID", "TAG_ID", batch_size=1000)
+        return
 
-        post_rids = get_rid_map_limited("Post", "POST_ID", limit=200000)
-        tag_rids = get_rid_map_limited("Tag", "TAG_ID", limit=200000)
+    post_rids = RID_INDEX.get_map("Post", "POST_ID")
+    tag_rids = RID_INDEX.get_map("Tag", "TAG_ID")
 
-        insert_edge_batch("POST_HAS_TAG", file_name, post_rids, tag_rids, "POST_ID", "TAG_ID", batch_size=1000)
+    insert_edge_batch("POST_HAS_TAG", file_name, post_rids, tag_rids, "POST_ID", "TAG_ID", batch_size=1000)
 
-        del df, post_rids, tag_rids
-        gc.collect()
+    del post_rids, tag_rids
+    gc.collect()
 
 
 def load_person_has_interest_tag():
@@ -414,46 +391,71 @@ def load_person_has_interest_tag():
     if not os.path.exists(file_path):
         return
 
-    batch_size = 100000  
-    chunks = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip", chunksize=batch_size)
+    if EDGE_LOAD_MODE == "indexed":
+        insert_edge_batch_indexed("PERSON_HAS_INTEREST_TAG", file_name, ("Person", "PERSON_ID"), ("Tag", "TAG_ID"), "PERSON_ID", "TAG_ID", batch_size=1000)
+        return
 
-    for df in chunks:
-        df.rename(columns={"PERSON_ID": "PERSON_ID", "TAG_ID": "TAG_ID"}, inplace=True)
+    person_rids = RID_INDEX.get_map("Person", "PERSON_ID")
+    tag_rids = RID_INDEX.get_map("Tag", "TAG_ID")
 
-        person_rids = get_rid_map_limited("Person", "PERSON_ID", limit=200000)
-        tag_rids = get_rid_map_limited("Tag", "TAG_ID", limit=200000)
+    insert_edge_batch("PERSON_HAS_INTEREST_TAG", file_name, person_rids, tag_rids, "PERSON_ID", "TAG_ID", batch_size=1000)
 
-        insert_edge_batch("PERSON_HAS_INTEREST_TAG", file_name, person_rids, tag_rids, "PERSON_ID", "TAG_ID", batch_size=1000)
+    del person_rids, tag_rids
+    gc.collect()
 
-        del df, person_rids, tag_rids
-        gc.collect()
 
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Carga de KhaBench en OrientDB")
+    parser.add_argument("--resume", action="store_true", help="continúa desde el primer lote no confirmado según el ledger")
+    parser.add_argument("--parallel", type=int, default=LOAD_PARALLELISM, help="cargas independientes en paralelo (1 = en serie)")
+    parser.add_argument("--edge-mode", choices=EDGE_LOAD_MODES, default=EDGE_LOAD_MODE,
+                        help="rid_map: FROM/TO desde el índice local de RIDs; indexed: subconsultas por ID en el servidor")
+    parser.add_argument("--route-writes", action="store_true",
+                        help="envía cada lote al nodo dueño del cluster de su clase (default-distributed-db-config.json)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    EDGE_LOAD_MODE = args.edge_mode
+
+    if args.route_writes:
+        EXECUTOR.close()
+        EXECUTOR = RoutedExecutor(
+            NodeRouter(ORIENTDB_HOST), DB_NAME, USERNAME, PASSWORD,
+            concurrency=CONCURRENCY, timeout=REQUEST_TIMEOUT, gzip_body=GZIP_REQUESTS, retries=MAX_RETRIES,
+            metrics=METRICS
+        )
+        LOADER.executor = EXECUTOR
+        for class_name, host in EXECUTOR.router.routes().items():
+            LOG.info(f"📡 {class_name} → {host}")
+    if not args.resume:
+        LEDGER.reset()  # 🔥 Carga desde cero: se olvidan los lotes de ejecuciones anteriores
 
-load_customer_data("Customer", "Customer/person_0_0.csv")
-load_customer_data("Customer_North", "Customer/person_0_0_north.csv")
-load_customer_data("Customer_Center", "Customer/person_0_0_center.csv")
-load_customer_data("Customer_South", "Customer/person_0_0_south.csv")
+    # 📌 Vértices antes que las aristas que los referencian; lo independiente va en paralelo
+    scheduler = LoadScheduler(parallelism=args.parallel)
 
-load_person_data("Person", "Customer/person_0_0.csv")
-load_person_data("Person_North", "Customer/person_0_0_north.csv")
-load_person_data("Person_Center", "Customer/person_0_0_center.csv")
-load_person_data("Person_South", "Customer/person_0_0_south.csv")
+    # 📌 Customer, Person y fragmentos North/Center/South en una sola pasada
+    scheduler.add("customer_person", load_customer_person_data, "Customer/person_0_0.csv")
 
-load_customer_knows_person()
+    scheduler.add("customer_knows_person", load_customer_knows_person, after=["customer_person"])
 
-# load_post_data("Post", "post_0_0.csv")
-# load_post_data("Post_Short", "post_0_0_short.csv")
-# load_post_data("Post_Medium", "post_0_0_medium.csv")
-# load_post_data("Post_Long", "post_0_0_long.csv")
+    # scheduler.add("post", load_post_data, "Post", "post_0_0.csv")
+    # scheduler.add("post_short", load_post_data, "Post_Short", "post_0_0_short.csv")
+    # scheduler.add("post_medium", load_post_data, "Post_Medium", "post_0_0_medium.csv")
+    # scheduler.add("post_long", load_post_data, "Post_Long", "post_0_0_long.csv")
 
-# load_post_has_creator()
+    # scheduler.add("post_has_creator", load_post_has_creator, after=["post", "customer_person"])
 
-# load_tag("TAG", "tag.csv")
+    # scheduler.add("tag", load_tag, "TAG", "tag.csv")
 
-# load_post_has_tag()
-# load_person_has_interest_tag()
+    # scheduler.add("post_has_tag", load_post_has_tag, after=["post", "tag"])
+    # scheduler.add("person_has_interest_tag", load_person_has_interest_tag, after=["customer_person", "tag"])
 
+    scheduler.run()
 
-print("🎉 Carga de entidades y fragmentos completada con COMMIT y ROLLBACK.")
\ No newline at end of file
+    # 📊 Métricas por entidad y etapa
+    LOG.info(f"📊 Métricas en {', '.join(METRICS.export(default_metrics_path(DATA_DIR, 'fixer')))}")
+    LOG.info("🎉 Carga de entidades y fragmentos completada con COMMIT y ROLLBACK.")
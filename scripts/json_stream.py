@@ -0,0 +1,57 @@
+import json
+
+
+# ✅ Lectura incremental de JSON
+# Acepta tanto un array `[{...}, {...}]` como JSON Lines / objetos concatenados, y
+# devuelve un objeto cada vez sin cargar el archivo entero en memoria.
+READ_SIZE = 1 << 20
+
+_decoder = json.JSONDecoder()
+_SEPARATORS = " \t\r\n,"
+
+
+def iter_json_records(path, read_size=READ_SIZE):
+    """Genera los objetos de un archivo JSON (array o JSON Lines) uno a uno."""
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        pos = 0
+        eof = False
+        in_array = None
+
+        while True:
+            # Saltar separadores: espacios, comas y los corchetes del array
+            while True:
+                while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+                    pos += 1
+                if pos < len(buffer) and in_array is None:
+                    in_array = buffer[pos] == "["
+                    if in_array:
+                        pos += 1
+                        continue
+                if pos < len(buffer) and in_array and buffer[pos] == "]":
+                    return
+                if pos < len(buffer) or eof:
+                    break
+                buffer = buffer[pos:] + f.read(read_size)
+                pos = 0
+                eof = len(buffer) == 0
+
+            if pos >= len(buffer):
+                if in_array:
+                    raise ValueError(f"{path}: array JSON sin cerrar")
+                return
+
+            try:
+                record, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Objeto partido entre dos lecturas: leemos más y reintentamos
+                chunk = f.read(read_size)
+                eof = chunk == ""
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+
+            yield record
+            pos = end
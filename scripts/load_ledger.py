@@ -0,0 +1,101 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+# ✅ Registro local de lotes confirmados, para reanudar cargas interrumpidas (--resume)
+# Cada lote se identifica por (entidad, archivo de origen, id de lote); los chunks
+# completos se registran como `chunk:<n>` para poder saltarse también su transformación.
+# Los sublotes que una bisección ya resolvió se registran como `<lote>:<inicio>+<tamaño>`,
+# para no reenviarlos si la bisección se corta a medias.
+class LoadLedger:
+    """Ledger en sqlite con los lotes que ya se confirmaron en la base de datos."""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._lock = threading.RLock()
+        self._cache = {}
+
+    @property
+    def conn(self):
+        """Conexión sqlite, abierta en el primer uso: importar un cargador no toca el disco."""
+        with self._lock:
+            if self._conn is None:
+                # Compartida entre las tareas del planificador: cada acceso va bajo `_lock`
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS batches ("
+                    "entity TEXT NOT NULL, source TEXT NOT NULL, batch_id TEXT NOT NULL, "
+                    "records INTEGER NOT NULL, committed_at REAL NOT NULL, "
+                    "PRIMARY KEY (entity, source, batch_id)) WITHOUT ROWID"
+                )
+                conn.commit()
+                self._conn = conn
+            return self._conn
+
+    def _committed(self, entity, source):
+        key = (entity, source)
+        with self._lock:
+            if key not in self._cache:
+                cursor = self.conn.execute(
+                    "SELECT batch_id FROM batches WHERE entity = ? AND source = ?", key
+                )
+                self._cache[key] = {row[0] for row in cursor}
+            return self._cache[key]
+
+    def reset(self, entity=None):
+        """Olvida los lotes registrados (de una entidad o de todas) para cargar desde cero."""
+        with self._lock, self.conn:
+            if entity is None:
+                self.conn.execute("DELETE FROM batches")
+            else:
+                self.conn.execute("DELETE FROM batches WHERE entity = ?", (entity,))
+            self._cache.clear()
+
+    def is_committed(self, entity, source, batch_id):
+        return str(batch_id) in self._committed(entity, source)
+
+    def mark_committed(self, entity, source, batch_id, records=0):
+        batch_id = str(batch_id)
+        with self._lock:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO batches VALUES (?, ?, ?, ?, ?)",
+                    (entity, source, batch_id, records, time.time()),
+                )
+            self._committed(entity, source).add(batch_id)
+
+    def mark_part(self, entity, source, batch_id, start, size, records=0):
+        self.mark_committed(entity, source, f"{batch_id}:{start}+{size}", records)
+
+    def parts(self, entity, source, batch_id):
+        """Sublotes ya resueltos de un lote, como `(inicio, tamaño)` relativos al lote."""
+        prefix = f"{batch_id}:"
+        parts = []
+        with self._lock:
+            for key in self._committed(entity, source):
+                start, plus, size = key[len(prefix):].partition("+")
+                if key.startswith(prefix) and plus and start.isdigit() and size.isdigit():
+                    parts.append((int(start), int(size)))
+        return parts
+
+    def chunk_done(self, entity, source, chunk):
+        return self.is_committed(entity, source, f"chunk:{chunk}")
+
+    def mark_chunk(self, entity, source, chunk, records=0):
+        self.mark_committed(entity, source, f"chunk:{chunk}", records)
+
+    def summary(self):
+        with self._lock:
+            cursor = self.conn.execute(
+                "SELECT entity, COUNT(*), SUM(records) FROM batches WHERE batch_id NOT LIKE 'chunk:%' AND batch_id NOT LIKE '%+%' GROUP BY entity"
+            )
+            return {entity: (batches, records or 0) for entity, batches, records in cursor}
+
+
+def default_ledger_path(data_dir, loader):
+    """Un ledger por script de carga, para que reiniciar uno no borre el progreso de otro."""
+    return os.environ.get("KHAB_LEDGER", os.path.join(data_dir, f"load_ledger_{loader}.sqlite"))
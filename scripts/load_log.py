@@ -0,0 +1,148 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+
+# ✅ Nivel de los cargadores: DEBUG, INFO, WARNING o ERROR (KHAB_LOG_LEVEL)
+LOG_LEVEL = os.environ.get("KHAB_LOG_LEVEL", "INFO").upper()
+
+# ✅ Formato: "text" (una línea legible) o "json" (un objeto por línea, con los campos de progreso)
+LOG_FORMAT = os.environ.get("KHAB_LOG_FORMAT", "text")
+
+# ✅ Segundos mínimos entre dos líneas de progreso de la misma carga
+PROGRESS_INTERVAL = float(os.environ.get("KHAB_PROGRESS_INTERVAL", "10"))
+
+# ✅ Muestreo de depuración: 1 de cada N lotes muestra sus primeras filas (0 = apagado).
+# Solo tiene efecto con KHAB_LOG_LEVEL=DEBUG.
+DEBUG_SAMPLE_EVERY = int(os.environ.get("KHAB_DEBUG_SAMPLE", "0"))
+DEBUG_SAMPLE_ROWS = 5
+
+# 📌 Bytes que se leen del inicio del archivo para estimar cuántas filas tiene
+ESTIMATE_SAMPLE_BYTES = 1 << 20
+
+
+class JsonFormatter(logging.Formatter):
+    """Un objeto JSON por línea; los campos de `extra={"fields": {...}}` van al nivel superior."""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _configure():
+    root = logging.getLogger("khab")
+    if root.handlers:
+        return root
+    handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S"))
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+    root.propagate = False
+    return root
+
+
+def get_logger(name):
+    """Logger `khab.<name>` con la configuración común de los cargadores."""
+    _configure()
+    return logging.getLogger(f"khab.{name}")
+
+
+def estimate_rows(file_path, sample_bytes=ESTIMATE_SAMPLE_BYTES):
+    """Filas aproximadas de un CSV (sin encabezado) a partir del tamaño medio de línea del primer MiB."""
+    try:
+        size = os.path.getsize(file_path)
+        with open(file_path, "rb") as f:
+            sample = f.read(sample_bytes)
+    except OSError:
+        return None
+    lines = sample.count(b"\n")
+    if not lines:
+        return None
+    if len(sample) >= size:
+        return max(lines - 1, 0)  # 🔥 Archivo completo en la muestra: cuenta exacta
+    return max(int(size * lines / len(sample)) - 1, 0)
+
+
+def _duration(seconds):
+    if seconds is None:
+        return "?"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class Progress:
+    """Progreso de una carga: como mucho una línea cada `interval` segundos, con throughput y ETA.
+
+    `update()` es seguro entre hilos y barato cuando no toca escribir, así se puede llamar
+    en cada lote confirmado.
+    """
+
+    def __init__(self, logger, entity, total=None, unit="registros", interval=None):
+        self.logger = logger
+        self.entity = entity
+        self.total = total
+        self.unit = unit
+        self.interval = PROGRESS_INTERVAL if interval is None else interval
+        self.done = 0
+        self.started = time.monotonic()
+        self._last = self.started
+        self._lock = threading.Lock()
+
+    def update(self, n=1):
+        with self._lock:
+            self.done += n
+            now = time.monotonic()
+            if now - self._last < self.interval:
+                return
+            self._last = now
+            done = self.done
+        self._emit(done, now, "📈")
+
+    def finish(self):
+        """Línea final con el total y el throughput medio, sin límite de frecuencia."""
+        with self._lock:
+            done = self.done
+        self._emit(done, time.monotonic(), "🏁", final=True)
+
+    def _emit(self, done, now, icon, final=False):
+        elapsed = now - self.started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        fields = {"entity": self.entity, "done": done, "elapsed_s": round(elapsed, 1), "rate": round(rate, 1)}
+        text = f"{icon} {self.entity}: {done:,} {self.unit}"
+        if self.total and not final:
+            # 📌 La estimación puede quedarse corta: el ETA nunca baja de cero
+            remaining = max(self.total - done, 0)
+            eta = remaining / rate if rate > 0 else None
+            fields.update(total=self.total, eta_s=None if eta is None else round(eta, 1))
+            text += f" de ~{self.total:,} ({min(done / self.total, 1.0):.0%})"
+        text += f" · {rate:,.0f} {self.unit}/s · {_duration(elapsed)}"
+        if self.total and not final:
+            text += f" · ETA {_duration(fields['eta_s'])}"
+        self.logger.info(text, extra={"fields": fields})
+
+
+def debug_sample(logger, label, data, index=0):
+    """Muestra las primeras filas de `data` (DataFrame o lista) en 1 de cada DEBUG_SAMPLE_EVERY lotes.
+
+    Apagado por defecto: sin KHAB_DEBUG_SAMPLE ni nivel DEBUG no formatea nada.
+    """
+    if not DEBUG_SAMPLE_EVERY or index % DEBUG_SAMPLE_EVERY or not logger.isEnabledFor(logging.DEBUG):
+        return
+    head = data.head(DEBUG_SAMPLE_ROWS) if hasattr(data, "head") else list(data[:DEBUG_SAMPLE_ROWS])
+    logger.debug(f"🔍 Muestra de {label} (lote {index + 1}):\n{head}")
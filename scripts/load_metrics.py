@@ -0,0 +1,184 @@
+import io
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# ✅ Métricas por entidad y etapa de la carga, exportables como JSON Lines y como Prometheus
+# Etapas: read (lectura del archivo), transform (pandas), serialize (JSON/SQL del lote),
+# send (subida del cuerpo HTTP) y server_ack (desde el fin de la subida hasta la respuesta).
+STAGES = ("read", "transform", "serialize", "send", "server_ack")
+
+# 📌 Límites (segundos) del histograma de latencia por lote
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class TimedBody(io.BytesIO):
+    """Cuerpo de petición que anota cuándo el cliente HTTP terminó de leerlo (y de enviarlo)."""
+
+    sent_at = None
+
+    def read(self, size=-1):
+        data = super().read(size)
+        if not data and self.sent_at is None:
+            self.sent_at = time.perf_counter()
+        return data
+
+
+class LoadMetrics:
+    """Tiempos por etapa, contadores e histogramas de latencia por entidad, compartidos entre hilos."""
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.stages = {}      # (entidad, etapa) → [segundos, llamadas]
+        self.counters = {}    # (entidad, nombre) → valor
+        self.histograms = {}  # entidad → [conteos por límite..., +Inf, suma]
+        self.window = {}      # entidad → [primer evento, último evento]
+
+    def _touch(self, entity, now):
+        window = self.window.setdefault(entity, [now, now])
+        window[1] = now
+
+    def add_time(self, entity, stage, seconds, calls=1):
+        now = time.time()
+        with self._lock:
+            totals = self.stages.setdefault((entity, stage), [0.0, 0])
+            totals[0] += seconds
+            totals[1] += calls
+            self._touch(entity, now)
+
+    def count(self, entity, name, n=1):
+        now = time.time()
+        with self._lock:
+            self.counters[(entity, name)] = self.counters.get((entity, name), 0) + n
+            self._touch(entity, now)
+
+    def observe_batch(self, entity, seconds):
+        with self._lock:
+            histogram = self.histograms.setdefault(entity, [0] * (len(LATENCY_BUCKETS) + 1) + [0.0])
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    histogram[i] += 1
+            histogram[len(LATENCY_BUCKETS)] += 1
+            histogram[-1] += seconds
+
+    @contextmanager
+    def stage(self, entity, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(entity, stage, time.perf_counter() - start)
+
+    def timed(self, entity, stage, iterable):
+        """Recorre `iterable` sumando a `stage` el tiempo de cada `next()` (p. ej. chunks de read_csv)."""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(entity, stage, time.perf_counter() - start, calls=0)
+                return
+            self.add_time(entity, stage, time.perf_counter() - start)
+            yield item
+
+    def snapshot(self):
+        """Un dict por entidad con contadores, etapas, histograma y registros/s."""
+        with self._lock:
+            entities = sorted(set(self.window))
+            rows = []
+            for entity in entities:
+                first, last = self.window[entity]
+                counters = {name: value for (e, name), value in self.counters.items() if e == entity}
+                records = counters.get("records", 0)
+                histogram = self.histograms.get(entity)
+                rows.append({
+                    "loader": self.loader,
+                    "entity": entity,
+                    "started": self.started,
+                    "seconds": round(last - first, 3),
+                    "records": records,
+                    "records_per_sec": round(records / (last - first), 1) if last > first else 0.0,
+                    "bytes_sent": counters.get("bytes", 0),
+                    "batches": counters.get("batches", 0),
+                    "errors": counters.get("errors", 0),
+                    "rejected": counters.get("rejected", 0),
+                    "stages": {
+                        stage: {"seconds": round(self.stages[(entity, stage)][0], 6),
+                                "calls": self.stages[(entity, stage)][1]}
+                        for stage in STAGES if (entity, stage) in self.stages
+                    },
+                    "batch_latency": None if histogram is None else {
+                        "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], histogram[:-1])),
+                        "sum": round(histogram[-1], 6),
+                        "count": histogram[len(LATENCY_BUCKETS)],
+                    },
+                })
+            return rows
+
+    def write_jsonl(self, path):
+        """Añade una línea por entidad (las ejecuciones sucesivas se acumulan en el archivo)."""
+        with open(path, "a", encoding="utf-8") as f:
+            for row in self.snapshot():
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def prometheus_lines(self):
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}")
+
+        rows = self.snapshot()
+        base = [({"loader": self.loader, "entity": row["entity"]}, row) for row in rows]
+        metric("khab_load_records_total", "counter", "Registros confirmados", [(l, r["records"]) for l, r in base])
+        metric("khab_load_records_per_second", "gauge", "Registros confirmados por segundo",
+               [(l, r["records_per_sec"]) for l, r in base])
+        metric("khab_load_bytes_sent_total", "counter", "Bytes de cuerpo HTTP enviados", [(l, r["bytes_sent"]) for l, r in base])
+        metric("khab_load_batches_total", "counter", "Peticiones de lote enviadas", [(l, r["batches"]) for l, r in base])
+        metric("khab_load_errors_total", "counter", "Peticiones fallidas o sin respuesta", [(l, r["errors"]) for l, r in base])
+        metric("khab_load_rejected_total", "counter", "Registros enviados al dead-letter", [(l, r["rejected"]) for l, r in base])
+        metric("khab_load_stage_seconds_total", "counter", "Segundos acumulados por etapa",
+               [(dict(l, stage=stage), values["seconds"]) for l, r in base for stage, values in r["stages"].items()])
+        metric("khab_load_stage_calls_total", "counter", "Llamadas por etapa",
+               [(dict(l, stage=stage), values["calls"]) for l, r in base for stage, values in r["stages"].items()])
+
+        lines.append("# HELP khab_load_batch_latency_seconds Latencia de ida y vuelta por lote")
+        lines.append("# TYPE khab_load_batch_latency_seconds histogram")
+        for labels, row in base:
+            latency = row["batch_latency"]
+            if latency is None:
+                continue
+            label_text = f'loader="{labels["loader"]}",entity="{labels["entity"]}"'
+            for bound, value in latency["buckets"].items():
+                lines.append(f'khab_load_batch_latency_seconds_bucket{{{label_text},le="{bound}"}} {value}')
+            lines.append(f"khab_load_batch_latency_seconds_sum{{{label_text}}} {latency['sum']}")
+            lines.append(f"khab_load_batch_latency_seconds_count{{{label_text}}} {latency['count']}")
+        return lines
+
+    def write_prometheus(self, path):
+        """Escribe el formato de texto de Prometheus (válido para el textfile collector)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.prometheus_lines()) + "\n")
+        os.replace(tmp_path, path)  # 🔥 El collector nunca lee un archivo a medias
+
+    def export(self, prefix):
+        """Escribe `<prefix>.jsonl` y `<prefix>.prom`; devuelve ambas rutas."""
+        jsonl_path, prom_path = f"{prefix}.jsonl", f"{prefix}.prom"
+        self.write_jsonl(jsonl_path)
+        self.write_prometheus(prom_path)
+        return jsonl_path, prom_path
+
+
+def default_metrics_path(data_dir, loader):
+    """Prefijo de los archivos de métricas; KHAB_METRICS_DIR cambia el directorio."""
+    return os.path.join(os.environ.get("KHAB_METRICS_DIR", data_dir), f"metrics_{loader}")
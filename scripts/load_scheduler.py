@@ -0,0 +1,136 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from load_log import get_logger
+
+LOG = get_logger("load_scheduler")
+
+
+# ✅ Planificador de cargas como DAG
+# Cada tarea declara de qué cargas depende (vértices antes que aristas, Vendor antes que Product...)
+# y las que son independientes se ejecutan en paralelo en un pool de hilos. El tiempo total
+# queda marcado por la cadena más larga (camino crítico) y no por la suma de todas las cargas.
+class LoadScheduler:
+    """Ejecuta tareas de carga respetando sus dependencias, con como mucho `parallelism` a la vez."""
+
+    def __init__(self, parallelism=4):
+        self.parallelism = max(1, parallelism)
+        self.tasks = {}
+        self.deps = {}
+        self.status = {}
+        self.started = {}
+        self.durations = {}
+        self.wall_time = 0.0
+
+    def add(self, name, func, *args, after=(), **kwargs):
+        """Registra `func(*args, **kwargs)` como tarea `name`, que corre tras las tareas de `after`."""
+        if name in self.tasks:
+            raise ValueError(f"Tarea duplicada: {name}")
+        self.tasks[name] = (func, args, kwargs)
+        self.deps[name] = tuple(after)
+        return name
+
+    def order(self):
+        """Orden topológico de las tareas; falla si hay dependencias desconocidas o ciclos."""
+        for name, deps in self.deps.items():
+            unknown = [d for d in deps if d not in self.tasks]
+            if unknown:
+                raise ValueError(f"La tarea {name} depende de tareas inexistentes: {unknown}")
+
+        ordered = []
+        state = {}
+
+        def visit(name, chain):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Ciclo de dependencias: {' → '.join(chain + [name])}")
+            state[name] = "visiting"
+            for dep in self.deps[name]:
+                visit(dep, chain + [name])
+            state[name] = "done"
+            ordered.append(name)
+
+        for name in self.tasks:
+            visit(name, [])
+        return ordered
+
+    def _run_task(self, name, origin):
+        func, args, kwargs = self.tasks[name]
+        self.started[name] = time.perf_counter() - origin
+        LOG.info(f"▶️ Iniciando {name}")
+        start = time.perf_counter()
+        try:
+            func(*args, **kwargs)
+            ok = True
+        except Exception:
+            LOG.exception(f"❌ La tarea {name} falló:")
+            ok = False
+        self.durations[name] = time.perf_counter() - start
+        self.status[name] = "ok" if ok else "failed"
+        LOG.info(f"{'✅' if ok else '❌'} {name} terminó en {self.durations[name]:.1f} s")
+        return ok
+
+    def run(self):
+        """Ejecuta el DAG. Las tareas cuyas dependencias fallaron se omiten. Devuelve True si todo fue bien."""
+        waiting = self.order()
+        done, failed = set(), set()
+        running = {}
+        origin = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.parallelism) as pool:
+            while waiting or running:
+                for name in list(waiting):
+                    deps = self.deps[name]
+                    if any(dep in failed for dep in deps):
+                        waiting.remove(name)
+                        failed.add(name)
+                        self.status[name] = "skipped"
+                        LOG.warning(f"⏭️ Se omite {name}: falló una de sus dependencias")
+                    elif all(dep in done for dep in deps) and len(running) < self.parallelism:
+                        waiting.remove(name)
+                        running[pool.submit(self._run_task, name, origin)] = name
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    (done if future.result() else failed).add(name)
+
+        self.wall_time = time.perf_counter() - origin
+        self.report()
+        return not failed
+
+    def critical_path(self):
+        """Cadena de dependencias con mayor duración acumulada: `(tareas, segundos)`."""
+        total, previous = {}, {}
+        for name in self.order():
+            best = max(self.deps[name], key=lambda dep: total[dep], default=None)
+            previous[name] = best
+            total[name] = self.durations.get(name, 0.0) + (total[best] if best else 0.0)
+
+        if not total:
+            return [], 0.0
+        name = max(total, key=total.get)
+        path = []
+        while name:
+            path.append(name)
+            name = previous[name]
+        return path[::-1], total[path[0]]
+
+    def report(self):
+        lines = ["📊 Resumen de la carga:"]
+        for name in sorted(self.tasks, key=lambda n: self.started.get(n, float("inf"))):
+            status = self.status.get(name, "pending")
+            if name in self.durations:
+                lines.append(f"   {name:<32} {status:<8} inicio {self.started[name]:8.1f} s  duración {self.durations[name]:8.1f} s")
+            else:
+                lines.append(f"   {name:<32} {status:<8}")
+        LOG.info("\n".join(lines))
+
+        path, length = self.critical_path()
+        serial = sum(self.durations.values())
+        LOG.info(f"⏱️ Tiempo total {self.wall_time:.1f} s (en serie habrían sido {serial:.1f} s)")
+        LOG.info(f"🔥 Camino crítico ({length:.1f} s): {' → '.join(path)}")
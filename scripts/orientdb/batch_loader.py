@@ -0,0 +1,219 @@
+import gc
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+from dead_letter import TransportError, batch_error, bisect_failed
+from load_log import Progress, debug_sample, estimate_rows
+from rid_index import build_insert_script
+from transforms import place_fragment_positions, prepare_person_frame
+
+
+# ✅ Inserción por lotes común a fixer.py y orientdb_dataload.py
+# Cada cargador crea un BatchLoader con su cliente, métricas, índice de RIDs, ledger,
+# dead-letter y logger; el código de inserción y de Customer/Person vive solo aquí.
+class BatchLoader:
+    """Inserta registros por lotes transaccionales con ledger, índice de RIDs y dead-letter.
+
+    `executor` se puede reemplazar después de crearlo (p. ej. por un RoutedExecutor con
+    `--route-writes`): cada inserción usa el que tenga en ese momento.
+    """
+
+    def __init__(self, executor, metrics, rid_index, ledger, dead_letter, log):
+        self.executor = executor
+        self.metrics = metrics
+        self.rid_index = rid_index
+        self.ledger = ledger
+        self.dead_letter = dead_letter
+        self.log = log
+
+    def insert_batch(self, class_name, records, batch_size=5000, id_field=None, checkpoint=None):
+        """Inserta datos en lotes pequeños para evitar consumo excesivo de memoria.
+
+        Si se indica `id_field`, los @rid creados se guardan en el índice local de RIDs.
+        Con `checkpoint=(archivo, chunk)` cada lote confirmado queda en el ledger y, con
+        `--resume`, los lotes ya confirmados no se vuelven a enviar. Un lote con errores se
+        divide hasta aislar los registros culpables, que van al archivo dead-letter.
+        Devuelve cuántos registros se confirmaron en esta llamada.
+        """
+
+        if not records:
+            return 0
+
+        metrics, ledger = self.metrics, self.ledger
+        source, chunk = checkpoint if checkpoint else (None, 0)
+        # 📌 Con --route-writes el INSERT nombra el cluster del nodo dueño
+        cluster = self.executor.cluster_for(class_name)
+        if checkpoint and ledger.chunk_done(class_name, source, chunk):
+            self.log.debug(f"⏭️ {class_name}: chunk {chunk} de {source} ya confirmado. Saltando...")
+            return 0
+
+        def batch_jobs():
+            for i in range(0, len(records), batch_size):
+                batch_id = f"{chunk}:{i}"
+                if checkpoint and ledger.is_committed(class_name, source, batch_id):
+                    continue
+                batch = records[i:i + batch_size]
+                positions = self.pending_positions(class_name, source, batch_id, len(batch)) if checkpoint else range(len(batch))
+                if not positions:
+                    ledger.mark_committed(class_name, source, batch_id, len(batch))
+                    continue
+                with metrics.stage(class_name, "serialize"):
+                    script = script_for(batch, positions)
+                yield (batch_id, batch, positions), script
+
+        def script_for(batch, positions):
+            return build_insert_script(class_name, [batch[p] for p in positions], capture=id_field is not None,
+                                       cluster=cluster)
+
+        def on_commit(response):
+            if id_field is not None:
+                self.rid_index.record_response(class_name, id_field, response)
+
+        failed = 0
+        rejected = 0
+        confirmed = 0
+
+        # 🔥 Hasta CONCURRENCY lotes en vuelo a la vez
+        for (batch_id, batch, positions), response in self.executor.stream(batch_jobs(), entity=class_name):
+            ok, bad, complete = self.settle_batch(
+                class_name, source, batch_id, batch, positions, response,
+                partial(script_for, batch), on_commit,
+            )
+            confirmed += ok
+            rejected += bad
+            if not complete:
+                failed += 1
+            elif checkpoint:
+                ledger.mark_committed(class_name, source, batch_id, len(batch))
+
+            # 🧹 **Liberamos memoria tras cada lote**
+            del response, batch, positions
+            gc.collect()
+
+        if rejected:
+            self.log.warning(f"⚠️ {rejected} registros rechazados en {class_name}; detalles en {self.dead_letter.path}")
+        if failed:
+            self.log.error(f"❌ {failed} lotes de {class_name} sin respuesta del servidor")
+
+        if checkpoint and failed == 0:
+            ledger.mark_chunk(class_name, source, chunk, len(records))
+        return confirmed
+
+    def pending_positions(self, entity, source, batch_id, size):
+        """Posiciones de un lote que una bisección cortada no llegó a confirmar ni rechazar."""
+        done = {p for start, n in self.ledger.parts(entity, source, batch_id) for p in range(start, start + n)}
+        return [p for p in range(size) if p not in done]
+
+    def settle_batch(self, entity, source, batch_id, records, positions, response, script_for, on_commit=None):
+        """Resuelve la respuesta del lote formado por `records[p] for p in positions`.
+
+        Si el servidor lo rechazó se bisecta reenviando `script_for(posiciones)`: los sublotes
+        buenos se confirman y los registros culpables van al dead-letter. Con `source`, cada
+        sublote resuelto queda en el ledger como `<lote>:<inicio>+<tamaño>`, para que un corte
+        a medias no obligue a reenviar lo ya confirmado. Cada /batch es su propia transacción:
+        un lote rechazado ya se deshizo en el servidor, no hace falta ROLLBACK.
+
+        Devuelve `(confirmados, rechazados, completo)`; `completo` es False si la red falló
+        antes de resolver todo el lote.
+        """
+        confirmed = rejected = 0
+
+        def settle(response):
+            error = batch_error(response, entity)
+            if error is None and on_commit is not None:
+                on_commit(response)
+            return error
+
+        def resolve(sub_positions, committed):
+            """Registra las posiciones resueltas en el ledger, por tramos contiguos."""
+            if source is None:
+                return
+            runs = []
+            for p in sub_positions:
+                if runs and p == runs[-1][0] + runs[-1][1]:
+                    runs[-1][1] += 1
+                else:
+                    runs.append([p, 1])
+            for start, size in runs:
+                self.ledger.mark_part(entity, source, batch_id, start, size, size if committed else 0)
+
+        def send(sub_positions):
+            nonlocal confirmed
+            error = settle(self.executor.execute(script_for(sub_positions), transaction=True, entity=entity))
+            if error is None:
+                confirmed += len(sub_positions)
+                self.metrics.count(entity, "records", len(sub_positions))
+                resolve(sub_positions, committed=True)
+            return error
+
+        def reject(position, error):
+            nonlocal rejected
+            self.dead_letter.write(entity, source, records[position], error)
+            rejected += 1
+            self.metrics.count(entity, "rejected")
+            resolve([position], committed=False)
+
+        try:
+            error = settle(response)
+            if error is None:
+                confirmed += len(positions)
+                self.metrics.count(entity, "records", len(positions))
+            else:
+                # 🔥 Bisección: los registros buenos se confirman y los malos van al dead-letter
+                bisect_failed(list(positions), error, send, reject)
+        except TransportError:
+            return confirmed, rejected, False
+        return confirmed, rejected, True
+
+    def load_customer_person(self, data_dir, file_name="Customer/person_0_0.csv", chunksize=100000):
+        """Carga Customer, Person y sus fragmentos por PLACE leyendo y transformando el CSV una sola vez."""
+        file_path = os.path.join(data_dir, file_name)
+
+        if not os.path.exists(file_path):
+            self.log.warning(f"⚠️ Archivo {file_path} no encontrado. Saltando Customer/Person...")
+            return
+
+        self.log.info(f"📂 Cargando {file_name} en Customer, Person y sus fragmentos...")
+        progress = Progress(self.log, "Customer+Person", total=estimate_rows(file_path))
+
+        chunks = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip", chunksize=chunksize)
+
+        targets = [f"{entity}{suffix}" for entity in ("Customer", "Person") for suffix in ("", "_North", "_Center", "_South")]
+
+        # 🔥 Las ocho clases de cada chunk se insertan a la vez: con `--route-writes` cada una
+        # va a su nodo (fragmentos a node1-3, globales a node4) y los cuatro ingieren en paralelo
+        with ThreadPoolExecutor(max_workers=len(targets)) as writers:
+            for i, df in enumerate(self.metrics.timed("Customer+Person", "read", chunks)):
+                if all(self.ledger.chunk_done(target, file_name, i) for target in targets):
+                    continue  # ⏭️ Chunk ya confirmado en todas las clases
+
+                with self.metrics.stage("Customer+Person", "transform"):
+                    df = prepare_person_frame(df)
+                    fragments = place_fragment_positions(df["PLACE"])
+                debug_sample(self.log, "Customer+Person", df, i)
+
+                jobs = []
+                for entity_name, id_field in (("Customer", "CUSTOMER_ID"), ("Person", "PERSON_ID")):
+                    with self.metrics.stage(entity_name, "transform"):
+                        records = df.rename(columns={"ID": id_field}).to_dict(orient="records")
+
+                    self.log.debug(f"📌 Insertando {len(records)} registros en {entity_name} (lote {i+1})...")
+                    jobs.append(writers.submit(self.insert_batch, entity_name, records, id_field=id_field, checkpoint=(file_name, i)))
+
+                    # 🔥 Los fragmentos reutilizan los mismos diccionarios, sin volver a convertir
+                    for suffix, positions in fragments.items():
+                        jobs.append(writers.submit(self.insert_batch, f"{entity_name}_{suffix}", [records[p] for p in positions],
+                                                   id_field=id_field, checkpoint=(file_name, i)))
+
+                for job in jobs:
+                    job.result()
+
+                progress.update(len(df))
+                del df, fragments, jobs
+                gc.collect()
+
+        progress.finish()
+        self.log.info(f"✅ Carga de Customer, Person y fragmentos completada.")
@@ -1,18 +1,158 @@
+import argparse
+import io
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 
 # Ruta al archivo CSV
 csv_path = "/home/khabench/Desktop/test/Dataset/Feedback/Feedback.csv"
 
-# Cargar CSV
-df = pd.read_csv(csv_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
+# ✅ Filas por chunk y procesos por defecto (1 = una sola pasada secuencial)
+CHUNK_SIZE = 100000
+WORKERS = 1
+
+DEFAULT_REVIEW = "No review provided"
+READ_OPTIONS = dict(sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
+
+
+class RangeReader(io.RawIOBase):
+    """Lectura binaria limitada al rango de bytes `[start, end)` de un archivo."""
+
+    def __init__(self, path, start, end):
+        self.f = open(path, "rb")
+        self.f.seek(start)
+        self.remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.remaining)
+        if size <= 0:
+            return 0
+        data = self.f.read(size)
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+    def close(self):
+        self.f.close()
+        super().close()
+
+
+def clean_chunk(df):
+    """Aplica la limpieza a un chunk; devuelve `(chunk, filas descartadas, reviews rellenados)`."""
+    # Filtrar filas donde CUSTOMER_ID o PRODUCT_ID estén vacíos
+    kept = df.dropna(subset=["CUSTOMER_ID", "PRODUCT_ID"])
+    dropped = len(df) - len(kept)
+
+    # Reemplazar REVIEW vacíos con un mensaje por defecto
+    missing = kept["REVIEW"].isna()
+    kept = kept.assign(REVIEW=kept["REVIEW"].fillna(DEFAULT_REVIEW).str.strip())
+    return kept, dropped, int(missing.sum())
+
+
+def clean_stream(source, out, columns=None, chunksize=CHUNK_SIZE, header=True):
+    """Limpia un CSV chunk a chunk y lo escribe en `out`; devuelve `(filas, descartadas, rellenados)`."""
+    options = dict(READ_OPTIONS, chunksize=chunksize)
+    if columns is not None:
+        options.update(header=None, names=columns)
+
+    rows = dropped = filled = 0
+    try:
+        reader = pd.read_csv(source, **options)
+        for chunk in reader:
+            kept, chunk_dropped, chunk_filled = clean_chunk(chunk)
+            kept.to_csv(out, sep="|", index=False, quotechar='"', header=header)
+            header = False
+            rows += len(kept)
+            dropped += chunk_dropped
+            filled += chunk_filled
+    except pd.errors.EmptyDataError:
+        pass
+    return rows, dropped, filled
+
+
+def clean_range(path, start, end, columns, part_path, chunksize=CHUNK_SIZE):
+    """Limpia las filas de un rango de bytes (sin cabecera) y las escribe en `part_path`."""
+    source = io.TextIOWrapper(io.BufferedReader(RangeReader(path, start, end)), encoding="utf-8", newline="")
+    with source, open(part_path, "w", encoding="utf-8", newline="") as out:
+        return clean_stream(source, out, columns, chunksize, header=False)
+
+
+def byte_ranges(path, workers):
+    """Divide el cuerpo del CSV (tras la cabecera) en rangos alineados a saltos de línea.
+
+    Supone que ningún campo entre comillas contiene saltos de línea; si los hay, usa un solo proceso.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()
+        bounds = [f.tell()]
+        for n in range(1, workers):
+            f.seek(max(bounds[0] + (size - bounds[0]) * n // workers, bounds[-1]))
+            f.readline()
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def _replace(tmp_path, path):
+    with open(tmp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)  # 🔥 Atómico: el original sigue intacto hasta este punto
+
+
+def clean_feedback(path=csv_path, workers=WORKERS, chunksize=CHUNK_SIZE):
+    """Limpia Feedback.csv en memoria constante y lo reemplaza de forma atómica."""
+    tmp_path = f"{path}.tmp"
+
+    try:
+        if workers <= 1:
+            with open(path, "r", encoding="utf-8", newline="") as source, \
+                    open(tmp_path, "w", encoding="utf-8", newline="") as out:
+                rows, dropped, filled = clean_stream(source, out, chunksize=chunksize)
+        else:
+            columns = list(pd.read_csv(path, nrows=0, **READ_OPTIONS).columns)
+            ranges = byte_ranges(path, workers)
+            parts = [f"{tmp_path}.part{n}" for n in range(len(ranges))]
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(clean_range, path, start, end, columns, part, chunksize)
+                    for (start, end), part in zip(ranges, parts)
+                ]
+                results = [future.result() for future in futures]
+
+            with open(tmp_path, "w", encoding="utf-8", newline="") as out:
+                pd.DataFrame(columns=columns).to_csv(out, sep="|", index=False, quotechar='"')
+                for part in parts:
+                    with open(part, "r", encoding="utf-8", newline="") as body:
+                        shutil.copyfileobj(body, out)
+                    os.remove(part)
+            rows, dropped, filled = (sum(values) for values in zip(*results)) if results else (0, 0, 0)
+
+        _replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return rows, dropped, filled
 
-# Filtrar filas donde CUSTOMER_ID o PRODUCT_ID estén vacíos
-df = df.dropna(subset=["CUSTOMER_ID", "PRODUCT_ID"])
 
-# Reemplazar REVIEW vacíos con un mensaje por defecto
-df["REVIEW"] = df["REVIEW"].fillna("No review provided").str.strip()
+def parse_args():
+    parser = argparse.ArgumentParser(description="Limpia Feedback.csv (CUSTOMER_ID/PRODUCT_ID vacíos y REVIEW)")
+    parser.add_argument("path", nargs="?", default=csv_path, help="CSV de Feedback")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="procesos en paralelo sobre rangos de bytes")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help="filas por chunk")
+    return parser.parse_args()
 
-# Guardar el CSV corregido
-df.to_csv(csv_path, sep="|", index=False, quotechar='"')
 
-print("✅ Archivo CSV de Feedback corregido y guardado.")
\ No newline at end of file
+if __name__ == "__main__":
+    args = parse_args()
+    rows, dropped, filled = clean_feedback(args.path, args.workers, args.chunksize)
+    print(f"✅ Archivo CSV de Feedback corregido y guardado: {rows} filas, "
+          f"{dropped} descartadas, {filled} REVIEW rellenados.")
@@ -0,0 +1,142 @@
+import json
+import os
+import re
+
+from orientdb_client import OrientDBExecutor
+
+
+ORIENTDB_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ✅ Dueño de cada cluster (el mismo archivo que monta docker-compose en cada nodo)
+DISTRIBUTED_CONFIG = os.path.join(ORIENTDB_DIR, "config", "default-distributed-db-config.json")
+
+# ✅ Clusters de cada clase: las líneas `ALTER CLASS <clase> ADDCLUSTER <cluster>` del esquema
+SCHEMA_FILE = os.path.join(ORIENTDB_DIR, "orientdb_create_schema.sql")
+
+# ✅ Endpoint HTTP de cada nodo (puertos publicados en docker-compose-orientdb.yml).
+# KHAB_ORIENTDB_NODES los reemplaza: "orientdb-node1=http://host:2480,orientdb-node2=http://host:2481,..."
+NODE_HOSTS = {
+    "orientdb-node1": "http://localhost:2480",
+    "orientdb-node2": "http://localhost:2481",
+    "orientdb-node3": "http://localhost:2482",
+    "orientdb-node4": "http://localhost:2483",
+}
+
+ADD_CLUSTER = re.compile(r"^\s*ALTER\s+CLASS\s+(\w+)\s+ADDCLUSTER\s+(\w+)", re.IGNORECASE | re.MULTILINE)
+
+
+def node_hosts(value=None):
+    """Nodo → endpoint, desde KHAB_ORIENTDB_NODES o los puertos de docker-compose."""
+    value = os.environ.get("KHAB_ORIENTDB_NODES", "") if value is None else value
+    if not value:
+        return dict(NODE_HOSTS)
+    hosts = {}
+    for item in value.split(","):
+        name, _, host = item.strip().partition("=")
+        if not host:
+            raise ValueError(f"Nodo sin endpoint en KHAB_ORIENTDB_NODES: {item!r}")
+        hosts[name.strip()] = host.strip().rstrip("/")
+    return hosts
+
+
+def load_cluster_owners(path=DISTRIBUTED_CONFIG):
+    """Cluster → nodos que lo alojan; se omiten los clusters replicados en todos (`"*"`)."""
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    owners = {}
+    for cluster, options in config.get("clusters", {}).items():
+        servers = options.get("servers", [])
+        if cluster == "*" or "*" in servers or not servers:
+            continue
+        owners[cluster.lower()] = servers
+    return owners
+
+
+def load_class_clusters(path=SCHEMA_FILE):
+    """Clase (en minúsculas) → clusters añadidos en el esquema."""
+    with open(path, "r", encoding="utf-8") as f:
+        schema = f.read()
+    clusters = {}
+    for class_name, cluster in ADD_CLUSTER.findall(schema):
+        clusters.setdefault(class_name.lower(), []).append(cluster.lower())
+    return clusters
+
+
+class NodeRouter:
+    """Elige el nodo dueño del cluster de cada clase; lo que no tiene dueño va a `default_host`.
+
+    Con la configuración del repo: North/Long/Cheap → node1, Center/Medium/Pre_Pandemic → node2,
+    South/Expensive/Post_Pandemic → node3 y las clases globales y aristas → node4.
+
+    La entrada `"*"` de la configuración replica el cluster por defecto de cada clase en todos
+    los nodos, así que enviar al nodo correcto no basta: un INSERT sin CLUSTER cae en ese
+    cluster replicado. `cluster_for()` da el cluster con dueño para nombrarlo en la sentencia.
+    """
+
+    def __init__(self, default_host, hosts=None, class_clusters=None, cluster_owners=None):
+        self.default_host = default_host
+        self.hosts = node_hosts() if hosts is None else hosts
+        self.class_clusters = load_class_clusters() if class_clusters is None else class_clusters
+        self.cluster_owners = load_cluster_owners() if cluster_owners is None else cluster_owners
+
+        # 📌 Clase → nodo y cluster, resueltos una vez; un nodo sin endpoint conocido se ignora
+        self.class_nodes = {}
+        self.owned_clusters = {}
+        for class_name, clusters in self.class_clusters.items():
+            for cluster in clusters:
+                node = next((n for n in self.cluster_owners.get(cluster, []) if n in self.hosts), None)
+                if node:
+                    self.class_nodes[class_name] = node
+                    self.owned_clusters[class_name] = cluster
+                    break
+
+    def node_for(self, class_name):
+        return self.class_nodes.get(class_name.lower())
+
+    def cluster_for(self, class_name):
+        return self.owned_clusters.get(class_name.lower())
+
+    def host_for(self, class_name):
+        node = self.node_for(class_name)
+        return self.hosts[node] if node else self.default_host
+
+    def routes(self):
+        """Clase → endpoint, para mostrar el reparto antes de cargar."""
+        return {class_name: self.hosts[node] for class_name, node in sorted(self.class_nodes.items())}
+
+
+class RoutedExecutor:
+    """Misma interfaz que OrientDBExecutor, con un cliente por nodo elegido por la entidad.
+
+    `execute()`, `submit()` y `stream()` envían a `router.host_for(entity)`: cada lote va
+    directo al nodo dueño de su cluster, sin el salto de reenvío del nodo coordinador, y cada
+    nodo tiene su propio pool, así que los cuatro ingieren a la vez. Las consultas sin clase
+    (`entity="other"`, p. ej. los SELECT de RIDs) van a `router.default_host`. Los cargadores
+    piden `cluster_for(entity)` para escribir `INSERT INTO <clase> CLUSTER <cluster>` y que el
+    registro quede en el cluster de ese nodo y no en el cluster por defecto replicado.
+    """
+
+    def __init__(self, router, db_name, username, password, **options):
+        self.router = router
+        self.metrics = options.get("metrics")
+        hosts = {router.default_host, *router.routes().values()}
+        self.executors = {host: OrientDBExecutor(host, db_name, username, password, **options) for host in sorted(hosts)}
+
+    def for_entity(self, entity):
+        return self.executors[self.router.host_for(entity)]
+
+    def cluster_for(self, entity):
+        return self.router.cluster_for(entity)
+
+    def execute(self, sql, transaction=False, entity="other"):
+        return self.for_entity(entity).execute(sql, transaction=transaction, entity=entity)
+
+    def submit(self, sql, transaction=False, entity="other"):
+        return self.for_entity(entity).submit(sql, transaction, entity)
+
+    def stream(self, jobs, transaction=True, entity="other"):
+        return self.for_entity(entity).stream(jobs, transaction=transaction, entity=entity)
+
+    def close(self):
+        for executor in self.executors.values():
+            executor.close()
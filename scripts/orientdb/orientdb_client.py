@@ -0,0 +1,171 @@
+import gzip
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from load_log import get_logger
+from load_metrics import TimedBody
+
+
+# ✅ Códigos HTTP que merecen reintento: sobrecarga o fallo del nodo/proxy, nunca un error del comando
+# (un 500/409 con `errors` es determinista: repetirlo solo añade espera)
+RETRY_STATUS = {429, 502, 503, 504}
+
+LOG = get_logger("orientdb_client")
+
+
+class OrientDBExecutor:
+    """Cliente HTTP compartido para `/batch/{db}` con sesión keep-alive, pool y reintentos.
+
+    `concurrency` fija cuántos lotes pueden estar en vuelo a la vez con `stream()`.
+    Con `metrics` (LoadMetrics) cada petición registra serialize/send/server_ack, bytes,
+    latencia y errores bajo la entidad indicada en `execute()`/`stream()`.
+    """
+
+    def __init__(self, host, db_name, username, password, concurrency=4, timeout=300,
+                 gzip_body=False, retries=3, backoff=0.5, metrics=None):
+        self.url = f"{host}/batch/{db_name}"
+        self.metrics = metrics
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.gzip_body = gzip_body
+        self.retries = retries
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        self.session.auth = (username, password)
+        self.session.headers.update({"Accept": "application/json", "Content-Type": "application/json"})
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency)
+
+    def _body(self, sql, transaction):
+        data = {
+            "transaction": transaction,
+            "operations": [{"type": "cmd", "language": "sql", "command": sql}]
+        }
+        body = json.dumps(data).encode("utf-8")
+        if self.gzip_body:
+            return gzip.compress(body, compresslevel=1), {"Content-Encoding": "gzip"}
+        return body, {}
+
+    def _post(self, body, headers, entity):
+        if self.metrics is None:
+            return self.session.post(self.url, data=body, headers=headers, timeout=self.timeout)
+
+        timed_body = TimedBody(body)
+        start = time.perf_counter()
+        try:
+            response = self.session.post(self.url, data=timed_body, headers=headers, timeout=self.timeout)
+        except Exception:
+            self.metrics.count(entity, "errors")
+            raise
+        end = time.perf_counter()
+        sent_at = timed_body.sent_at or end
+        self.metrics.add_time(entity, "send", sent_at - start)
+        self.metrics.add_time(entity, "server_ack", end - sent_at)
+        self.metrics.observe_batch(entity, end - start)
+        self.metrics.count(entity, "bytes", len(body))
+        self.metrics.count(entity, "batches")
+        if response.status_code != 200:
+            self.metrics.count(entity, "errors")
+        return response
+
+    @staticmethod
+    def _command_errors(response):
+        """El cuerpo `{"errors": [...]}` de un comando rechazado, o None si no lo es."""
+        if response.status_code in RETRY_STATUS:
+            return None
+        try:
+            data = response.json()
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) and "errors" in data else None
+
+    def execute(self, sql, transaction=False, entity="other"):
+        """Ejecuta una operación y devuelve el JSON de respuesta, o None si falla tras los reintentos.
+
+        Si el servidor rechaza el comando (500/409 con `errors`), devuelve ese cuerpo sin
+        reintentar: el error depende de los datos y el llamador decide qué hacer con el lote.
+
+        Un timeout de lectura en un lote transaccional no se reintenta: el primer intento pudo
+        haberse confirmado y repetirlo duplicaría los registros. Se devuelve None y el lote
+        queda sin confirmar en el ledger.
+        """
+        start = time.perf_counter()
+        body, headers = self._body(sql, transaction)
+        if self.metrics is not None:
+            self.metrics.add_time(entity, "serialize", time.perf_counter() - start)
+
+        for attempt in range(self.retries + 1):
+            try:
+                response = self._post(body, headers, entity)
+                if response.status_code == 200:
+                    return response.json()
+                # 📌 OrientDB rechaza el comando con 500/409 y un cuerpo `{"errors": [...]}`:
+                # se devuelve tal cual para que el cargador bisecte el lote, sin reintentos
+                rejection = self._command_errors(response)
+                if rejection is not None:
+                    LOG.debug(f"⏭️ Comando rechazado ({response.status_code}) en {entity}")
+                    return rejection
+                if response.status_code not in RETRY_STATUS or attempt == self.retries:
+                    LOG.error(f"❌ Error en query ({response.status_code}): {response.text[:500]}")
+                    return None
+            except requests.ReadTimeout as e:
+                if transaction or attempt == self.retries:
+                    LOG.error(f"❌ Timeout esperando la respuesta de la query: {e}")
+                    return None
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.retries:
+                    LOG.error(f"❌ Excepción en query: {e}")
+                    return None
+            except Exception as e:
+                LOG.error(f"❌ Excepción en query: {e}")
+                return None
+
+            time.sleep(self.backoff * (2 ** attempt))
+
+        return None
+
+    def submit(self, sql, transaction=False, entity="other"):
+        return self._pool.submit(self.execute, sql, transaction, entity)
+
+    def cluster_for(self, entity):
+        """Cluster explícito para las escrituras de `entity`; sin enrutado, OrientDB elige el de la clase."""
+        return None
+
+    def stream(self, jobs, transaction=True, entity="other"):
+        """Envía `(contexto, sql)` manteniendo hasta `concurrency` lotes en vuelo.
+
+        Devuelve `(contexto, respuesta)` conforme terminan, en el hilo del llamador.
+        Varias cargas del planificador pueden usar `stream()` a la vez: comparten el pool,
+        así que el total de lotes en vuelo sigue acotado por `concurrency`.
+        """
+        in_flight = {}
+        jobs = iter(jobs)
+        exhausted = False
+
+        while True:
+            while not exhausted and len(in_flight) < self.concurrency:
+                try:
+                    context, sql = next(jobs)
+                except StopIteration:
+                    exhausted = True
+                    break
+                in_flight[self.submit(sql, transaction, entity)] = context
+
+            if not in_flight:
+                return
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield in_flight.pop(future), future.result()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        self.session.close()
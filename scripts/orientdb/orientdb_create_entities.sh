@@ -6,12 +6,28 @@ DB_NAME="KhaBench"
 USERNAME="root"
 PASSWORD="rootpwd"
 SQL_FILE="orientdb_create_schema.sql"
+INDEX_SQL_FILE="orientdb_create_indexes.sql"
 
-# Verifica si el archivo SQL existe antes de copiarlo
-if [ ! -f "$SQL_FILE" ]; then
-    echo "❌ Error: No se encontró el archivo SQL en $(pwd)"
-    exit 1
-fi
+# Opciones:
+#   --defer-indexes  crea el esquema sin los índices UNIQUE_HASH (carga masiva más rápida)
+#   --indexes-only   crea solo los índices (ejecutar después de la carga masiva)
+CREATE_SCHEMA=true
+CREATE_INDEXES=true
+for arg in "$@"; do
+    case "$arg" in
+        --defer-indexes) CREATE_INDEXES=false ;;
+        --indexes-only) CREATE_SCHEMA=false ;;
+        *) echo "❌ Opción desconocida: $arg"; exit 1 ;;
+    esac
+done
+
+# Verifica si los archivos SQL existen antes de copiarlos
+for file in "$SQL_FILE" "$INDEX_SQL_FILE"; do
+    if [ ! -f "$file" ]; then
+        echo "❌ Error: No se encontró el archivo $file en $(pwd)"
+        exit 1
+    fi
+done
 
 echo "🔍 Verificando si el contenedor $CONTAINER_NAME está en ejecución..."
 if ! docker ps --format "{{.Names}}" | grep -q "$CONTAINER_NAME"; then
@@ -20,44 +36,66 @@ if ! docker ps --format "{{.Names}}" | grep -q "$CONTAINER_NAME"; then
 fi
 echo "✅ Contenedor encontrado. Conectando a OrientDB..."
 
-# Verificar si la base de datos ya existe antes de crearla
-echo "🛠️ Verificando la existencia de la base de datos '$DB_NAME'..."
-DB_EXISTS=$(docker exec -i "$CONTAINER_NAME" /bin/bash -c "/orientdb/bin/console.sh <<EOF
+# 📌 Ejecuta un archivo SQL dentro del contenedor
+run_sql_file() {
+    local file=$1
+
+    echo "📂 Copiando $file al contenedor..."
+    docker cp "$(pwd)/$file" "$CONTAINER_NAME:/orientdb/"
+
+    echo "🔍 Verificando que el archivo existe en el contenedor..."
+    docker exec -i "$CONTAINER_NAME" /bin/bash -c "ls -lah /orientdb/$file"
+
+    docker exec -i "$CONTAINER_NAME" /bin/bash -c "/orientdb/bin/console.sh <<EOF
+CONNECT remote:localhost/$DB_NAME $USERNAME $PASSWORD;
+LOAD SCRIPT /orientdb/$file;
+EXIT;
+EOF"
+}
+
+if [ "$CREATE_SCHEMA" = true ]; then
+    # Verificar si la base de datos ya existe antes de crearla
+    echo "🛠️ Verificando la existencia de la base de datos '$DB_NAME'..."
+    DB_EXISTS=$(docker exec -i "$CONTAINER_NAME" /bin/bash -c "/orientdb/bin/console.sh <<EOF
 CONNECT remote:localhost root $PASSWORD;
 LIST DATABASES;
 EXIT;
 EOF" | grep -w "$DB_NAME")
 
-if [ -z "$DB_EXISTS" ]; then
-    echo "🆕 Creando la base de datos '$DB_NAME'..."
-    docker exec -i "$CONTAINER_NAME" /bin/bash -c "/orientdb/bin/console.sh <<EOF
+    if [ -z "$DB_EXISTS" ]; then
+        echo "🆕 Creando la base de datos '$DB_NAME'..."
+        docker exec -i "$CONTAINER_NAME" /bin/bash -c "/orientdb/bin/console.sh <<EOF
     CONNECT remote:localhost root $PASSWORD;
     CREATE DATABASE remote:localhost/$DB_NAME root $PASSWORD plocal graph;
     EXIT;
 EOF"
-else
-    echo "✅ La base de datos '$DB_NAME' ya existe. Continuando..."
-fi
+    else
+        echo "✅ La base de datos '$DB_NAME' ya existe. Continuando..."
+    fi
 
-# Copiar el archivo SQL dentro del contenedor antes de ejecutar
-echo "📂 Copiando archivo SQL al contenedor..."
-docker cp "$(pwd)/$SQL_FILE" "$CONTAINER_NAME:/orientdb/"
+    # Ejecutar el script principal (creación de clases, relaciones y propiedades)
+    echo "🚀 Ejecutando el script de creación de entidades..."
+    run_sql_file "$SQL_FILE"
 
-# Verificar que el archivo se copió correctamente dentro del contenedor
-echo "🔍 Verificando que el archivo existe en el contenedor..."
-docker exec -i "$CONTAINER_NAME" /bin/bash -c "ls -lah /orientdb/$SQL_FILE"
+    # Validar la ejecución
+    if [ $? -eq 0 ]; then
+        echo "🎉 Creación de entidades completada exitosamente."
+    else
+        echo "❌ Error en la creación de entidades."
+        exit 1
+    fi
+fi
 
-# Ejecutar el script principal (creación de clases, relaciones y propiedades)
-echo "🚀 Ejecutando el script de creación de entidades..."
-docker exec -i "$CONTAINER_NAME" /bin/bash -c "/orientdb/bin/console.sh <<EOF
-CONNECT remote:localhost/$DB_NAME $USERNAME $PASSWORD;
-LOAD SCRIPT /orientdb/$SQL_FILE;
-EXIT;
-EOF"
+if [ "$CREATE_INDEXES" = true ]; then
+    echo "🚀 Creando índices UNIQUE_HASH sobre los IDs..."
+    run_sql_file "$INDEX_SQL_FILE"
 
-# Validar la ejecución
-if [ $? -eq 0 ]; then
-    echo "🎉 Creación de entidades completada exitosamente."
+    if [ $? -eq 0 ]; then
+        echo "🎉 Índices creados exitosamente."
+    else
+        echo "❌ Error en la creación de índices."
+        exit 1
+    fi
 else
-    echo "❌ Error en la creación de entidades."
+    echo "⏭️ Índices diferidos: ejecuta '$0 --indexes-only' después de la carga masiva."
 fi
@@ -0,0 +1,30 @@
+CONNECT remote:localhost/KhaBench root rootpwd;
+
+-- 📌 **Índices UNIQUE_HASH sobre los IDs de negocio**
+-- Evitan escaneos completos en `WHERE <ID> = ...` / `IN [...]` y permiten
+-- resolver FROM/TO de las aristas en el servidor.
+
+-- 📌 Clases Globales
+CREATE INDEX VENDOR.VENDOR_ID ON VENDOR (VENDOR_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX PERSON.PERSON_ID ON PERSON (PERSON_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX CUSTOMER.CUSTOMER_ID ON CUSTOMER (CUSTOMER_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX PRODUCT.PRODUCT_ID ON PRODUCT (PRODUCT_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX POST.POST_ID ON POST (POST_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX ORDER.ORDER_ID ON ORDER (ORDER_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX TAG.TAG_ID ON TAG (TAG_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX INVOICE.ORDER_ID ON INVOICE (ORDER_ID) UNIQUE_HASH_INDEX;
+
+-- 📌 Clases Fragmentadas
+CREATE INDEX PERSON_NORTH.PERSON_ID ON PERSON_NORTH (PERSON_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX PERSON_CENTER.PERSON_ID ON PERSON_CENTER (PERSON_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX PERSON_SOUTH.PERSON_ID ON PERSON_SOUTH (PERSON_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX CUSTOMER_NORTH.CUSTOMER_ID ON CUSTOMER_NORTH (CUSTOMER_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX CUSTOMER_CENTER.CUSTOMER_ID ON CUSTOMER_CENTER (CUSTOMER_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX CUSTOMER_SOUTH.CUSTOMER_ID ON CUSTOMER_SOUTH (CUSTOMER_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX PRODUCT_CHEAP.PRODUCT_ID ON PRODUCT_CHEAP (PRODUCT_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX PRODUCT_EXPENSIVE.PRODUCT_ID ON PRODUCT_EXPENSIVE (PRODUCT_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX POST_SHORT.POST_ID ON POST_SHORT (POST_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX POST_MEDIUM.POST_ID ON POST_MEDIUM (POST_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX POST_LONG.POST_ID ON POST_LONG (POST_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX ORDER_PRE_PANDEMIC.ORDER_ID ON ORDER_PRE_PANDEMIC (ORDER_ID) UNIQUE_HASH_INDEX;
+CREATE INDEX ORDER_POST_PANDEMIC.ORDER_ID ON ORDER_POST_PANDEMIC (ORDER_ID) UNIQUE_HASH_INDEX;
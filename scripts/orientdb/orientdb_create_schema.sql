@@ -377,6 +377,9 @@ CREATE PROPERTY INVOICE.PRODUCT LINKLIST PRODUCT;
 
 
 
+-- 📌 Los índices UNIQUE_HASH sobre los IDs se crean en orientdb_create_indexes.sql
+-- (orientdb_create_entities.sh los aplica, o los difiere con --defer-indexes)
+
 -- 📌 **Relaciones (Edges)**
 CREATE CLASS CUSTOMER_KNOWS_PERSON EXTENDS E;
 CREATE CLASS PERSON_HAS_INTEREST_TAG EXTENDS E;
@@ -0,0 +1,205 @@
+import os
+import sys
+import csv
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from dead_letter import DeadLetterFile, TransportError, batch_error, bisect_failed, default_dead_letter_path
+from load_log import Progress, estimate_rows, get_logger
+from load_metrics import LoadMetrics, default_metrics_path
+from orientdb_client import OrientDBExecutor
+from node_routing import NodeRouter, RoutedExecutor
+from rid_index import build_insert_script
+
+# ✅ Configuración de OrientDB
+ORIENTDB_HOST = os.environ.get("KHAB_ORIENTDB_HOST", "http://localhost:2480")
+DB_NAME = "KhaBench"
+USERNAME = "root"
+PASSWORD = "rootpwd"
+
+# ✅ Cliente HTTP: lotes en vuelo, timeout por petición y reintentos
+CONCURRENCY = 4
+REQUEST_TIMEOUT = 300
+MAX_RETRIES = 3
+
+# ✅ Ruta del dataset
+DATA_DIR = os.environ.get("KHAB_DATA_DIR", "/home/khabench/Desktop/test/Dataset")
+
+# ✅ Mismos valores que orientdb_dataload.sh: 500 registros por transacción y columnas de Customer
+BATCH_SIZE = 500
+COLUMNS = ["CUSTOMER_ID", "FIRST_NAME", "LAST_NAME", "GENDER", "BIRTHDAY",
+           "CREATE_DATE", "LOCATION_IP", "BROWSER_USED", "PLACE"]
+NUMERIC_COLUMNS = ["PLACE"]
+
+# 📌 Customer y sus fragmentos (lo que cargaba `load_customer` en el script bash)
+CUSTOMER_FILES = [
+    ("Customer_North", "Customer/person_0_0_north.csv"),
+    ("Customer_Center", "Customer/person_0_0_center.csv"),
+    ("Customer_South", "Customer/person_0_0_south.csv"),
+    ("Customer", "Customer/person_0_0.csv"),
+]
+
+LOG = get_logger("orientdb_csv_load")
+
+
+def _number(value):
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def iter_records(file_path, columns=COLUMNS, numeric=NUMERIC_COLUMNS, header=True, on_error=None):
+    """Lee el archivo delimitado por `|` fila a fila y genera un dict por registro.
+
+    Con `header` se descarta la primera línea, se llame como se llame su primera columna.
+    Una fila con un valor numérico inválido se pasa a `on_error(línea, fila, error)` y se omite.
+    """
+    with open(file_path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f, delimiter="|", quoting=csv.QUOTE_NONE)
+        if header:
+            next(reader, None)
+        for row in reader:
+            if not row:
+                continue  # Saltar líneas vacías
+            record = dict(zip(columns, row))
+            try:
+                for column in numeric:
+                    if record.get(column, "") != "":
+                        record[column] = _number(record[column])
+            except ValueError as e:
+                if on_error is not None:
+                    on_error(reader.line_num, row, str(e))
+                continue
+            yield record
+
+
+def iter_batches(class_name, records, batch_size=BATCH_SIZE, metrics=None, cluster=None):
+    """Agrupa los registros en lotes y genera `(contexto, script BEGIN/INSERT/COMMIT)`."""
+    batch = []
+    counter = 0
+    if metrics is not None:
+        records = metrics.timed(class_name, "read", records)
+    for record in records:
+        batch.append(record)
+        counter += 1
+        if len(batch) >= batch_size:
+            yield (counter, batch), _script(class_name, batch, metrics, cluster)
+            batch = []
+    if batch:
+        yield (counter, batch), _script(class_name, batch, metrics, cluster)
+
+
+def _script(class_name, batch, metrics, cluster=None):
+    if metrics is None:
+        return build_insert_script(class_name, batch, cluster=cluster)
+    with metrics.stage(class_name, "serialize"):
+        return build_insert_script(class_name, batch, cluster=cluster)
+
+
+def insert_data_batch(executor, class_name, file_path, batch_size=BATCH_SIZE, columns=COLUMNS,
+                      numeric=NUMERIC_COLUMNS, header=True, dead_letter=None):
+    """Carga un archivo en `class_name`, una transacción por lote; devuelve los registros insertados.
+
+    Las filas que no se pueden convertir y los registros que el servidor rechaza (aislados
+    por bisección) van a `dead_letter` si se indica; si no, solo se cuentan.
+    """
+    if not os.path.isfile(file_path):
+        LOG.warning(f"⚠️ Archivo {file_path} no encontrado. Saltando {class_name}...")
+        return 0
+
+    LOG.info(f"📂 Cargando datos de {file_path} en {class_name}...")
+    progress = Progress(LOG, class_name, total=estimate_rows(file_path) if header else None)
+    inserted = 0
+    failed = 0
+    rejected = 0
+
+    def reject(record, error):
+        nonlocal rejected
+        rejected += 1
+        if dead_letter is not None:
+            dead_letter.write(class_name, file_path, record, error)
+
+    def invalid_row(line, row, error):
+        LOG.debug(f"⏭️ {class_name}: línea {line} de {file_path} inválida ({error})")
+        reject({"line": line, "row": row}, error)
+
+    def send(sub_batch):
+        # 📌 Sin ROLLBACK: cada /batch es su propia transacción y el servidor ya deshizo el lote
+        response = executor.execute(_script(class_name, sub_batch, None, cluster), transaction=True, entity=class_name)
+        return batch_error(response, class_name)
+
+    records = iter_records(file_path, columns, numeric, header, on_error=invalid_row)
+    cluster = executor.cluster_for(class_name)  # 📌 con --route-writes, el cluster del nodo dueño
+    jobs = iter_batches(class_name, records, batch_size, executor.metrics, cluster)
+    for (counter, batch), response in executor.stream(jobs, entity=class_name):
+        try:
+            error = batch_error(response, class_name)
+            bad = 0
+            if error is not None:
+                # 🔥 Bisección: los registros buenos se confirman y los malos van al dead-letter
+                _, bad = bisect_failed(batch, error, send, reject)
+            done = len(batch) - bad
+        except TransportError:
+            failed += len(batch)
+            LOG.error(f"❌ Sin respuesta insertando el lote hasta el registro {counter} en [{class_name}]")
+            continue
+        inserted += done
+        if executor.metrics is not None:
+            executor.metrics.count(class_name, "records", done)
+        progress.update(done)
+
+    progress.finish()
+    if rejected:
+        where = f"; detalles en {dead_letter.path}" if dead_letter is not None else ""
+        LOG.warning(f"⚠️ {rejected} registros rechazados en {class_name}{where}")
+    LOG.info(f"🎉 {class_name}: {inserted} registros insertados, {failed} sin respuesta, {rejected} rechazados.")
+    return inserted
+
+
+def load_customer(executor, batch_size=BATCH_SIZE, dead_letter=None):
+    LOG.info("🚀 Iniciando carga de Customer y sus fragmentos...")
+    for class_name, file_name in CUSTOMER_FILES:
+        insert_data_batch(executor, class_name, os.path.join(DATA_DIR, file_name), batch_size, dead_letter=dead_letter)
+    LOG.info("🎉 Carga de Customer y sus fragmentos completada.")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Carga un archivo delimitado por | en una clase de OrientDB")
+    parser.add_argument("class_name", nargs="?", help="clase destino (sin argumentos: Customer y sus fragmentos)")
+    parser.add_argument("file_path", nargs="?", help="archivo delimitado por |")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="registros por transacción")
+    parser.add_argument("--columns", help="nombres de columna separados por comas (por defecto, los de Customer)")
+    parser.add_argument("--numeric", help="columnas numéricas separadas por comas (por defecto, PLACE)")
+    parser.add_argument("--no-header", action="store_true",
+                        help="el archivo no tiene encabezado: la primera línea también es un registro")
+    parser.add_argument("--route-writes", action="store_true",
+                        help="envía cada lote al nodo dueño del cluster de su clase (default-distributed-db-config.json)")
+    args = parser.parse_args()
+    if (args.class_name is None) != (args.file_path is None):
+        parser.error("hay que indicar la clase y el archivo, o ninguno de los dos")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    metrics = LoadMetrics("orientdb_csv_load")
+    dead_letter = DeadLetterFile(default_dead_letter_path(DATA_DIR, "orientdb_csv_load"))
+    if args.route_writes:
+        executor = RoutedExecutor(NodeRouter(ORIENTDB_HOST), DB_NAME, USERNAME, PASSWORD, concurrency=CONCURRENCY,
+                                  timeout=REQUEST_TIMEOUT, retries=MAX_RETRIES, metrics=metrics)
+    else:
+        executor = OrientDBExecutor(ORIENTDB_HOST, DB_NAME, USERNAME, PASSWORD, concurrency=CONCURRENCY,
+                                    timeout=REQUEST_TIMEOUT, retries=MAX_RETRIES, metrics=metrics)
+    try:
+        if args.class_name:
+            columns = args.columns.split(",") if args.columns else COLUMNS
+            numeric = [c for c in args.numeric.split(",") if c] if args.numeric is not None else NUMERIC_COLUMNS
+            insert_data_batch(executor, args.class_name, args.file_path, args.batch_size, columns, numeric,
+                              header=not args.no_header, dead_letter=dead_letter)
+        else:
+            load_customer(executor, args.batch_size, dead_letter)
+    finally:
+        executor.close()
+    LOG.info(f"📊 Métricas en {', '.join(metrics.export(default_metrics_path(DATA_DIR, 'orientdb_csv_load')))}")
@@ -1,176 +1,123 @@
 import os
+import sys
+import argparse
 import pandas as pd
-import requests
-import json
 import unicodedata
-import gc
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from dead_letter import DeadLetterFile, default_dead_letter_path
+from load_ledger import LoadLedger, default_ledger_path
+from load_log import Progress, debug_sample, estimate_rows, get_logger
+from load_metrics import LoadMetrics, default_metrics_path
+from load_scheduler import LoadScheduler
+from orientdb_client import OrientDBExecutor
+from node_routing import NodeRouter, RoutedExecutor
+from transforms import map_rids
+from batch_loader import BatchLoader
+from rid_index import RidIndex, default_index_path
 
 # ✅ Configuración de OrientDB
-ORIENTDB_HOST = "http://localhost:2480"
+ORIENTDB_HOST = os.environ.get("KHAB_ORIENTDB_HOST", "http://localhost:2480")
 DB_NAME = "KhaBench"
 USERNAME = "root"
 PASSWORD = "rootpwd"
 HEADERS = {"Accept": "application/json"}
 
-# ✅ Ruta de datos
-DATA_DIR = "/home/khabench/Desktop/test/Dataset/"
-
-def insert_batch(class_name, records, batch_size=5000):
-    """Inserta datos en lotes pequeños para evitar consumo excesivo de memoria."""
-
-    if not records:
-        return
-
-    for i in range(0, len(records), batch_size):
-        batch = records[i:i + batch_size]
-
-        sql_statements = ["BEGIN"]  
-        sql_statements += [f"INSERT INTO {class_name} CONTENT {json.dumps(record)}" for record in batch]
-        sql_statements.append("COMMIT")  
-
-        batch_query = ";\n".join(sql_statements)
-        response = execute_query(batch_query, transaction=True)
-
-        if response and "errors" in response:
-            execute_query("ROLLBACK;", transaction=True)
-
-        # 🧹 **Liberamos memoria tras cada lote**
-        del batch, sql_statements, batch_query
-        gc.collect()
-
-def execute_query(sql, transaction=False):
-    url = f"{ORIENTDB_HOST}/batch/{DB_NAME}"
-    data = {
-        "transaction": transaction,
-        "operations": [{"type": "cmd", "language": "sql", "command": sql}]
-    }
-    try:
-        response = requests.post(url, auth=(USERNAME, PASSWORD), json=data, headers=HEADERS)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"❌ Error en query ({response.status_code}): {response.text}")
-            return None
-    except Exception as e:
-        print(f"❌ Excepción en query: {e}")
-        return None
-
-
-# 📌 **Carga de Datos para `Customer` y sus Fragmentos con Transacción**
-def load_customer_data(entity_name, file_name):
-    file_path = os.path.join(DATA_DIR, file_name)
-
-    if not os.path.exists(file_path):
-        print(f"⚠️ Archivo {file_path} no encontrado. Saltando {entity_name}...")
-        return
+# ✅ Cliente HTTP: lotes en vuelo, timeout por petición, gzip y reintentos
+CONCURRENCY = 4
+REQUEST_TIMEOUT = 300
+GZIP_REQUESTS = False
+MAX_RETRIES = 3
 
-    print(f"📂 Cargando {file_name} en {entity_name}...")
+# ✅ Cargas independientes que se ejecutan a la vez (ver LoadScheduler)
+LOAD_PARALLELISM = 3
 
-    df = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
+# ✅ Ruta de datos
+DATA_DIR = os.environ.get("KHAB_DATA_DIR", "/home/khabench/Desktop/test/Dataset/")
 
-    # ✅ Renombrar columnas para coincidir con el esquema
-    df.rename(columns={
-        "ID": "CUSTOMER_ID",
-        "FIRSTNAME": "FIRST_NAME",
-        "LASTNAME": "LAST_NAME",
-        "GENDER": "GENDER",
-        "BIRTHDAY": "BIRTHDAY",
-        "CREATION_DATE": "CREATE_DATE",
-        "LOCATION_IP": "LOCATION_IP",
-        "BROWSER_USED": "BROWSER_USED",
-        "PLACE": "PLACE"
-    }, inplace=True)
+# ✅ Registro con niveles (KHAB_LOG_LEVEL) y progreso limitado a una línea cada pocos segundos
+LOG = get_logger("orientdb_dataload")
 
-    # ✅ Convertir fechas al formato correcto
-    df["BIRTHDAY"] = pd.to_datetime(df["BIRTHDAY"], errors="coerce").dt.strftime("%Y-%m-%d %H:%M:%S")
-    df["CREATE_DATE"] = pd.to_datetime(df["CREATE_DATE"], errors="coerce").dt.strftime("%Y-%m-%d %H:%M:%S")
-    df["PLACE"] = df["PLACE"].astype(int)
+def execute_query(sql, transaction=False, entity="other"):
+    return EXECUTOR.execute(sql, transaction=transaction, entity=entity)
 
-    
+# ✅ Tiempos por etapa y contadores; se exportan al terminar (JSON Lines + Prometheus)
+METRICS = LoadMetrics("orientdb_dataload")
 
-    print(f"📌 Insertando {len(df)} registros en {entity_name} dentro de una transacción...")
-    insert_batch(entity_name, df.to_dict(orient="records"))
-    print(f"✅ Carga de {entity_name} completada.")
+EXECUTOR = OrientDBExecutor(
+    ORIENTDB_HOST, DB_NAME, USERNAME, PASSWORD,
+    concurrency=CONCURRENCY, timeout=REQUEST_TIMEOUT, gzip_body=GZIP_REQUESTS, retries=MAX_RETRIES,
+    metrics=METRICS
+)
 
-def load_person_data(entity_name, file_name):
-    file_path = os.path.join(DATA_DIR, file_name)
+# ✅ Índice local `ID → @rid` compartido con fixer.py
+# 📌 Índice, ledger y dead-letter no abren su archivo hasta el primer uso: importar no toca DATA_DIR
+RID_INDEX = RidIndex(default_index_path(DATA_DIR), execute_query)
 
-    if not os.path.exists(file_path):
-        print(f"⚠️ Archivo {file_path} no encontrado. Saltando {entity_name}...")
-        return
+# ✅ Ledger de lotes confirmados para `--resume`
+LEDGER = LoadLedger(default_ledger_path(DATA_DIR, "orientdb_dataload"))
 
-    print(f"📂 Cargando {file_name} en {entity_name}...")
+# ✅ Registros rechazados por el servidor (aislados por bisección)
+DEAD_LETTER = DeadLetterFile(default_dead_letter_path(DATA_DIR, "orientdb_dataload"))
 
-    df = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
+# ✅ Inserción por lotes y carga de Customer/Person compartidas con fixer.py
+LOADER = BatchLoader(EXECUTOR, METRICS, RID_INDEX, LEDGER, DEAD_LETTER, LOG)
+insert_batch = LOADER.insert_batch
 
-    # ✅ Renombrar columnas para coincidir con el esquema
-    df.rename(columns={
-        "ID": "PERSON_ID",
-        "FIRSTNAME": "FIRST_NAME",
-        "LASTNAME": "LAST_NAME",
-        "GENDER": "GENDER",
-        "BIRTHDAY": "BIRTHDAY",
-        "CREATION_DATE": "CREATE_DATE",
-        "LOCATION_IP": "LOCATION_IP",
-        "BROWSER_USED": "BROWSER_USED",
-        "PLACE": "PLACE"
-    }, inplace=True)
 
-    # ✅ Convertir fechas al formato correcto
-    df["BIRTHDAY"] = pd.to_datetime(df["BIRTHDAY"], errors="coerce").dt.strftime("%Y-%m-%d %H:%M:%S")
-    df["CREATE_DATE"] = pd.to_datetime(df["CREATE_DATE"], errors="coerce").dt.strftime("%Y-%m-%d %H:%M:%S")
-    df["PLACE"] = df["PLACE"].astype(int)
+# 📌 **Customer, Person y sus fragmentos en una sola pasada**
+def load_customer_person_data(file_name="Customer/person_0_0.csv", chunksize=100000):
+    LOADER.load_customer_person(DATA_DIR, file_name, chunksize)
 
-    
 
-    print(f"📌 Insertando {len(df)} registros en {entity_name}...")
-    insert_batch(entity_name, df.to_dict(orient="records"))
-    print(f"✅ Carga de {entity_name} completada.")
 
 def load_vendor_data(entity_name, file_name):
     file_path = os.path.join(DATA_DIR, file_name)
 
     if not os.path.exists(file_path):
-        print(f"⚠️ Archivo {file_path} no encontrado. Saltando {entity_name}...")
+        LOG.warning(f"⚠️ Archivo {file_path} no encontrado. Saltando {entity_name}...")
         return
 
-    print(f"📂 Cargando {file_path} en {entity_name}...")
+    LOG.info(f"📂 Cargando {file_path} en {entity_name}...")
 
     # 📌 Leer CSV con separador de coma
-    df = pd.read_csv(file_path, sep=",", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
+    with METRICS.stage(entity_name, "read"):
+        df = pd.read_csv(file_path, sep=",", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
 
     # 📌 Verificar que contiene las columnas necesarias
     expected_columns = {"VENDOR_ID", "COMPANY", "COUNTRY", "INDUSTRY"}
     missing_columns = expected_columns - set(df.columns)
     if missing_columns:
-        print(f"❌ ERROR: Faltan las columnas {missing_columns} en el CSV de {entity_name}.")
+        LOG.error(f"❌ ERROR: Faltan las columnas {missing_columns} en el CSV de {entity_name}.")
         return
 
     # ✅ Convertir tipos de datos
-    df["VENDOR_ID"] = df["VENDOR_ID"].astype(str).str.strip()
-    df["COMPANY"] = df["COMPANY"].astype(str).str.strip()
-    df["COUNTRY"] = df["COUNTRY"].astype(str).str.strip()
-    df["INDUSTRY"] = df["INDUSTRY"].astype(str).str.strip()
+    with METRICS.stage(entity_name, "transform"):
+        df["VENDOR_ID"] = df["VENDOR_ID"].astype(str).str.strip()
+        df["COMPANY"] = df["COMPANY"].astype(str).str.strip()
+        df["COUNTRY"] = df["COUNTRY"].astype(str).str.strip()
+        df["INDUSTRY"] = df["INDUSTRY"].astype(str).str.strip()
+        records = df.to_dict(orient="records")
 
-    # 📌 Imprimir un ejemplo de los datos antes de insertarlos
-    print(f"🔍 Primeras filas de {entity_name}:\n{df.head()}")
+    debug_sample(LOG, entity_name, df)
 
-    print(f"📌 Insertando {len(df)} registros en {entity_name}...")
-    insert_batch(entity_name, df.to_dict(orient="records"))
-    print(f"✅ Carga de {entity_name} completada.")
+    LOG.info(f"📌 Insertando {len(df)} registros en {entity_name}...")
+    insert_batch(entity_name, records, id_field="VENDOR_ID", checkpoint=(file_name, 0))
+    LOG.info(f"✅ Carga de {entity_name} completada.")
 
 
 def load_product_data(entity_name, file_name):
     file_path = os.path.join(DATA_DIR, file_name)
 
     if not os.path.exists(file_path):
-        print(f"⚠️ Archivo {file_path} no encontrado. Saltando {entity_name}...")
+        LOG.warning(f"⚠️ Archivo {file_path} no encontrado. Saltando {entity_name}...")
         return
 
-    print(f"📂 Cargando {file_path} en {entity_name}...")
+    LOG.info(f"📂 Cargando {file_path} en {entity_name}...")
 
-    df = pd.read_csv(file_path, sep=",", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
+    with METRICS.stage(entity_name, "read"):
+        df = pd.read_csv(file_path, sep=",", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip")
 
     # ✅ Renombrar columnas
     df.rename(columns={
@@ -182,112 +129,126 @@ def load_product_data(entity_name, file_name):
         "VENDOR_ID": "VENDOR_ID"
     }, inplace=True)
 
-    # ✅ Convertir precio a float
-    df["PRICE"] = df["PRICE"].astype(float)
-
-    # 📡 Obtener mapeo de `VENDOR_ID` a `@rid`
-    print("📡 Obteniendo RIDs de Vendor...")
-    vendor_rid_map = {}
-    response = execute_query("SELECT VENDOR_ID, @rid FROM Vendor")
+    # 📡 Obtener mapeo de `VENDOR_ID` a `@rid` desde el índice local
+    vendor_rid_map = RID_INDEX.get_map("Vendor", "VENDOR_ID")
 
-    if response and "result" in response:
-        vendor_rid_map = {str(record["VENDOR_ID"]): record["@rid"] for record in response["result"]}
+    LOG.info(f"🔍 Mapeo de Vendor cargado: {len(vendor_rid_map)} RIDs")
 
-    print(f"🔍 Mapeo de Vendor cargado: {list(vendor_rid_map.items())[:10]}")
+    with METRICS.stage(entity_name, "transform"):
+        # ✅ Convertir precio a float
+        df["PRICE"] = df["PRICE"].astype(float)
 
-    # ✅ Reemplazar `VENDOR_ID` con su `@rid`
-    df["VENDOR_ID"] = df["VENDOR_ID"].map(vendor_rid_map)
+        # ✅ Reemplazar `VENDOR_ID` con su `@rid`
+        df["VENDOR_ID"] = map_rids(df["VENDOR_ID"].str.strip(), vendor_rid_map)
 
-    # 🔥 Filtrar productos con `VENDOR_ID` no encontrado en la base de datos
-    df.dropna(subset=["VENDOR_ID"], inplace=True)
+        # 🔥 Filtrar productos con `VENDOR_ID` no encontrado en la base de datos
+        df.dropna(subset=["VENDOR_ID"], inplace=True)
+        records = df.to_dict(orient="records")
 
-    print(f"📌 Insertando {len(df)} registros en {entity_name} dentro de una transacción...")
-    insert_batch(entity_name, df.to_dict(orient="records"))
-    print(f"✅ Carga de {entity_name} completada.")
+    LOG.info(f"📌 Insertando {len(df)} registros en {entity_name} dentro de una transacción...")
+    insert_batch(entity_name, records, id_field="PRODUCT_ID", checkpoint=(file_name, 0))
+    LOG.info(f"✅ Carga de {entity_name} completada.")
 
 def load_feedback_data():
     file_name = "Feedback/Feedback.csv"
     file_path = os.path.join(DATA_DIR, file_name)
 
     if not os.path.exists(file_path):
-        print(f"⚠️ Archivo {file_path} no encontrado. Saltando Feedback...")
+        LOG.warning(f"⚠️ Archivo {file_path} no encontrado. Saltando Feedback...")
         return
 
-    print(f"📂 Cargando {file_path} en Feedback...")
+    LOG.info(f"📂 Cargando {file_path} en Feedback...")
+    progress = Progress(LOG, "Feedback", total=estimate_rows(file_path))
 
     batch_size = 5000
     chunks = pd.read_csv(file_path, sep="|", dtype=str, quotechar='"', skipinitialspace=True, on_bad_lines="skip", chunksize=batch_size)
 
-    for i, df in enumerate(chunks):
-        print(f"🔄 Procesando lote {i+1} con {len(df)} registros...")
-
-        # Obtener IDs únicos de Customer y Product en el lote
-        customer_ids = df["CUSTOMER_ID"].dropna().astype(str).str.strip().unique().tolist()
-        product_ids = df["PRODUCT_ID"].dropna().astype(str).str.strip().unique().tolist()
-
-        print(f"🔍 IDs de Customer en este lote: {customer_ids[:10]}")
-        print(f"🔍 IDs de Product en este lote: {product_ids[:10]}")
-
-        customer_rids = {}
-        product_rids = {}
-
-        # ⚠️ Evitar consultas vacías
-        if customer_ids:
-            customer_ids_str = ", ".join(f"'{cid}'" for cid in customer_ids)
-            customer_rids_query = f"SELECT CUSTOMER_ID, @rid FROM Customer WHERE CUSTOMER_ID IN [{customer_ids_str}]"
-            customer_rids_response = execute_query(customer_rids_query)
-
-            if customer_rids_response and "result" in customer_rids_response:
-                customer_rids = {record["CUSTOMER_ID"]: record["@rid"] for record in customer_rids_response["result"]}
-
-        if product_ids:
-            product_ids_str = ", ".join(f"'{pid}'" for pid in product_ids)
-            product_rids_query = f"SELECT PRODUCT_ID, @rid FROM Product WHERE PRODUCT_ID IN [{product_ids_str}]"
-            product_rids_response = execute_query(product_rids_query)
-
-            if product_rids_response and "result" in product_rids_response:
-                product_rids = {record["PRODUCT_ID"]: record["@rid"] for record in product_rids_response["result"]}
-
-        print(f"🔍 Claves en customer_rids (ejemplo): {list(customer_rids.keys())[:5]}")
-        print(f"🔍 Claves en product_rids (ejemplo): {list(product_rids.keys())[:5]}")
-
-        batch_records = []
-        for _, row in df.iterrows():
-            product_id = str(row["PRODUCT_ID"]).strip()
-            customer_id = str(row["CUSTOMER_ID"]).strip()
-            rate = row["RATE"]
-            review = row["REVIEW"]
-
-            if product_id in product_rids and customer_id in customer_rids:
-                batch_records.append({
-                    "PRODUCT_ID": product_rids[product_id],
-                    "CUSTOMER_ID": customer_rids[customer_id],
-                    "RATE": float(rate),
-                    "REVIEW": review
-                })
-
-        print(f"📌 Insertando {len(batch_records)} registros en Feedback...")
-        insert_batch("Feedback", batch_records, batch_size=batch_size)
-
-    print(f"✅ Carga de Feedback completada.")
-
-load_customer_data("Customer", "Customer/person_0_0.csv")
-load_customer_data("Customer_North", "Customer/person_0_0_north.csv")
-load_customer_data("Customer_Center", "Customer/person_0_0_center.csv")
-load_customer_data("Customer_South", "Customer/person_0_0_south.csv")
-
-load_person_data("Person", "Customer/person_0_0.csv")
-load_person_data("Person_North", "Customer/person_0_0_north.csv")
-load_person_data("Person_Center", "Customer/person_0_0_center.csv")
-load_person_data("Person_South", "Customer/person_0_0_south.csv")
-
-
-# 📌 Cargar Vendor
-load_vendor_data("Vendor", "Vendor/Vendor.csv")
-
-# 📌 Cargar Product y sus fragmentos
-load_product_data("Product", "Product/Product.csv")
-load_product_data("Product_Cheap", "Product/Product_Cheap.csv")
-load_product_data("Product_Expensive", "Product/Product_Expensive.csv")
-
-load_feedback_data()
\ No newline at end of file
+    dropped = {"missing": 0, "dangling": 0, "invalid": 0}
+
+    # ✅ Mapas compactos de RIDs desde el índice local, sin SELECT contra OrientDB
+    customer_rids = RID_INDEX.get_map("Customer", "CUSTOMER_ID")
+    product_rids = RID_INDEX.get_map("Product", "PRODUCT_ID")
+
+    for i, df in enumerate(METRICS.timed("Feedback", "read", chunks)):
+        if LEDGER.chunk_done("Feedback", file_name, i):
+            continue  # ⏭️ Ya confirmado en una ejecución anterior
+        LOG.debug(f"🔄 Procesando lote {i+1} con {len(df)} registros...")
+
+        with METRICS.stage("Feedback", "transform"):
+            customer_ids = df["CUSTOMER_ID"].str.strip()
+            product_ids = df["PRODUCT_ID"].str.strip()
+
+            # ✅ Mapeo y filtrado por columnas, sin iterar fila a fila
+            feedback = pd.DataFrame({
+                "PRODUCT_ID": map_rids(product_ids, product_rids),
+                "CUSTOMER_ID": map_rids(customer_ids, customer_rids),
+                "RATE": pd.to_numeric(df["RATE"], errors="coerce"),
+                "REVIEW": df["REVIEW"],
+            })
+            missing = customer_ids.isna() | product_ids.isna()
+            keep = feedback["PRODUCT_ID"].notna() & feedback["CUSTOMER_ID"].notna()
+            # 📌 RATE y REVIEW son NOT NULL: un NaN llegaría al INSERT como `NaN`, que no es JSON válido
+            invalid = keep & (feedback["RATE"].isna() | feedback["REVIEW"].isna())
+            dropped["missing"] += int(missing.sum())
+            dropped["dangling"] += int((~missing & ~keep).sum())
+            dropped["invalid"] += int(invalid.sum())
+
+            rows = df[invalid]
+            for record in rows.astype(object).where(rows.notna(), None).to_dict(orient="records"):
+                DEAD_LETTER.write("Feedback", file_name, record, "RATE no numérico o REVIEW vacío")
+            batch_records = feedback[keep & ~invalid].to_dict(orient="records")
+
+        debug_sample(LOG, "Feedback", batch_records, i)
+        progress.update(insert_batch("Feedback", batch_records, batch_size=batch_size, checkpoint=(file_name, i)))
+
+    progress.finish()
+    if any(dropped.values()):
+        LOG.warning(f"⚠️ Feedback descartados: {dropped['missing']} sin ID, {dropped['dangling']} con Customer/Product inexistente, "
+                    f"{dropped['invalid']} con RATE no numérico o REVIEW vacío (en {DEAD_LETTER.path}).")
+    LOG.info(f"✅ Carga de Feedback completada.")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Carga de KhaBench en OrientDB")
+    parser.add_argument("--resume", action="store_true", help="continúa desde el primer lote no confirmado según el ledger")
+    parser.add_argument("--parallel", type=int, default=LOAD_PARALLELISM, help="cargas independientes en paralelo (1 = en serie)")
+    parser.add_argument("--route-writes", action="store_true",
+                        help="envía cada lote al nodo dueño del cluster de su clase (default-distributed-db-config.json)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.route_writes:
+        EXECUTOR.close()
+        EXECUTOR = RoutedExecutor(
+            NodeRouter(ORIENTDB_HOST), DB_NAME, USERNAME, PASSWORD,
+            concurrency=CONCURRENCY, timeout=REQUEST_TIMEOUT, gzip_body=GZIP_REQUESTS, retries=MAX_RETRIES,
+            metrics=METRICS
+        )
+        LOADER.executor = EXECUTOR
+        for class_name, host in EXECUTOR.router.routes().items():
+            LOG.info(f"📡 {class_name} → {host}")
+    if not args.resume:
+        LEDGER.reset()  # 🔥 Carga desde cero: se olvidan los lotes de ejecuciones anteriores
+
+    # 📌 Vértices antes que las aristas que los referencian; lo independiente va en paralelo
+    scheduler = LoadScheduler(parallelism=args.parallel)
+
+    # 📌 Customer, Person y fragmentos North/Center/South en una sola pasada
+    scheduler.add("customer_person", load_customer_person_data, "Customer/person_0_0.csv")
+
+    # 📌 Cargar Vendor
+    scheduler.add("vendor", load_vendor_data, "Vendor", "Vendor/Vendor.csv")
+
+    # 📌 Cargar Product y sus fragmentos (necesitan los @rid de Vendor)
+    scheduler.add("product", load_product_data, "Product", "Product/Product.csv", after=["vendor"])
+    scheduler.add("product_cheap", load_product_data, "Product_Cheap", "Product/Product_Cheap.csv", after=["vendor"])
+    scheduler.add("product_expensive", load_product_data, "Product_Expensive", "Product/Product_Expensive.csv", after=["vendor"])
+
+    scheduler.add("feedback", load_feedback_data, after=["customer_person", "product"])
+
+    scheduler.run()
+
+    # 📊 Métricas por entidad y etapa
+    LOG.info(f"📊 Métricas en {', '.join(METRICS.export(default_metrics_path(DATA_DIR, 'orientdb_dataload')))}")
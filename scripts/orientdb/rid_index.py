@@ -0,0 +1,313 @@
+import os
+import json
+import sqlite3
+import threading
+
+from load_log import get_logger
+from rid_map import RidMap, build_rid_map
+
+
+# ✅ Índice persistente ID de negocio → @rid
+# Se llena en el momento de la inserción y evita volver a descargar clases
+# completas de OrientDB cada vez que se cargan aristas o LINKs.
+SQLITE_MAX_PARAMS = 900
+
+# RID anterior a cualquier registro real: punto de partida del cursor
+FIRST_RID = "#-1:-1"
+
+# Orden de OrientDB para los @rid guardados como texto "#cluster:posición"
+RID_ORDER = (
+    "CAST(substr(rid, 2, instr(rid, ':') - 2) AS INTEGER) {0}, "
+    "CAST(substr(rid, instr(rid, ':') + 1) AS INTEGER) {0}"
+)
+
+LOG = get_logger("rid_index")
+
+
+def build_insert_script(class_name, records, capture=False, cluster=None):
+    """Genera las sentencias INSERT de un lote; con `capture` devuelve los registros creados.
+
+    Con `cluster`, cada registro va a ese cluster de la clase (`INSERT INTO <clase> CLUSTER <cluster>`).
+    """
+    target = f"{class_name} CLUSTER {cluster}" if cluster else class_name
+    if not capture:
+        statements = ["BEGIN"]
+        statements += [f"INSERT INTO {target} CONTENT {json.dumps(record)}" for record in records]
+        statements.append("COMMIT")
+        return ";\n".join(statements)
+
+    statements = ["BEGIN"]
+    statements += [f"LET r{n} = INSERT INTO {target} CONTENT {json.dumps(record)}" for n, record in enumerate(records)]
+    statements.append("COMMIT")
+    statements.append("RETURN [" + ", ".join(f"$r{n}" for n in range(len(records))) + "]")
+    return ";\n".join(statements)
+
+
+def iter_rid_batches(execute_query, class_name, id_field, batch_size=50000):
+    """Exporta `(id, @rid)` de una clase en lotes, paginando por cursor de @rid.
+
+    Cada página continúa desde el último @rid visto (`WHERE @rid > last ORDER BY @rid`),
+    así el servidor no vuelve a recorrer lo ya leído como ocurre con SKIP. La consulta lleva
+    `entity=class_name` para que un RoutedExecutor la envíe al nodo dueño de la clase.
+    """
+    last = FIRST_RID
+
+    while True:
+        sql = (
+            f"SELECT {id_field}, @rid FROM {class_name} "
+            f"WHERE @rid > {last} ORDER BY @rid ASC LIMIT {batch_size}"
+        )
+        response = execute_query(sql, entity=class_name)
+        if not response or "result" not in response:
+            LOG.warning(f"⚠️ No se pudieron obtener más RIDs para {class_name}.")
+            return
+
+        records = response["result"]
+        if not records:
+            return
+
+        yield [(str(record[id_field]).strip(), record["@rid"]) for record in records]
+
+        if len(records) < batch_size:
+            return
+        last = records[-1]["@rid"]
+
+
+def _iter_result_records(value):
+    """Recorre la respuesta de /batch (listas anidadas) y devuelve cada documento con @rid."""
+    if isinstance(value, dict):
+        if "@rid" in value:
+            yield value
+        for key in ("result", "value"):
+            if key in value:
+                yield from _iter_result_records(value[key])
+    elif isinstance(value, list):
+        for item in value:
+            yield from _iter_result_records(item)
+
+
+class RidIndex:
+    """Índice en disco (sqlite) de `ID de negocio → @rid`, por clase."""
+
+    def __init__(self, path, execute_query):
+        self.path = path
+        self.execute_query = execute_query
+        self._conn = None
+        self._lock = threading.RLock()
+        self._class_locks = {}
+        self._fresh = set()
+
+    @property
+    def conn(self):
+        """Conexión sqlite, abierta en el primer uso: importar un cargador no toca el disco."""
+        with self._lock:
+            if self._conn is None:
+                # Compartida entre las tareas del planificador: cada acceso a sqlite va bajo `_lock`
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS rids ("
+                    "class_name TEXT NOT NULL, business_id TEXT NOT NULL, rid TEXT NOT NULL, "
+                    "PRIMARY KEY (class_name, business_id)) WITHOUT ROWID"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS classes (class_name TEXT PRIMARY KEY, id_field TEXT NOT NULL)"
+                )
+                conn.commit()
+                self._conn = conn
+            return self._conn
+
+    @staticmethod
+    def _key(class_name):
+        # OrientDB no distingue mayúsculas en los nombres de clase
+        return class_name.upper()
+
+    def record(self, class_name, id_field, pairs):
+        """Guarda pares (id, rid) de registros recién insertados."""
+        key = self._key(class_name)
+        rows = [(key, str(business_id).strip(), rid) for business_id, rid in pairs]
+        if not rows:
+            return 0
+        with self._lock:
+            with self.conn:
+                if self.id_field(class_name) not in (None, id_field):
+                    # 📌 Los pares guardados son de otra propiedad: no se mezclan en el mismo mapa
+                    self.conn.execute("DELETE FROM rids WHERE class_name = ?", (key,))
+                    self._fresh.discard(key)
+                self.conn.execute("INSERT OR REPLACE INTO classes VALUES (?, ?)", (key, id_field))
+                self.conn.executemany("INSERT OR REPLACE INTO rids VALUES (?, ?, ?)", rows)
+            self._drop_cache(class_name)
+        return len(rows)
+
+    def record_response(self, class_name, id_field, response):
+        """Extrae los @rid devueltos por un lote de inserción y los registra."""
+        if not response or "result" not in response:
+            return 0
+        pairs = [
+            (record[id_field], record["@rid"])
+            for record in _iter_result_records(response["result"])
+            if record.get(id_field) is not None
+        ]
+        return self.record(class_name, id_field, pairs)
+
+    def id_field(self, class_name):
+        """Propiedad por la que está indexada la clase, o None si no hay índice."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT id_field FROM classes WHERE class_name = ?", (self._key(class_name),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def count(self, class_name):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT COUNT(*) FROM rids WHERE class_name = ?", (self._key(class_name),)
+            ).fetchone()
+        return row[0]
+
+    def clear(self, class_name):
+        key = self._key(class_name)
+        with self._lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM rids WHERE class_name = ?", (key,))
+                self.conn.execute("DELETE FROM classes WHERE class_name = ?", (key,))
+            self._fresh.discard(key)
+            self._drop_cache(class_name)
+
+    def _cache_path(self, class_name):
+        return f"{self.path}.{self._key(class_name)}.npy"
+
+    def _drop_cache(self, class_name):
+        cache = self._cache_path(class_name)
+        if os.path.exists(cache):
+            os.remove(cache)
+
+    def server_count(self, class_name):
+        response = self.execute_query(f"SELECT count(*) AS total FROM {class_name}", entity=class_name)
+        if not response or not response.get("result"):
+            return None
+        return int(response["result"][0].get("total", 0))
+
+    def rid_bounds(self, class_name):
+        """Primer y último @rid del índice, en el orden de OrientDB (cluster y posición)."""
+        bounds = []
+        for order in ("ASC", "DESC"):
+            with self._lock:
+                row = self.conn.execute(
+                    f"SELECT rid FROM rids WHERE class_name = ? ORDER BY {RID_ORDER.format(order)} LIMIT 1",
+                    (self._key(class_name),),
+                ).fetchone()
+            bounds.append(row[0] if row else None)
+        return tuple(bounds)
+
+    def server_rid_bounds(self, class_name):
+        """Primer y último @rid de la clase en el servidor, o None si no respondió."""
+        bounds = []
+        for order in ("ASC", "DESC"):
+            response = self.execute_query(f"SELECT @rid FROM {class_name} ORDER BY @rid {order} LIMIT 1", entity=class_name)
+            if not response or "result" not in response:
+                return None
+            result = response["result"]
+            bounds.append(result[0]["@rid"] if result else None)
+        return tuple(bounds)
+
+    def is_stale(self, class_name):
+        """El índice está obsoleto si no coincide con el servidor en número de registros
+        o en el primer y último @rid (una clase recreada con los mismos datos cambia de RIDs)."""
+        local = self.count(class_name)
+        remote = self.server_count(class_name)
+        if remote is None:
+            # Sin respuesta del servidor confiamos en el índice si tiene datos
+            return local == 0
+        if local != remote:
+            return True
+        if local == 0:
+            return False
+        remote_bounds = self.server_rid_bounds(class_name)
+        return remote_bounds is not None and remote_bounds != self.rid_bounds(class_name)
+
+    def rebuild(self, class_name, id_field, limit=50000):
+        """Reconstruye el índice de una clase exportando sus RIDs desde OrientDB."""
+        LOG.info(f"📡 Reconstruyendo índice de RIDs para {class_name}...")
+        self.clear(class_name)
+        total = 0
+
+        for batch in iter_rid_batches(self.execute_query, class_name, id_field, limit):
+            total += self.record(class_name, id_field, batch)
+
+        LOG.info(f"✅ Índice de {class_name} reconstruido con {total} RIDs.")
+        return total
+
+    def _class_lock(self, class_name):
+        with self._lock:
+            return self._class_locks.setdefault(self._key(class_name), threading.RLock())
+
+    def ensure_fresh(self, class_name, id_field):
+        """Reconstruye el índice si falta, está obsoleto o es de otra propiedad.
+
+        La comparación con el servidor se hace una vez por ejecución y clase.
+        """
+        key = self._key(class_name)
+        # Un lock por clase: dos tareas que piden la misma clase no la reconstruyen dos veces
+        with self._class_lock(class_name):
+            indexed_by = self.id_field(class_name)
+            if indexed_by not in (None, id_field):
+                LOG.warning(f"⚠️ El índice de {class_name} es por {indexed_by}, no por {id_field}")
+                self.rebuild(class_name, id_field)
+            elif key in self._fresh:
+                return
+            elif self.is_stale(class_name):
+                self.rebuild(class_name, id_field)
+            self._fresh.add(key)
+
+    def _iter_batches(self, class_name, size=100000):
+        with self._lock:
+            cursor = self.conn.execute(
+                "SELECT business_id, rid FROM rids WHERE class_name = ?", (self._key(class_name),)
+            )
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(size)
+            if not rows:
+                return
+            yield rows
+
+    def get_map(self, class_name, id_field):
+        """Devuelve el mapa compacto `id → @rid` de una clase sin consultar OrientDB.
+
+        El RidMap se guarda como `.npy` junto al índice y se reutiliza mientras la clase no cambie.
+        """
+        with self._class_lock(class_name):
+            self.ensure_fresh(class_name, id_field)
+            cache = self._cache_path(class_name)
+            if os.path.exists(cache):
+                cached = RidMap.load(cache)
+                if len(cached) == self.count(class_name):
+                    return cached
+
+            rid_map = build_rid_map(lambda: self._iter_batches(class_name))
+            if isinstance(rid_map, RidMap):
+                rid_map.save(cache)
+            return rid_map
+
+    def lookup(self, class_name, id_field, ids):
+        """Resuelve solo los IDs pedidos (p. ej. los de un chunk del CSV)."""
+        self.ensure_fresh(class_name, id_field)
+        key = self._key(class_name)
+        ids = [str(i).strip() for i in ids]
+        result = {}
+        for i in range(0, len(ids), SQLITE_MAX_PARAMS):
+            chunk = ids[i:i + SQLITE_MAX_PARAMS]
+            placeholders = ", ".join("?" for _ in chunk)
+            with self._lock:
+                cursor = self.conn.execute(
+                    f"SELECT business_id, rid FROM rids WHERE class_name = ? AND business_id IN ({placeholders})",
+                    [key, *chunk],
+                )
+                result.update(cursor)
+        return result
+
+
+def default_index_path(data_dir):
+    return os.environ.get("KHAB_RID_INDEX", os.path.join(data_dir, "rid_index.sqlite"))
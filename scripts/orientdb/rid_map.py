@@ -0,0 +1,149 @@
+import numpy as np
+
+
+# ✅ Mapa compacto ID de negocio → @rid
+# Guarda los IDs como int64 ordenados y el @rid empaquetado en (cluster int32, posición int64):
+# 20 bytes por entrada frente a cientos de bytes de un dict[str, str].
+RID_DTYPE = np.dtype([("id", "<i8"), ("cluster", "<i4"), ("position", "<i8")])
+
+
+def _parse_rid(rid):
+    cluster, position = rid.lstrip("#").split(":")
+    return int(cluster), int(position)
+
+
+def _to_int64(ids):
+    """Convierte IDs (textos o enteros) a int64; devuelve `(valores, válidos)`."""
+    values = np.asarray(ids)
+    if values.dtype.kind in "iu":
+        return values.astype(np.int64, copy=False), np.ones(len(values), dtype=bool)
+    try:
+        return values.astype(np.int64), np.ones(len(values), dtype=bool)
+    except (ValueError, TypeError, OverflowError):
+        pass
+
+    converted = np.zeros(len(values), dtype=np.int64)
+    valid = np.zeros(len(values), dtype=bool)
+    for n, value in enumerate(values):
+        try:
+            converted[n] = int(str(value).strip())
+            valid[n] = True
+        except (ValueError, OverflowError):
+            pass
+    return converted, valid
+
+
+class RidMap:
+    """Mapa `ID → @rid` respaldado por un array estructurado de NumPy, buscado con `np.searchsorted`.
+
+    Admite búsqueda de una clave (`m["123"]`, `m.get(...)`, `in`) y vectorizada (`m.lookup(ids)`).
+    """
+
+    def __init__(self, table):
+        self.table = table
+
+    @classmethod
+    def from_batches(cls, batches):
+        """Construye el mapa a partir de lotes `[(id, rid), ...]` (p. ej. `iter_rid_batches`)."""
+        parts = []
+        for batch in batches:
+            part = np.empty(len(batch), dtype=RID_DTYPE)
+            for n, (business_id, rid) in enumerate(batch):
+                part[n] = (int(str(business_id).strip()), *_parse_rid(rid))
+            parts.append(part)
+
+        table = np.concatenate(parts) if parts else np.empty(0, dtype=RID_DTYPE)
+        table = table[np.argsort(table["id"], kind="stable")]
+
+        # 🔥 Si un ID aparece varias veces, gana el último registrado
+        if len(table):
+            last = np.append(table["id"][1:] != table["id"][:-1], True)
+            table = table[last]
+        return cls(table)
+
+    @classmethod
+    def from_pairs(cls, pairs, chunk_size=100000):
+        batch = []
+        batches = []
+        for pair in pairs:
+            batch.append(pair)
+            if len(batch) >= chunk_size:
+                batches.append(batch)
+                batch = []
+        if batch:
+            batches.append(batch)
+        return cls.from_batches(batches)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Carga un mapa guardado con `save` (por defecto mapeado en memoria, sin copiarlo)."""
+        return cls(np.load(path, mmap_mode="r" if mmap else None))
+
+    def save(self, path):
+        np.save(path, self.table)
+
+    def __len__(self):
+        return len(self.table)
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+    def _positions(self, keys):
+        ids = self.table["id"]
+        slots = np.searchsorted(ids, keys)
+        slots = np.minimum(slots, max(len(ids) - 1, 0))
+        found = (ids[slots] == keys) if len(ids) else np.zeros(len(keys), dtype=bool)
+        return slots, found
+
+    def lookup(self, ids):
+        """Búsqueda vectorizada: devuelve `(encontrado, cluster, posición)` como arrays."""
+        keys, valid = _to_int64(ids)
+        slots, found = self._positions(keys)
+        found &= valid
+        rows = self.table[slots] if len(self.table) else np.zeros(len(keys), dtype=RID_DTYPE)
+        return found, rows["cluster"], rows["position"]
+
+    def rids(self, ids):
+        """Devuelve un array de textos `#cluster:posición` (None si el ID no existe)."""
+        found, clusters, positions = self.lookup(ids)
+        result = np.full(len(found), None, dtype=object)
+        if found.any():
+            text = np.char.add(
+                np.char.add("#", clusters[found].astype(str)),
+                np.char.add(":", positions[found].astype(str)),
+            )
+            result[found] = text.astype(object)
+        return result
+
+    def get(self, business_id, default=None):
+        try:
+            key = int(str(business_id).strip())
+        except ValueError:
+            return default
+        slots, found = self._positions(np.array([key], dtype=np.int64))
+        if not found[0]:
+            return default
+        row = self.table[slots[0]]
+        return f"#{row['cluster']}:{row['position']}"
+
+    def __getitem__(self, business_id):
+        rid = self.get(business_id)
+        if rid is None:
+            raise KeyError(business_id)
+        return rid
+
+    def __contains__(self, business_id):
+        return self.get(business_id) is not None
+
+
+def build_rid_map(make_batches):
+    """Devuelve un RidMap compacto, o un dict si los IDs de la clase no son numéricos.
+
+    `make_batches` es una función que genera los lotes `(id, rid)`; se vuelve a llamar
+    solo si hace falta el dict de respaldo, para no retener todos los lotes en memoria.
+    """
+    try:
+        return RidMap.from_batches(make_batches())
+    except ValueError:
+        return {str(business_id).strip(): rid for batch in make_batches() for business_id, rid in batch}
@@ -0,0 +1,89 @@
+import pandas as pd
+
+
+# ✅ Transformaciones compartidas por los cargadores de OrientDB (fixer.py y orientdb_dataload.py)
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# ✅ Rangos de PLACE por fragmento (los mismos que arangodb_dataload.load_customer)
+PLACE_FRAGMENTS = {
+    "North": (0, 500),
+    "Center": (501, 1000),
+    "South": (1001, None),
+}
+
+PERSON_COLUMNS = {
+    "FIRSTNAME": "FIRST_NAME",
+    "LASTNAME": "LAST_NAME",
+    "CREATION_DATE": "CREATE_DATE",
+}
+
+
+def prepare_person_frame(df):
+    """Renombra columnas y convierte fechas de `person_0_0.csv` una sola vez para Customer y Person."""
+    df = df.rename(columns=PERSON_COLUMNS)
+    df["BIRTHDAY"] = pd.to_datetime(df["BIRTHDAY"], errors="coerce").dt.strftime(DATE_FORMAT)
+    df["CREATE_DATE"] = pd.to_datetime(df["CREATE_DATE"], errors="coerce").dt.strftime(DATE_FORMAT)
+    df["PLACE"] = df["PLACE"].astype(int)
+    return df
+
+
+def place_fragment_positions(place):
+    """Devuelve, por fragmento, las posiciones de las filas cuyo PLACE cae en su rango."""
+    positions = {}
+    for suffix, (low, high) in PLACE_FRAGMENTS.items():
+        mask = place >= low
+        if high is not None:
+            mask &= place <= high
+        positions[suffix] = mask.to_numpy().nonzero()[0]
+    return positions
+
+
+def map_rids(ids, rid_map):
+    """Traduce una Serie de IDs a @rid con un RidMap (vectorizado) o con un dict."""
+    if isinstance(rid_map, dict):
+        return ids.map(rid_map)
+    result = pd.Series(None, index=ids.index, dtype=object)
+    valid = ids.notna()
+    result[valid] = rid_map.rids(ids[valid].to_numpy())
+    return result
+
+
+def sql_quote(values):
+    """Convierte una Serie de textos en literales SQL entre comillas simples (vectorizado)."""
+    escaped = values.str.replace("\\", "\\\\", regex=False).str.replace("'", "\\'", regex=False)
+    return "'" + escaped + "'"
+
+
+def resolve_edge_frame(df, from_col, to_col, from_rids, to_rids):
+    """Resuelve FROM/TO a @rid por columnas y descarta las filas incompletas o colgantes.
+
+    Devuelve `(from_rid, to_rid, fechas, stats)` con solo las filas válidas; `stats` cuenta
+    las filas sin ID (`missing`) y las que apuntan a vértices inexistentes (`dangling`).
+    """
+    from_ids = df[from_col].str.strip()
+    to_ids = df[to_col].str.strip()
+    missing = from_ids.isna() | to_ids.isna()
+
+    from_rid = map_rids(from_ids, from_rids)
+    to_rid = map_rids(to_ids, to_rids)
+    keep = from_rid.notna() & to_rid.notna()
+
+    stats = {
+        "missing": int(missing.sum()),
+        "dangling": int((~missing & ~keep).sum()),
+    }
+    dates = df["creationDate"][keep] if "creationDate" in df.columns else None
+    return from_rid[keep], to_rid[keep], dates, stats
+
+
+def edge_statements(edge_class, from_refs, to_refs, dates=None, cluster=None):
+    """Genera en bloque las sentencias CREATE EDGE a partir de columnas ya resueltas.
+
+    Con `cluster`, las aristas se crean en ese cluster de la clase.
+    """
+    target = f"{edge_class} CLUSTER {cluster}" if cluster else edge_class
+    statements = f"CREATE EDGE {target} FROM " + from_refs + " TO " + to_refs
+    if dates is not None:
+        with_date = dates.notna()
+        statements = statements.where(~with_date, statements + " SET creationDate = " + sql_quote(dates.fillna("")))
+    return statements.tolist()
@@ -0,0 +1,61 @@
+import os
+import sys
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "arangodb"))
+
+try:
+    from arangodb_dataload import PANDEMIC_DATE, route_orders
+except ImportError:  # python-arango, pandas o requests no instalados
+    route_orders = None
+
+
+def order(n):
+    date = "2020-01-15" if n % 3 == 0 else "2021-06-01"
+    return {"OrderId": str(n), "PersonId": str(n % 7), "OrderDate": date, "TotalPrice": 10.0 * n, "Orderline": []}
+
+
+@unittest.skipIf(route_orders is None, "requiere python-arango y pandas")
+class RouteOrdersTest(unittest.TestCase):
+    def test_each_order_goes_to_order_and_one_fragment(self):
+        orders = [order(n) for n in range(20)] + [{"PersonId": "1"}, dict(order(99), TotalPrice="x")]
+        read = []
+
+        def source():
+            for item in orders:
+                read.append(item)
+                yield item
+
+        batches = list(route_orders(source(), batch_size=4))
+        self.assertEqual(len(read), len(orders))  # 📌 una sola pasada por el archivo
+
+        routed = {}
+        for collection_name, offset, batch in batches:
+            self.assertLessEqual(len(batch), 4)
+            keys = routed.setdefault(collection_name, [])
+            self.assertEqual(offset, len(keys))  # offsets contiguos por colección
+            keys.extend(o["_key"] for o in batch)
+
+        valid = [str(n) for n in range(20)]
+        self.assertEqual(sorted(routed["Order"], key=int), valid)
+        self.assertEqual(sorted(routed["Order_Pre_Pandemic"] + routed["Order_Post_Pandemic"], key=int), valid)
+        self.assertTrue(all(order(int(k))["OrderDate"] < PANDEMIC_DATE for k in routed["Order_Pre_Pandemic"]))
+        self.assertTrue(all(order(int(k))["OrderDate"] >= PANDEMIC_DATE for k in routed["Order_Post_Pandemic"]))
+
+    def test_batches_are_yielded_while_reading(self):
+        read = []
+
+        def source():
+            for n in range(100):
+                read.append(n)
+                yield order(n)
+
+        collection_name, offset, batch = next(route_orders(source(), batch_size=5))
+        self.assertEqual((collection_name, offset, len(batch)), ("Order", 0, 5))
+        self.assertLess(len(read), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import json
+import os
+import socket
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "arangodb"))
+
+try:
+    from arangodb_import import CoordinatorPool, OutcomeUnknown
+except ImportError:  # requests/numpy no instalados
+    CoordinatorPool = None
+
+
+class ImportHandler(BaseHTTPRequestHandler):
+    """Responde como /_api/import, o con `status` si el servidor lo fija."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])) if "Content-Length" in self.headers else self._chunked()
+        self.server.requests += 1
+        if self.server.status is not None:
+            self._send(self.server.status, {"error": True, "errorMessage": "fallo interno"})
+            return
+        documents = [line for line in body.decode("utf-8").split("\n") if line]
+        self._send(201, {"created": len(documents), "errors": 0, "details": []})
+
+    def _chunked(self):
+        body = b""
+        while True:
+            size = int(self.rfile.readline().strip(), 16)
+            if size == 0:
+                self.rfile.readline()
+                return body
+            body += self.rfile.read(size)
+            self.rfile.readline()
+
+    def _send(self, status, data):
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def closed_port():
+    """Un puerto local donde nadie escucha: la conexión se rechaza antes de enviar nada."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@unittest.skipIf(CoordinatorPool is None, "requiere requests y numpy")
+class FailoverTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ImportHandler)
+        self.server.requests = 0
+        self.server.status = None
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.host = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def pool(self, hosts):
+        return CoordinatorPool(hosts, "test", "root", "root", writers=1, cooldown=60)
+
+    def test_refused_connection_fails_over(self):
+        pool = self.pool([f"http://127.0.0.1:{closed_port()}", self.host])
+        try:
+            for _ in range(2):  # 📌 el turno rotatorio prueba antes el coordinador caído al menos una vez
+                result = pool.import_documents("Person", [{"ID": 1}])
+                self.assertEqual(result["created"], 1)
+        finally:
+            pool.close()
+
+    def test_server_error_is_not_resent(self):
+        # 📌 Un 5xx tras enviar el lote no se reintenta en otro coordinador: pudo haberse aplicado
+        self.server.status = 500
+        other = ThreadingHTTPServer(("127.0.0.1", 0), ImportHandler)
+        other.requests = 0
+        other.status = None
+        threading.Thread(target=other.serve_forever, daemon=True).start()
+        pool = self.pool([self.host, f"http://127.0.0.1:{other.server_address[1]}"])
+        try:
+            outcomes = []
+            for _ in range(2):
+                try:
+                    pool.import_documents("Person", [{"ID": 1}])
+                    outcomes.append("ok")
+                except OutcomeUnknown:
+                    outcomes.append("unknown")
+            self.assertEqual(self.server.requests + other.requests, 2)
+            self.assertIn("unknown", outcomes)
+        finally:
+            pool.close()
+            other.shutdown()
+            other.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import os
+import re
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "orientdb"))
+
+from dead_letter import DeadLetterFile
+from load_ledger import LoadLedger
+from load_log import get_logger
+from load_metrics import LoadMetrics
+
+try:
+    from batch_loader import BatchLoader
+except ImportError:  # pandas/numpy no instalados
+    BatchLoader = None
+
+
+CONTENT = re.compile(r"CONTENT (\{.*\})")
+
+
+class FakeExecutor:
+    """Confirma los lotes sin `BAD`, rechaza el resto y deja de responder tras `fail_after` llamadas."""
+
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.calls = 0
+        self.stored = []
+
+    def execute(self, sql, transaction=False, entity="other"):
+        self.calls += 1
+        if self.fail_after is not None and self.calls > self.fail_after:
+            return None
+        records = [json.loads(m) for m in CONTENT.findall(sql)]
+        if any(r.get("BAD") for r in records):
+            return {"errors": [{"code": 500, "content": "registro inválido"}]}
+        self.stored.extend(r["ID"] for r in records)
+        return {"result": []}
+
+    def cluster_for(self, entity):
+        return None
+
+    def stream(self, jobs, transaction=True, entity="other"):
+        for context, sql in jobs:
+            yield context, self.execute(sql, transaction, entity)
+
+
+@unittest.skipIf(BatchLoader is None, "requiere pandas")
+class InsertBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ledger = LoadLedger(os.path.join(self.tmp.name, "ledger.sqlite"))
+        self.dead_letter = DeadLetterFile(os.path.join(self.tmp.name, "dead_letter.jsonl"))
+        self.records = [{"ID": i, "BAD": i in (5, 12)} for i in range(16)]
+
+    def tearDown(self):
+        self.ledger.conn.close()
+        self.tmp.cleanup()
+
+    def loader(self, executor):
+        return BatchLoader(executor, LoadMetrics("test"), None, self.ledger, self.dead_letter, get_logger("test"))
+
+    def test_bisects_rejected_batch(self):
+        executor = FakeExecutor()
+        confirmed = self.loader(executor).insert_batch("Feedback", self.records, batch_size=16, checkpoint=("f.csv", 0))
+        self.assertEqual(confirmed, 14)
+        self.assertEqual(sorted(executor.stored), [i for i in range(16) if i not in (5, 12)])
+        self.assertEqual(self.dead_letter.count, 2)
+        self.assertTrue(self.ledger.chunk_done("Feedback", "f.csv", 0))
+
+    def test_resume_after_interrupted_bisection_sends_each_record_once(self):
+        # 📌 La red cae a mitad de la bisección: lo confirmado hasta ahí queda contado y en el ledger
+        first = FakeExecutor(fail_after=7)
+        confirmed = self.loader(first).insert_batch("Feedback", self.records, batch_size=16, checkpoint=("f.csv", 0))
+        self.assertEqual(confirmed, len(first.stored))
+        self.assertGreater(confirmed, 0)
+        self.assertFalse(self.ledger.chunk_done("Feedback", "f.csv", 0))
+
+        # 📌 Con --resume solo viajan las posiciones que quedaron sin resolver
+        second = FakeExecutor()
+        confirmed += self.loader(second).insert_batch("Feedback", self.records, batch_size=16, checkpoint=("f.csv", 0))
+        stored = first.stored + second.stored
+        self.assertEqual(sorted(stored), [i for i in range(16) if i not in (5, 12)])
+        self.assertEqual(confirmed, 14)
+        self.assertEqual(self.dead_letter.count, 2)
+        self.assertTrue(self.ledger.chunk_done("Feedback", "f.csv", 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from converter import PART_NAME, convert, convert_sharded
+
+
+def order(n):
+    lines = [{"SKU": f"SKU-{n}-{k}", "PRODUCT_ID": str(k), "TITLE": f"Item <{k}> & co", "PRICE": 1.5 * k,
+              "VENDOR_ID": "" if k == 2 else str(k)} for k in range(1, n % 3 + 2)]
+    return {"ORDER_ID": str(n), "CUSTOMER_ID": str(n * 7), "ORDER_DATE": "2020-01-28",
+            "TOTAL_PRICE": 10.0 * n, "ORDER_LINE": lines}
+
+
+class ConvertShardedTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input = os.path.join(self.tmp.name, "Order.json")
+        with open(self.input, "w", encoding="utf-8") as f:
+            for n in range(1, 201):
+                f.write(json.dumps(order(n)) + "\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def read(self, name):
+        with open(self.path(name), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def run_quiet(self, func, *args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*args, **kwargs)
+
+    def test_sharded_output_matches_single_process(self):
+        self.assertEqual(self.run_quiet(convert, self.input, self.path("single.xml")), 200)
+        self.assertEqual(self.run_quiet(convert_sharded, self.input, self.path("sharded.xml"), shards=4, workers=2), 200)
+        self.assertEqual(self.read("sharded.xml"), self.read("single.xml"))
+        self.assertFalse([name for name in os.listdir(self.tmp.name) if ".part" in name])
+
+    def test_split_removes_parts_from_a_previous_run(self):
+        self.run_quiet(convert_sharded, self.input, self.path("Invoice.xml"), shards=4, split=True, workers=2)
+        self.assertTrue(os.path.exists(self.path(PART_NAME.format(3))))
+
+        # 📌 Con menos shards no deben quedar partes sobrantes que el cargador lea dos veces
+        total = self.run_quiet(convert_sharded, self.input, self.path("Invoice.xml"), shards=2, split=True, workers=2)
+        self.assertEqual(total, 200)
+        parts = sorted(name for name in os.listdir(self.tmp.name) if name.startswith("Invoice_part_"))
+        self.assertEqual(parts, [PART_NAME.format(0), PART_NAME.format(1)])
+        body = "".join(self.read(part) for part in parts)
+        self.assertEqual(body.count("<Invoice>"), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
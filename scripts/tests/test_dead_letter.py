@@ -0,0 +1,129 @@
+import json
+import os
+import re
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "orientdb"))
+
+from dead_letter import TransportError, batch_error, bisect_failed
+
+try:
+    from orientdb_client import OrientDBExecutor
+    from rid_index import build_insert_script
+except ImportError:  # requests no instalado
+    OrientDBExecutor = None
+
+
+# ✅ Cuerpo con el que OrientDB rechaza un comando en /batch (HTTP 500)
+ORIENTDB_ERROR = {"errors": [{"code": 500, "reason": 500, "content": "ORecordDuplicatedException: ID duplicado"}]}
+
+CONTENT = re.compile(r"CONTENT (\{.*\})")
+
+
+class RejectingHandler(BaseHTTPRequestHandler):
+    """Responde como OrientDB: 500 + `errors` si algún INSERT del lote lleva `BAD`."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests += 1
+        if self.server.status is not None:
+            self._send(self.server.status, {"errors": [{"code": self.server.status, "content": "no disponible"}]})
+            return
+        script = body["operations"][0]["command"]
+        records = [json.loads(m) for m in CONTENT.findall(script)]
+        if any(r.get("BAD") for r in records):
+            self._send(500, ORIENTDB_ERROR)
+        else:
+            self._send(200, {"result": [{"@rid": f"#1:{r['ID']}"} for r in records]})
+
+    def _send(self, status, data):
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class BisectFailedTest(unittest.TestCase):
+    def test_isolates_each_bad_record(self):
+        records = [{"ID": i, "BAD": i in (3, 17)} for i in range(32)]
+        rejected = []
+
+        def send(sub_batch):
+            return "malo" if any(r["BAD"] for r in sub_batch) else None
+
+        committed, bad = bisect_failed(records, "malo", send, lambda r, e: rejected.append(r["ID"]))
+        self.assertEqual((committed, bad), (30, 2))
+        self.assertEqual(sorted(rejected), [3, 17])
+
+    def test_transport_error_propagates(self):
+        def send(sub_batch):
+            raise TransportError("caído")
+
+        with self.assertRaises(TransportError):
+            bisect_failed([{"ID": 1}, {"ID": 2}], "malo", send, lambda r, e: None)
+
+
+class BatchErrorTest(unittest.TestCase):
+    def test_committed_batch(self):
+        self.assertIsNone(batch_error({"result": []}, "Person"))
+
+    def test_rejected_batch(self):
+        self.assertEqual(batch_error(ORIENTDB_ERROR, "Person"), ORIENTDB_ERROR["errors"])
+
+    def test_no_response(self):
+        with self.assertRaises(TransportError):
+            batch_error(None, "Person")
+
+
+@unittest.skipIf(OrientDBExecutor is None, "requiere requests")
+class OrientDBRejectionTest(unittest.TestCase):
+    """Un 500 con `errors` llega al cargador como rechazo de datos y se bisecta, sin reintentos."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), RejectingHandler)
+        self.server.requests = 0
+        self.server.status = None
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.executor = OrientDBExecutor(host, "test", "root", "root", retries=3, backoff=0)
+
+    def tearDown(self):
+        self.executor.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def settle(self, records):
+        script = build_insert_script("Person", records)
+        return batch_error(self.executor.execute(script, transaction=True, entity="Person"), "Person")
+
+    def test_rejected_batch_is_bisected(self):
+        records = [{"ID": i, "BAD": i == 5} for i in range(16)]
+        rejected = []
+
+        error = self.settle(records)
+        self.assertEqual(error, ORIENTDB_ERROR["errors"])
+        self.assertEqual(self.server.requests, 1)  # 📌 un 500 con `errors` no se reintenta
+
+        committed, bad = bisect_failed(records, error, self.settle, lambda r, e: rejected.append((r["ID"], e)))
+        self.assertEqual((committed, bad), (15, 1))
+        self.assertEqual(rejected, [(5, ORIENTDB_ERROR["errors"])])
+
+    def test_overload_is_transport_error(self):
+        self.server.status = 503
+        with self.assertRaises(TransportError):
+            self.settle([{"ID": 1}])
+        self.assertEqual(self.server.requests, 4)  # 📌 503 sí se reintenta
+
+
+if __name__ == "__main__":
+    unittest.main()
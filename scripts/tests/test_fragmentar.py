@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "orientdb"))
+
+try:
+    from fragmentar import DEFAULT_REVIEW, clean_feedback
+except ImportError:  # pandas no instalado
+    clean_feedback = None
+
+
+def feedback_row(n):
+    customer = "" if n % 10 == 3 else str(n)
+    product = "" if n % 17 == 5 else str(n % 50)
+    review = "" if n % 6 == 1 else f"review {n}"
+    return f"{product}|{customer}|{n % 5 + 1}|{review}"
+
+
+@unittest.skipIf(clean_feedback is None, "requiere pandas")
+class CleanFeedbackTest(unittest.TestCase):
+    ROWS = 200
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        lines = ["PRODUCT_ID|CUSTOMER_ID|RATE|REVIEW"] + [feedback_row(n) for n in range(self.ROWS)]
+        self.content = "\n".join(lines) + "\n"
+
+        # 📌 Conteos esperados: se descartan las filas sin ID y se rellenan los REVIEW de las que quedan
+        kept = [n for n in range(self.ROWS) if n % 10 != 3 and n % 17 != 5]
+        self.expected = (len(kept), self.ROWS - len(kept), sum(1 for n in kept if n % 6 == 1))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def clean(self, name, **options):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.content)
+        counts = clean_feedback(path, **options)
+        self.assertEqual(os.listdir(self.tmp.name).count(f"{name}.tmp"), 0)
+        with open(path, "r", encoding="utf-8") as f:
+            return counts, f.read()
+
+    def test_counts_rows_drops_and_fills(self):
+        counts, cleaned = self.clean("Feedback.csv", workers=1, chunksize=7)
+        self.assertEqual(counts, self.expected)
+
+        lines = cleaned.splitlines()
+        self.assertEqual(lines[0], "PRODUCT_ID|CUSTOMER_ID|RATE|REVIEW")
+        self.assertEqual(len(lines) - 1, self.expected[0])
+        self.assertEqual(sum(1 for line in lines if line.endswith(DEFAULT_REVIEW)), self.expected[2])
+
+    def test_parallel_matches_sequential(self):
+        sequential = self.clean("sequential.csv", workers=1, chunksize=7)
+        parallel = self.clean("parallel.csv", workers=3, chunksize=5)
+        self.assertEqual(parallel, sequential)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import contextlib
+import filecmp
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "benchmark"))
+
+try:
+    from generate_dataset import generate
+except ImportError:  # pandas no instalado
+    generate = None
+
+
+def tree(root):
+    """Rutas relativas de todos los archivos bajo `root`."""
+    return sorted(os.path.relpath(os.path.join(d, f), root) for d, _, files in os.walk(root) for f in files)
+
+
+@unittest.skipIf(generate is None, "requiere pandas")
+class GenerateDatasetTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def generate(self, name, **options):
+        out_dir = os.path.join(self.tmp.name, name)
+        # 📌 SF0.02 con tareas de 150 registros: varias partes por entidad
+        with contextlib.redirect_stdout(io.StringIO()):
+            totals = generate(out_dir, scale=0.02, shard_rows=150, **options)
+        return out_dir, totals
+
+    def test_same_files_for_any_number_of_workers(self):
+        one, totals = self.generate("one", workers=1)
+        three, _ = self.generate("three", workers=3)
+
+        files = tree(one)
+        self.assertEqual(files, tree(three))
+        self.assertIn(os.path.join("Dataset", "Order", "Order.json"), files)
+        self.assertFalse([f for f in files if ".part" in f or f.endswith(".tmp")])
+        _, mismatch, errors = filecmp.cmpfiles(one, three, files, shallow=False)
+        self.assertEqual((mismatch, errors), ([], []))
+        self.assertEqual(totals["Dataset/Order/Order.json"], 3000)
+
+    def test_seed_changes_the_data(self):
+        first, _ = self.generate("first", workers=2, layouts=("Dataset",))
+        second, _ = self.generate("second", workers=2, layouts=("Dataset",), seed=7)
+        path = os.path.join("Dataset", "Order", "Order.json")
+        self.assertFalse(filecmp.cmp(os.path.join(first, path), os.path.join(second, path), shallow=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
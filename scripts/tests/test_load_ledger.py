@@ -0,0 +1,35 @@
+import os
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from load_ledger import LoadLedger
+
+
+class LoadLedgerTest(unittest.TestCase):
+    def test_does_not_open_file_until_first_use(self):
+        # 📌 Los cargadores crean el ledger al importarse, aunque DATA_DIR no exista
+        path = os.path.join(tempfile.gettempdir(), "no-existe", "ledger.sqlite")
+        ledger = LoadLedger(path)
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(ledger.path, path)
+
+    def test_marks_and_resets_batches(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ledger = LoadLedger(os.path.join(tmp, "ledger.sqlite"))
+            ledger.mark_committed("Person", "person.csv", "0:0", 500)
+            ledger.mark_chunk("Person", "person.csv", 1, 500)
+            self.assertTrue(ledger.is_committed("Person", "person.csv", "0:0"))
+            self.assertTrue(ledger.chunk_done("Person", "person.csv", 1))
+            self.assertEqual(ledger.summary(), {"Person": (1, 500)})
+
+            ledger.reset()
+            self.assertFalse(ledger.is_committed("Person", "person.csv", "0:0"))
+            ledger.conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import sys
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "orientdb"))
+
+try:
+    from node_routing import NodeRouter
+    from rid_index import build_insert_script
+except ImportError:  # requests no instalado
+    NodeRouter = None
+
+
+@unittest.skipIf(NodeRouter is None, "requiere requests")
+class NodeRouterTest(unittest.TestCase):
+    def setUp(self):
+        # 📌 Esquema y configuración distribuida del repo
+        self.router = NodeRouter("http://default")
+
+    def test_fragments_go_to_their_node_and_cluster(self):
+        self.assertEqual(self.router.node_for("Customer_North"), "orientdb-node1")
+        self.assertEqual(self.router.cluster_for("Customer_North"), "customer_north_cluster")
+        self.assertEqual(self.router.cluster_for("Order_Post_Pandemic"), "order_post_pandemic_cluster")
+        self.assertEqual(self.router.cluster_for("Person"), "person_global_cluster")
+
+    def test_class_without_owned_cluster_keeps_default(self):
+        self.assertIsNone(self.router.cluster_for("Person_North"))
+        self.assertEqual(self.router.host_for("Person_North"), "http://default")
+
+    def test_insert_names_the_owned_cluster(self):
+        script = build_insert_script("Customer_North", [{"ID": "1"}], cluster=self.router.cluster_for("Customer_North"))
+        self.assertIn('INSERT INTO Customer_North CLUSTER customer_north_cluster CONTENT {"ID": "1"}', script)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import re
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "orientdb"))
+
+try:
+    from rid_index import RidIndex
+except ImportError:  # numpy no instalado
+    RidIndex = None
+
+
+SELECT = re.compile(r"SELECT (.+?) FROM (\w+)(?: WHERE @rid > #(-?\d+):(-?\d+))?(?: ORDER BY @rid (ASC|DESC))?(?: LIMIT (\d+))?")
+
+
+class FakeServer:
+    """Responde a las consultas de RidIndex (count, primer/último @rid y export por cursor)."""
+
+    def __init__(self):
+        self.classes = {}
+        self.queries = 0
+
+    def create(self, class_name, cluster, ids, id_field):
+        self.classes[class_name] = [{id_field: str(i), "NAME": f"n{i}", "@rid": f"#{cluster}:{n}"} for n, i in enumerate(ids)]
+
+    def execute_query(self, sql, entity="other"):
+        self.queries += 1
+        if sql.startswith("SELECT count(*)"):
+            return {"result": [{"total": len(self.classes[entity])}]}
+        projection, class_name, cluster, position, order, limit = SELECT.match(sql).groups()
+        rows = list(self.classes[class_name])
+        if cluster is not None:
+            rows = [r for r in rows if tuple(map(int, r["@rid"][1:].split(":"))) > (int(cluster), int(position))]
+        if order == "DESC":
+            rows.reverse()
+        rows = rows[:int(limit)] if limit else rows
+        fields = [f.strip() for f in projection.split(",")]
+        return {"result": [{f: r[f] for f in fields} for r in rows]}
+
+
+@unittest.skipIf(RidIndex is None, "requiere numpy")
+class RidIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server = FakeServer()
+        self.index = RidIndex(os.path.join(self.tmp.name, "rid_index.sqlite"), self.server.execute_query)
+
+    def tearDown(self):
+        self.index.conn.close()
+        self.tmp.cleanup()
+
+    def reopen(self):
+        # 📌 Una ejecución nueva: el índice en disco se vuelve a comparar con el servidor
+        self.index.conn.close()
+        self.index = RidIndex(self.index.path, self.server.execute_query)
+
+    def test_map_follows_requested_field(self):
+        self.server.create("Person", 12, [10, 20], "PERSON_ID")
+        self.server.classes["Person"][0]["NAME"] = "30"
+        self.server.classes["Person"][1]["NAME"] = "40"
+        self.assertEqual(self.index.get_map("Person", "PERSON_ID")["10"], "#12:0")
+
+        # Pedir otra propiedad no devuelve el mapa de PERSON_ID
+        by_name = self.index.get_map("Person", "NAME")
+        self.assertEqual(by_name["30"], "#12:0")
+        self.assertNotIn("10", by_name)
+        self.assertEqual(self.index.id_field("Person"), "NAME")
+
+    def test_recreated_class_is_rebuilt(self):
+        self.server.create("Person", 12, [10, 20], "PERSON_ID")
+        self.assertEqual(self.index.get_map("Person", "PERSON_ID")["20"], "#12:1")
+
+        # Misma cantidad de registros, pero la clase se volvió a crear en otro cluster
+        self.server.create("Person", 31, [10, 20], "PERSON_ID")
+        self.reopen()
+        self.assertEqual(self.index.get_map("Person", "PERSON_ID")["20"], "#31:1")
+
+    def test_unchanged_class_is_not_exported_again(self):
+        self.server.create("Person", 12, [10, 20], "PERSON_ID")
+        self.index.record("Person", "PERSON_ID", [("10", "#12:0"), ("20", "#12:1")])
+        self.reopen()
+        self.assertEqual(self.index.get_map("Person", "PERSON_ID")["10"], "#12:0")
+        self.assertEqual(self.server.queries, 3)  # count + primer y último @rid, sin exportar
+
+
+if __name__ == "__main__":
+    unittest.main()
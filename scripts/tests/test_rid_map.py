@@ -0,0 +1,59 @@
+import os
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "orientdb"))
+
+try:
+    from rid_map import RidMap, build_rid_map
+except ImportError:  # numpy no instalado
+    RidMap = None
+
+
+@unittest.skipIf(RidMap is None, "requiere numpy")
+class RidMapTest(unittest.TestCase):
+    def setUp(self):
+        self.rid_map = RidMap.from_batches([
+            [("30", "#12:2"), (" 10 ", "#12:0")],
+            [("20", "#13:1")],
+        ])
+
+    def test_single_lookups(self):
+        self.assertEqual(len(self.rid_map), 3)
+        self.assertEqual(self.rid_map["10"], "#12:0")
+        self.assertEqual(self.rid_map.get(20), "#13:1")
+        self.assertIn("30", self.rid_map)
+        self.assertNotIn("40", self.rid_map)
+        self.assertIsNone(self.rid_map.get("abc"))
+        with self.assertRaises(KeyError):
+            self.rid_map["40"]
+
+    def test_vectorized_lookup(self):
+        rids = self.rid_map.rids(["20", "x", "40", "10"])
+        self.assertEqual(list(rids), ["#13:1", None, None, "#12:0"])
+
+    def test_last_duplicate_wins(self):
+        rid_map = RidMap.from_pairs([("5", "#12:0"), ("6", "#12:1"), ("5", "#12:7")], chunk_size=2)
+        self.assertEqual(len(rid_map), 2)
+        self.assertEqual(rid_map["5"], "#12:7")
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "map.npy")
+            self.rid_map.save(path)
+            loaded = RidMap.load(path, mmap=False)
+        self.assertEqual(list(loaded.rids(["10", "20", "30"])), ["#12:0", "#13:1", "#12:2"])
+
+    def test_non_numeric_ids_fall_back_to_dict(self):
+        batches = [[("A-1", "#12:0"), ("B-2", "#12:1")]]
+        rid_map = build_rid_map(lambda: iter(batches))
+        self.assertEqual(rid_map, {"A-1": "#12:0", "B-2": "#12:1"})
+
+        numeric = build_rid_map(lambda: iter([[("1", "#12:0")]]))
+        self.assertIsInstance(numeric, RidMap)
+
+
+if __name__ == "__main__":
+    unittest.main()